@@ -0,0 +1,146 @@
+"""
+Generate NumPy forward kinematics of a chain of PCC sections from a symbolic derivation.
+
+The chain of kinematics_delta2x.FK_chain is derived with SymPy for any
+number of sections and mounting angles, simplified by common-subexpression
+elimination and written out as a vectorised Python module. SymPy is only
+needed to generate code; the generated modules depend on NumPy alone.
+
+    python fk_codegen.py 3 --mount 0 -30 -60 --name FK_realrobot_generated -o kinematics_generated.py
+"""
+import argparse
+
+import sympy as sp
+
+HEADER = '''"""
+Generated by fk_codegen.py; do not edit, regenerate with
+
+    python fk_codegen.py {args}
+"""
+import numpy as np
+
+'''
+
+TEMPLATE = '''def {name}(S, Deltax, Deltay, out=None):
+    """
+    Forward kinematics of a chain of {n} PCC sections mounted at {mount} degrees.
+
+    Same layout as kinematics_delta2x.FK_realrobot: (S, Deltax, Deltay) of
+    shape ({n},) or (N, {n}) give the stacked section tip transforms in the base
+    frame, shape ({rows}, 4) or (N, {rows}, 4). Straight sections are exact.
+    """
+    S, Deltax, Deltay = np.asarray(S), np.asarray(Deltax), np.asarray(Deltay)
+    {unpack}
+
+    # Per section: sin(delta)/delta, (cos(delta) - 1)/delta^2 and cos(delta)
+{preamble}
+
+{body}
+
+    if out is None:
+        out = np.empty(S.shape[:-1] + ({rows}, 4), dtype=np.result_type(S, Deltax, Deltay, 1.0))
+{assign}
+    return out
+'''
+
+def derive_chain(n, mount_degrees=None):
+    """
+    Symbolic section tip transforms of an n-section chain.
+
+    Each section uses the rotation and translation of FK_S2X_cosimo_new,
+    written in the symbols g = sin(delta)/delta, f = (cos(delta) - 1)/delta^2
+    and c = cos(delta), which keeps the expressions polynomial. The mounting
+    rotation of section i about z is applied to its (deltax, deltay), as in
+    kinematics_delta2x.FK_chain; it leaves delta unchanged.
+
+    Returns:
+        symbols: Dictionary of the input and helper symbols.
+        T: List of n symbolic 3x4 matrices [R | p] of the section tips.
+    """
+    mount_degrees = [0] * n if mount_degrees is None else list(mount_degrees)
+    if len(mount_degrees) != n:
+        raise ValueError(f"Expected {n} mounting angles, got {len(mount_degrees)}.")
+    s = sp.symbols(f's1:{n + 1}')
+    dx = sp.symbols(f'deltax1:{n + 1}')
+    dy = sp.symbols(f'deltay1:{n + 1}')
+    f = sp.symbols(f'f1:{n + 1}')
+    g = sp.symbols(f'g1:{n + 1}')
+    c = sp.symbols(f'c1:{n + 1}')
+
+    T = []
+    R_prev, p_prev = sp.eye(3), sp.zeros(3, 1)
+    for i in range(n):
+        a = sp.rad(sp.Rational(mount_degrees[i]))
+        x = sp.cos(a) * dx[i] - sp.sin(a) * dy[i]
+        y = sp.sin(a) * dx[i] + sp.cos(a) * dy[i]
+        R = sp.Matrix([
+            [1 + f[i] * x ** 2, f[i] * x * y, -g[i] * x],
+            [f[i] * x * y, 1 + f[i] * y ** 2, -g[i] * y],
+            [g[i] * x, g[i] * y, c[i]],
+        ])
+        p = sp.Matrix([s[i] * f[i] * x, s[i] * f[i] * y, s[i] * g[i]])
+        p_prev = p_prev + R_prev * p
+        R_prev = R_prev * R
+        T.append(R_prev.row_join(p_prev))
+    return {'s': s, 'deltax': dx, 'deltay': dy, 'f': f, 'g': g, 'c': c}, T
+
+def generate_fk_chain(n, mount_degrees=None, name=None):
+    """
+    Source code of a vectorised NumPy function for the n-section chain.
+    """
+    mount_degrees = [0] * n if mount_degrees is None else list(mount_degrees)
+    name = name or f'FK_chain{n}'
+    symbols, T = derive_chain(n, mount_degrees)
+
+    entries = [T[i][r, col] for i in range(n) for r in range(3) for col in range(4)]
+    replacements, reduced = sp.cse(entries, symbols=sp.numbered_symbols('t'), optimizations='basic')
+    printer = sp.printing.numpy.NumPyPrinter()
+    code = lambda expr: printer.doprint(expr).replace('numpy.', 'np.')
+
+    args = ', '.join(str(x) for x in symbols['s'])
+    unpack = (f"{args} = S.T\n"
+              f"    {', '.join(str(x) for x in symbols['deltax'])} = Deltax.T\n"
+              f"    {', '.join(str(x) for x in symbols['deltay'])} = Deltay.T")
+    if n == 1:
+        unpack = unpack.replace(' = ', ', = ')
+    preamble = []
+    for i in range(n):
+        k = i + 1
+        preamble += [
+            f'    delta{k} = np.sqrt(deltax{k} ** 2 + deltay{k} ** 2)',
+            f'    g{k} = np.sinc(delta{k} / np.pi)',
+            f'    f{k} = -0.5 * np.sinc(delta{k} / (2 * np.pi)) ** 2',
+            f'    c{k} = np.cos(delta{k})',
+        ]
+    body = [f'    {lhs} = {code(rhs)}' for lhs, rhs in replacements]
+
+    assign = []
+    for i in range(n):
+        for r in range(3):
+            for col in range(4):
+                expr = reduced[i * 12 + r * 4 + col]
+                assign.append(f'    out[..., {4 * i + r}, {col}] = {code(expr)}')
+        assign.append(f'    out[..., {4 * i + 3}, :] = [0.0, 0.0, 0.0, 1.0]')
+
+    return TEMPLATE.format(name=name, n=n, rows=4 * n, mount=mount_degrees, unpack=unpack,
+                           preamble='\n'.join(preamble), body='\n'.join(body), assign='\n'.join(assign))
+
+def write_module(path, n, mount_degrees=None, name=None):
+    """
+    Write a generated module holding one function, see generate_fk_chain.
+    """
+    mount_degrees = [0] * n if mount_degrees is None else list(mount_degrees)
+    name = name or f'FK_chain{n}'
+    args = f"{n} --mount {' '.join(str(a) for a in mount_degrees)} --name {name} -o {path}"
+    with open(path, 'w') as f:
+        f.write(HEADER.format(args=args) + generate_fk_chain(n, mount_degrees, name))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the NumPy forward kinematics of an n-section PCC chain.")
+    parser.add_argument('n', type=int, help="number of sections")
+    parser.add_argument('--mount', type=float, nargs='*', default=None, help="mounting angle of every section [deg]")
+    parser.add_argument('--name', default=None, help="function name, default FK_chain<n>")
+    parser.add_argument('-o', '--output', required=True, help="output .py file")
+    args = parser.parse_args()
+    mount = None if args.mount is None else [int(a) if float(a).is_integer() else a for a in args.mount]
+    write_module(args.output, args.n, mount, args.name)
@@ -0,0 +1,454 @@
+import numpy as np
+import math
+
+import kinematics_delta2x as kd2x
+import kinematics_l2delta as kl2d
+
+# Numba is optional: without it the kernels below stay plain Python and the
+# NumPy implementations in kinematics_delta2x / kinematics_l2delta are used.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def jit(func):
+    """
+    Compile a kernel with numba, or return it unchanged without numba.
+
+    The decorator of the kernels here, public so that other modules can
+    compile kernels that call them, e.g. kinematics_x2delta and
+    obstacle_distance.
+    """
+    if numba is None:
+        return func
+    # cache=True keeps the compiled kernels in __pycache__ across processes;
+    # the numpy error model gives NaN like the NumPy code for straight
+    # sections instead of raising ZeroDivisionError
+    return numba.njit(cache=True, error_model='numpy')(func)
+
+@jit
+def _section(s, deltax, deltay):
+    """
+    Entries of FK_S2X_cosimo_new for one section, row by row.
+    """
+    t2 = deltax * deltax
+    t3 = deltay * deltay
+    t4 = t2 + t3
+    t5 = 1.0 / t4
+    t6 = np.sqrt(t4)
+    t7 = 1.0 / t6
+    t8 = np.cos(t6)
+    t9 = np.sin(t6)
+    t10 = -2.0 * np.sin(0.5 * t6) ** 2
+    t11 = deltax * t7 * t9
+    t12 = deltay * t7 * t9
+    t13 = deltax * deltay * t5 * t10
+    return (t2 * t5 * t10 + 1.0, t13, -t11, deltax * s * t5 * t10,
+            t13, t3 * t5 * t10 + 1.0, -t12, deltay * s * t5 * t10,
+            t11, t12, t8, s * t7 * t9)
+
+@jit
+def _fk_s2x_kernel(s, deltax, deltay, out):
+    """
+    FK_S2X_cosimo_new for (N,) inputs, written into out (N, 3, 4).
+    """
+    for k in range(s.shape[0]):
+        h = _section(s[k], deltax[k], deltay[k])
+        for j in range(12):
+            out[k, j // 4, j % 4] = h[j]
+
+@jit
+def _fk_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, out):
+    """
+    Scalar PCC chain of FK_chain, one configuration per row of S/Deltax/Deltay (N, n).
+    Writes the (N, n, 4, 4) section tip transforms into out.
+    """
+    N, n = S.shape
+    for k in range(N):
+        for i in range(n):
+            deltax = mount_c[i] * Deltax[k, i] - mount_s[i] * Deltay[k, i]
+            deltay = mount_s[i] * Deltax[k, i] + mount_c[i] * Deltay[k, i]
+            h00, h01, h02, h03, h10, h11, h12, h13, h20, h21, h22, h23 = _section(S[k, i], deltax, deltay)
+
+            T = out[k, i]
+            if i == 0:
+                T[0, 0] = h00
+                T[0, 1] = h01
+                T[0, 2] = h02
+                T[0, 3] = h03
+                T[1, 0] = h10
+                T[1, 1] = h11
+                T[1, 2] = h12
+                T[1, 3] = h13
+                T[2, 0] = h20
+                T[2, 1] = h21
+                T[2, 2] = h22
+                T[2, 3] = h23
+            else:
+                P = out[k, i - 1]
+                for r in range(3):
+                    a0 = P[r, 0]
+                    a1 = P[r, 1]
+                    a2 = P[r, 2]
+                    T[r, 0] = a0 * h00 + a1 * h10 + a2 * h20
+                    T[r, 1] = a0 * h01 + a1 * h11 + a2 * h21
+                    T[r, 2] = a0 * h02 + a1 * h12 + a2 * h22
+                    T[r, 3] = a0 * h03 + a1 * h13 + a2 * h23 + P[r, 3]
+            T[3, 0] = 0.0
+            T[3, 1] = 0.0
+            T[3, 2] = 0.0
+            T[3, 3] = 1.0
+
+@jit
+def _section_derivatives(s, deltax, deltay, dH):
+    """
+    Entries of dFK_S2X_cosimo_new for one section, written into dH (3, 3, 4).
+    """
+    t2 = deltax * deltax
+    t3 = deltay * deltay
+    t4 = t2 + t3
+    t6 = np.sqrt(t4)
+    t8 = np.cos(t6)
+    t9 = np.sin(t6)
+    t10 = -2.0 * np.sin(0.5 * t6) ** 2             # cos(delta) - 1
+    f = t10 / t4
+    g = t9 / t6
+    f1 = (-t6 * t9 - 2.0 * t10) / (t4 * t4)
+    g1 = (t6 * t8 - t9) / (t4 * t6)
+    t11 = deltax * deltay * f1
+    t12 = deltax * deltay * g1
+    t13 = deltay * f + deltay * t2 * f1
+    t14 = deltax * f + deltax * t3 * f1
+
+    for r in range(3):
+        for c in range(3):
+            dH[0, r, c] = 0.0
+    dH[0, 0, 3] = deltax * f
+    dH[0, 1, 3] = deltay * f
+    dH[0, 2, 3] = g
+
+    dH[1, 0, 0] = 2.0 * deltax * f + deltax * t2 * f1
+    dH[1, 0, 1] = t13
+    dH[1, 0, 2] = -g - t2 * g1
+    dH[1, 0, 3] = s * (f + t2 * f1)
+    dH[1, 1, 0] = t13
+    dH[1, 1, 1] = deltax * t3 * f1
+    dH[1, 1, 2] = -t12
+    dH[1, 1, 3] = s * t11
+    dH[1, 2, 0] = g + t2 * g1
+    dH[1, 2, 1] = t12
+    dH[1, 2, 2] = -deltax * g
+    dH[1, 2, 3] = s * deltax * g1
+
+    dH[2, 0, 0] = deltay * t2 * f1
+    dH[2, 0, 1] = t14
+    dH[2, 0, 2] = -t12
+    dH[2, 0, 3] = s * t11
+    dH[2, 1, 0] = t14
+    dH[2, 1, 1] = 2.0 * deltay * f + deltay * t3 * f1
+    dH[2, 1, 2] = -g - t3 * g1
+    dH[2, 1, 3] = s * (f + t3 * f1)
+    dH[2, 2, 0] = t12
+    dH[2, 2, 1] = g + t3 * g1
+    dH[2, 2, 2] = -deltay * g
+    dH[2, 2, 3] = s * deltay * g1
+
+@jit
+def jacobian_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, J, T):
+    """
+    Jacobian_chain for (N, n) configurations: the (N, 6, 3n) tip Jacobians
+    into J and the (N, n, 4, 4) section tip transforms into T.
+
+    The kernel behind Jacobian_chain, for callers that run their own loop
+    on preallocated arrays: S, Deltax and Deltay are float64 arrays of shape
+    (N, n), strided views included, mount_c / mount_s come from
+    mount_cos_sin, and it is compiled only with the numba backend.
+    """
+    N, n = S.shape
+    dH = np.empty((3, 3, 4))
+    _fk_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, T)
+    for k in range(N):
+        for i in range(n):
+            c = mount_c[i]
+            sn = mount_s[i]
+            deltax = c * Deltax[k, i] - sn * Deltay[k, i]
+            deltay = sn * Deltax[k, i] + c * Deltay[k, i]
+            H = _section(S[k, i], deltax, deltay)
+            _section_derivatives(S[k, i], deltax, deltay, dH)
+            # Chain rule through the rotation of (deltax, deltay)
+            for r in range(3):
+                for m in range(4):
+                    a = dH[1, r, m]
+                    b = dH[2, r, m]
+                    dH[1, r, m] = c * a + sn * b
+                    dH[2, r, m] = -sn * a + c * b
+
+            for v in range(3):
+                # Local angular velocity vee(dR @ R^T) and translation derivative
+                D = dH[v]
+                w0 = 0.5 * (D[2, 0] * H[4] + D[2, 1] * H[5] + D[2, 2] * H[6]
+                            - D[1, 0] * H[8] - D[1, 1] * H[9] - D[1, 2] * H[10])
+                w1 = 0.5 * (D[0, 0] * H[8] + D[0, 1] * H[9] + D[0, 2] * H[10]
+                            - D[2, 0] * H[0] - D[2, 1] * H[1] - D[2, 2] * H[2])
+                w2 = 0.5 * (D[1, 0] * H[0] + D[1, 1] * H[1] + D[1, 2] * H[2]
+                            - D[0, 0] * H[4] - D[0, 1] * H[5] - D[0, 2] * H[6])
+                col = 3 * i + v
+                if i == 0:
+                    for r in range(3):
+                        J[k, r, col] = D[r, 3]
+                    J[k, 3, col] = w0
+                    J[k, 4, col] = w1
+                    J[k, 5, col] = w2
+                else:
+                    # Base frame: rotate by the orientation before the section
+                    P = T[k, i - 1]
+                    for r in range(3):
+                        J[k, r, col] = P[r, 0] * D[0, 3] + P[r, 1] * D[1, 3] + P[r, 2] * D[2, 3]
+                        J[k, 3 + r, col] = P[r, 0] * w0 + P[r, 1] * w1 + P[r, 2] * w2
+
+        # dp += w x (p_tip - p_next)
+        for i in range(n):
+            rx = T[k, n - 1, 0, 3] - T[k, i, 0, 3]
+            ry = T[k, n - 1, 1, 3] - T[k, i, 1, 3]
+            rz = T[k, n - 1, 2, 3] - T[k, i, 2, 3]
+            for v in range(3):
+                col = 3 * i + v
+                w0 = J[k, 3, col]
+                w1 = J[k, 4, col]
+                w2 = J[k, 5, col]
+                J[k, 0, col] += w1 * rz - w2 * ry
+                J[k, 1, col] += w2 * rx - w0 * rz
+                J[k, 2, col] += w0 * ry - w1 * rx
+
+@jit
+def _fk_l2s_kernel(L, d, out):
+    """
+    Real closed form of FK_L2S_cosimo_new for every section of L (N, 3n), written into out (N, 3n).
+    """
+    N, m = L.shape
+    t1 = 1.0 / (np.sqrt(3.0) * d)
+    t2 = 1.0 / (3.0 * d)
+    for k in range(N):
+        for j in range(0, m, 3):
+            l1 = L[k, j]
+            l2 = L[k, j + 1]
+            l3 = L[k, j + 2]
+            out[k, j] = (l1 + l2 + l3) / 3.0
+            out[k, j + 1] = (l2 - l3) * t1
+            out[k, j + 2] = (l2 + l3 - 2.0 * l1) * t2
+
+_BACKENDS = ('numba', 'numpy')
+_backend = 'numba' if numba is not None else 'numpy'
+
+def set_backend(name):
+    """
+    Select the kinematics backend: 'numba', 'numpy', or 'auto' for numba when installed.
+    """
+    global _backend
+    if name == 'auto':
+        name = 'numba' if numba is not None else 'numpy'
+    if name not in _BACKENDS:
+        raise ValueError(f"Invalid backend {name!r}. Supported backends are 'numba' and 'numpy'.")
+    if name == 'numba' and numba is None:
+        raise ValueError("The 'numba' backend requires Numba to be installed.")
+    _backend = name
+
+def get_backend():
+    return _backend
+
+def warmup():
+    """
+    Compile (or load from cache) the kernels, so that the first control cycle
+    does not pay for the JIT. Call it once at start-up.
+    """
+    if _backend != 'numba':
+        return
+    FK_S2X_cosimo_new(0.1, 0.1, 0.1)
+    FK_realrobot(np.full(3, 0.1), np.full(3, 0.1), np.full(3, 0.1))
+    FK_L2S_new_3sections(np.full(9, 0.1), 0.027)
+    Jacobian_chain(np.full(3, 0.1), np.full(3, 0.1), np.full(3, 0.1), kd2x.MOUNT_ANGLES_REALROBOT)
+
+# Allocation-free calls
+# ---------------------
+# With the numba backend, every function below writes into a caller-provided
+# out array without allocating any array of its own when
+#   - the inputs are C-contiguous float64 arrays that already have the batch
+#     dimension, i.e. (N, n) for the chains, (N,) for a single section and
+#     (N, 3n) for tendon lengths, and
+#   - out is a C-contiguous float64 array of the batched output shape.
+# The kernels keep their temporaries in registers, so no scratch buffers are
+# needed. A call still creates a few hundred bytes of small Python objects
+# (shape tuples, array views, numba's argument dispatch), which are freed on
+# return; none of them grows with N.
+#
+# Every other path writes into out but allocates arrays: inputs of another
+# dtype, layout or shape are converted (and copied) first, the numpy backend
+# allocates the intermediate terms of its expressions, and so do the complex
+# tendon maps and the legacy kinematics_l2delta.FK_L2S_jones /
+# FK_L2S_cosimo_old / FK_L2S_cosimo_new.
+
+# cos / sin of the mounting angles, per number of sections for aligned chains
+_MOUNT_REALROBOT = (np.cos(kd2x.MOUNT_ANGLES_REALROBOT), np.sin(kd2x.MOUNT_ANGLES_REALROBOT))
+_MOUNT_ALIGNED = {}
+
+def mount_cos_sin(mount_angles, n):
+    """
+    cos and sin of the mounting angles of an n-section chain, the form the
+    kernels take them in; None for aligned sections. The arrays for None
+    and kinematics_delta2x.MOUNT_ANGLES_REALROBOT are cached and must not
+    be modified.
+    """
+    if mount_angles is None:
+        if n not in _MOUNT_ALIGNED:
+            _MOUNT_ALIGNED[n] = (np.ones(n), np.zeros(n))
+        return _MOUNT_ALIGNED[n]
+    if mount_angles is kd2x.MOUNT_ANGLES_REALROBOT:
+        return _MOUNT_REALROBOT
+    mount_angles = np.asarray(mount_angles, dtype=float)
+    return np.cos(mount_angles), np.sin(mount_angles)
+
+def _batch(x, bshape, shape, dtype):
+    """
+    x broadcast to bshape as a C-contiguous array of the batched shape and dtype;
+    x itself when it already is one.
+    """
+    x = np.asarray(x, dtype)
+    if x.shape != shape or not x.flags.c_contiguous:
+        x = np.ascontiguousarray(np.broadcast_to(x, bshape).reshape(shape))
+    return x
+
+def _float_dtype(dtype, *arrays):
+    # float64 for integer inputs, float32 stays float32
+    return np.result_type(*arrays, 1.0) if dtype is None else np.dtype(dtype)
+
+def _broadcast_shape(a, b, c):
+    # np.broadcast builds a multi-iterator (several kB), so skip it for equal shapes
+    a, b, c = np.shape(a), np.shape(b), np.shape(c)
+    if a == b == c:
+        return a
+    return np.broadcast_shapes(a, b, c)
+
+def _out(out, shape):
+    """
+    out viewed with the batched shape; raises instead of reshaping into a copy.
+    """
+    if out.shape != shape:
+        out = out.view()
+        out.shape = shape
+    return out
+
+def FK_S2X_cosimo_new(s, deltax, deltay, out=None, dtype=None):
+    """
+    kinematics_delta2x.FK_S2X_cosimo_new on the selected backend, scalars -> (3, 4) or (N,) -> (N, 3, 4).
+    """
+    if _backend == 'numpy':
+        return kd2x.FK_S2X_cosimo_new(s, deltax, deltay, out, dtype)
+    s, deltax, deltay = np.asarray(s), np.asarray(deltax), np.asarray(deltay)
+    dtype = _float_dtype(dtype, s, deltax, deltay)
+    bshape = _broadcast_shape(s, deltax, deltay)
+    shape = (math.prod(bshape),)
+    s, deltax, deltay = (_batch(x, bshape, shape, dtype) for x in (s, deltax, deltay))
+    if out is None:
+        out = np.empty(shape + (3, 4), dtype)
+        _fk_s2x_kernel(s, deltax, deltay, out)
+        return out.reshape(bshape + (3, 4))
+    _fk_s2x_kernel(s, deltax, deltay, _out(out, shape + (3, 4)))
+    return out
+
+def FK_chain(S, Deltax, Deltay, mount_angles=None, out=None, dtype=None):
+    """
+    kinematics_delta2x.FK_chain on the selected backend, (n,) -> (n, 4, 4) or (N, n) -> (N, n, 4, 4).
+
+    float32 inputs (or dtype=np.float32) are evaluated in float64 registers
+    and stored as float32, so only the storage is rounded.
+    """
+    if _backend == 'numpy':
+        return kd2x.FK_chain(S, Deltax, Deltay, mount_angles, out, dtype)
+    S, Deltax, Deltay = np.asarray(S), np.asarray(Deltax), np.asarray(Deltay)
+    dtype = _float_dtype(dtype, S, Deltax, Deltay)
+    bshape = _broadcast_shape(S, Deltax, Deltay)
+    shape = (math.prod(bshape[:-1]), bshape[-1])
+    S, Deltax, Deltay = (_batch(x, bshape, shape, dtype) for x in (S, Deltax, Deltay))
+    mount_c, mount_s = mount_cos_sin(mount_angles, shape[1])
+    if out is None:
+        out = np.empty(shape + (4, 4), dtype)
+        _fk_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, out)
+        return out.reshape(bshape + (4, 4))
+    _fk_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, _out(out, shape + (4, 4)))
+    return out
+
+def FK_realrobot(S, Deltax, Deltay, out=None, dtype=None):
+    """
+    kinematics_delta2x.FK_realrobot on the selected backend, (3,) -> (12, 4) or (N, 3) -> (N, 12, 4).
+    """
+    if _backend == 'numpy':
+        return kd2x.FK_realrobot(S, Deltax, Deltay, out, dtype)
+    if out is None:
+        T = FK_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, dtype=dtype)
+        return T.reshape(T.shape[:-3] + (12, 4))
+    FK_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, _out(out, out.shape[:-2] + (3, 4, 4)), dtype)
+    return out
+
+def Jacobian_chain(S, Deltax, Deltay, mount_angles=None, return_T=False, out=None):
+    """
+    kinematics_delta2x.Jacobian_chain on the selected backend, (n,) -> (6, 3n) or (N, n) -> (N, 6, 3n).
+
+    out: Optional (J, T) pair of float64 arrays of the batched shapes
+         (N, 6, 3n) and (N, n, 4, 4) to write the Jacobians and the section
+         tip transforms into; without return_T, T is still filled.
+
+    Unlike the FK kernels, the kernel allocates one (3, 3, 4) scratch array
+    of section derivatives per call.
+    """
+    if _backend == 'numpy':
+        result = kd2x.Jacobian_chain(S, Deltax, Deltay, mount_angles, return_T=True)
+        if out is not None:
+            out[0][...] = result[0]
+            out[1][...] = result[1]
+            result = out
+        return result if return_T else result[0]
+    S, Deltax, Deltay = np.asarray(S), np.asarray(Deltax), np.asarray(Deltay)
+    bshape = _broadcast_shape(S, Deltax, Deltay)
+    shape = (math.prod(bshape[:-1]), bshape[-1])
+    S, Deltax, Deltay = (_batch(x, bshape, shape, np.float64) for x in (S, Deltax, Deltay))
+    mount_c, mount_s = mount_cos_sin(mount_angles, shape[1])
+    if out is None:
+        J = np.empty((shape[0], 6, 3 * shape[1]))
+        T = np.empty(shape + (4, 4))
+        jacobian_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, J, T)
+        J = J.reshape(bshape[:-1] + J.shape[1:])
+        T = T.reshape(bshape + (4, 4))
+    else:
+        J, T = out
+        jacobian_chain_kernel(S, Deltax, Deltay, mount_c, mount_s, _out(J, (shape[0], 6, 3 * shape[1])),
+                               _out(T, shape + (4, 4)))
+    return (J, T) if return_T else J
+
+def FK_L2S_cosimo_new_real(L, d, out=None, dtype=None):
+    """
+    kinematics_l2delta.FK_L2S_cosimo_new_real on the selected backend, (3,) or (N, 3).
+    """
+    if _backend == 'numpy':
+        return kl2d.FK_L2S_cosimo_new_real(L, d, out, dtype)
+    return _fk_l2s(L, d, out, dtype)
+
+def FK_L2S_new_3sections(in1, d, out=None, dtype=None):
+    """
+    kinematics_l2delta.FK_L2S_new_3sections on the selected backend, (9,) or (N, 9).
+    """
+    if _backend == 'numpy' or np.iscomplexobj(in1):
+        return kl2d.FK_L2S_new_3sections(in1, d, out, dtype)
+    return _fk_l2s(in1, d, out, dtype)
+
+def _fk_l2s(L, d, out, dtype):
+    L = np.asarray(L)
+    dtype = _float_dtype(dtype, L)
+    shape = (L.size // L.shape[-1], L.shape[-1])
+    bshape = L.shape
+    L = _batch(L, bshape, shape, dtype)
+    if out is None:
+        out = np.empty(shape, dtype)
+        _fk_l2s_kernel(L, float(d), out)
+        return out.reshape(bshape)
+    _fk_l2s_kernel(L, float(d), _out(out, shape))
+    return out
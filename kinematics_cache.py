@@ -0,0 +1,86 @@
+import numpy as np
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'hit_rate'])
+
+class QuantizedCache:
+    """
+    LRU memoisation of a kinematics function on quantised inputs.
+
+    Each positional argument is rounded to a multiple of its resolution to
+    form the key, and a miss evaluates the function at the original inputs.
+    A cached result is therefore the exact result for inputs that differ
+    from the current ones by less than one resolution per coordinate. The
+    rounded values are never passed on, so a near-straight section (|delta|
+    below resolution / 2) is not rounded onto the 0/0 point of the PCC maps.
+    While the arm is still, repeated calls with sensor noise below the
+    resolution become a dictionary lookup.
+
+    Example:
+        FK = QuantizedCache(kd2x.FK_realrobot, resolution=(1e-6, 1e-5, 1e-5))
+        T = FK(S, Deltax, Deltay)
+        L2S = QuantizedCache(kl2d.FK_L2S_new_3sections, resolution=(1e-6, None))
+
+    Args:
+        func: Function of array arguments, e.g. FK_realrobot or FK_L2S_new_3sections.
+        resolution: Quantisation step, one for all positional arguments or a
+                    tuple with one per argument; None keys an argument exactly.
+                    Calls with a different number of arguments than the tuple
+                    raise a ValueError.
+        maxsize: Number of results kept; the least recently used is evicted.
+
+    Cached results are returned read-only and shared between calls; copy
+    them before modifying.
+    """
+
+    def __init__(self, func, resolution=1e-6, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.func = func
+        self.resolution = resolution
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _quantize(self, args):
+        if isinstance(self.resolution, (tuple, list)):
+            if len(self.resolution) != len(args):
+                raise ValueError(f"Expected {len(self.resolution)} arguments, one per resolution, got {len(args)}.")
+            resolutions = self.resolution
+        else:
+            resolutions = (self.resolution,) * len(args)
+        key = []
+        for x, r in zip(args, resolutions):
+            x = np.asarray(x, dtype=float)
+            key.append(x.tobytes() if r is None else np.rint(x / r).astype(np.int64).tobytes())
+            key.append(x.shape)
+        return tuple(key)
+
+    def __call__(self, *args):
+        key = self._quantize(args)
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = np.asarray(self.func(*args))
+        result.setflags(write=False)
+        self._cache[key] = result
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def cache_info(self):
+        """
+        Hit and miss counts, sizes and the hit rate, like functools.lru_cache.
+        """
+        calls = self.hits + self.misses
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache),
+                         self.hits / calls if calls else 0.0)
+
+    def cache_clear(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,21 +1,54 @@
 import numpy as np
 
-def FK_S2X_jones(s, k, phi):
+def _assemble(data, rows, cols, out=None):
+    """
+    Write MATLAB column-major output entries into an array of shape (..., rows, cols).
+
+    The entries may be scalars or arrays and are broadcast against each other,
+    so scalar inputs give a single (rows, cols) matrix while (N,) inputs give
+    an (N, rows, cols) stack. A given out array is filled instead of a new one.
+    """
+    if out is not None:
+        for i, x in enumerate(data):
+            out[..., i % rows, i // rows] = x
+        return out
+    shapes = {x.shape for x in data if isinstance(x, np.ndarray)}
+    if len(shapes) > 1:
+        shape = np.broadcast_shapes(*shapes)
+    else:
+        shape = shapes.pop() if shapes else ()
+    if not shape:
+        return np.reshape(data, (rows, cols), order='F')
+    out = np.empty(shape + (rows, cols), dtype=np.result_type(*data))
+    for i, x in enumerate(data):
+        out[..., i % rows, i // rows] = x
+    return out
+
+def FK_S2X_jones(s, k, phi, out=None, dtype=None):
     """
     Compute the forward kinematics using the FK_S2X_jones method.
     
     Parameters:
-    s : float
+    s : float or array_like
         Input parameter s.
-    k : float
+    k : float or array_like
         Input parameter k.
-    phi : float
+    phi : float or array_like
         Input parameter phi (angle in radians).
+    The inputs are broadcast against each other, so (N,) arrays evaluate N
+    configurations in one pass.
+    out : numpy.ndarray, optional
+        Array of the output shape to write the result into.
+    dtype : numpy dtype, optional
+        Floating dtype of the computation, e.g. np.float32; defaults to the
+        dtype of the inputs.
     
     Returns:
     out1 : numpy.ndarray
-        Output matrix of shape (3, 4).
+        Output matrix of shape (3, 4), or (..., 3, 4) for array inputs.
     """
+    s, k, phi = np.asarray(s, dtype), np.asarray(k, dtype), np.asarray(phi, dtype)
+
     # Compute trigonometric and intermediate terms
     t2 = np.cos(phi)
     t3 = np.sin(phi)
@@ -31,33 +64,42 @@ def FK_S2X_jones(s, k, phi):
     t13 = t5 * t9
 
     # Compute the reshaped output matrix
-    out1 = np.reshape(
+    out1 = _assemble(
     [
         t13 + 1.0, t12, t10, t12,
         t6 - t13, t11, -t10, -t11,
         t6, t2 * t8 * t9, t3 * t8 * t9, t7 * t8
     ],
-    (3, 4),order='F'
+    3, 4, out
     )
     
     return out1
 
-def FK_S2X_cosimo_old(s, phi, theta):
+def FK_S2X_cosimo_old(s, phi, theta, out=None, dtype=None):
     """
     Compute the forward kinematics using the FK_S2X_cosimo_old method.
     
     Parameters:
-    s : float
+    s : float or array_like
         Input parameter s.
-    phi : float
+    phi : float or array_like
         Input parameter phi (angle in radians).
-    theta : float
+    theta : float or array_like
         Input parameter theta (angle in radians).
+    The inputs are broadcast against each other, so (N,) arrays evaluate N
+    configurations in one pass.
+    out : numpy.ndarray, optional
+        Array of the output shape to write the result into.
+    dtype : numpy dtype, optional
+        Floating dtype of the computation, e.g. np.float32; defaults to the
+        dtype of the inputs.
     
     Returns:
     out1 : numpy.ndarray
-        Output matrix of shape (3, 4).
+        Output matrix of shape (3, 4), or (..., 3, 4) for array inputs.
     """
+    s, phi, theta = np.asarray(s, dtype), np.asarray(phi, dtype), np.asarray(theta, dtype)
+
     # Compute trigonometric terms
     t2 = np.cos(phi)
     t3 = np.cos(theta)
@@ -70,28 +112,37 @@ def FK_S2X_cosimo_old(s, phi, theta):
     t10 = t2 * t4 * t9
     
     # Compute the reshaped output matrix
-    out1 = np.reshape(
+    out1 = _assemble(
     [
         t2**2 * t9 + 1.0, t10, -t7, t10,
         t4**2 * t9 + 1.0, -t8, t7, t8,
         t3, -s * t2 * t6 * t9, -s * t4 * t6 * t9, s * t5 * t6
     ],
-    (3, 4),order='F'
+    3, 4, out
     )
     return out1
 
-def FK_S2X_cosimo_new(s, deltax, deltay):
+def FK_S2X_cosimo_new(s, deltax, deltay, out=None, dtype=None):
     """
     Python translation of FK_S2X_cosimo_new.
     
     Args:
-        s: Scalar input representing some parameter.
-        deltax: Scalar input for displacement in the x direction.
-        deltay: Scalar input for displacement in the y direction.
+        s: Scalar or array input representing some parameter.
+        deltax: Scalar or array input for displacement in the x direction.
+        deltay: Scalar or array input for displacement in the y direction.
+        Array inputs are broadcast against each other, so (N,) arrays
+        evaluate N configurations in one pass.
+        out: Optional array of the output shape to write the result into.
+             The NumPy code still allocates its intermediate terms;
+             kinematics_backend with numba is the allocation-free path.
+        dtype: Optional floating dtype of the computation, e.g. np.float32;
+               by default the dtype of the inputs.
     
     Returns:
-        out1: A 3x4 numpy array.
+        out1: A 3x4 numpy array, or a (..., 3, 4) stack for array inputs.
     """
+    s, deltax, deltay = np.asarray(s, dtype), np.asarray(deltax, dtype), np.asarray(deltay, dtype)
+
     # 计算中间变量
     t2 = deltax ** 2
     t3 = deltay ** 2
@@ -101,7 +152,7 @@ def FK_S2X_cosimo_new(s, deltax, deltay):
     t7 = 1.0 / t6
     t8 = np.cos(t6)
     t9 = np.sin(t6)
-    t10 = t8 - 1.0
+    t10 = -2.0 * np.sin(0.5 * t6) ** 2  # cos(t6) - 1 without cancellation near straight
     t11 = deltax * t7 * t9
     t12 = deltay * t7 * t9
     t13 = deltax * deltay * t5 * t10
@@ -115,20 +166,217 @@ def FK_S2X_cosimo_new(s, deltax, deltay):
     ]
 
     # 按 MATLAB reshape 逻辑，转换为 3x4 矩阵
-    out1 = np.reshape(data, (3, 4), order='F')  # MATLAB 的列优先模式为 'F'
+    out1 = _assemble(data, 3, 4, out)  # MATLAB 的列优先模式, 支持批量输入
 
     return out1
 
-def FK_realrobot(S,Deltax,Deltay):
-    deltax1 = Deltax[0]
-    deltax2 = Deltax[1]
-    deltay1 = Deltay[0]
-    deltax3 = Deltax[2]
-    deltay2 = Deltay[1]
-    deltay3 = Deltay[2]
-    s1 = S[0]
-    s2 = S[1]
-    s3 = S[2]
+def dFK_S2X_cosimo_new(s, deltax, deltay):
+    """
+    Analytic derivatives of FK_S2X_cosimo_new.
+
+    Args:
+        s, deltax, deltay: Scalars or broadcastable arrays, as in FK_S2X_cosimo_new.
+
+    Returns:
+        dout1: Array of shape (3, 3, 4), or (..., 3, 3, 4) for array inputs,
+               holding d(out1)/ds, d(out1)/ddeltax and d(out1)/ddeltay.
+    """
+    s, deltax, deltay = np.asarray(s), np.asarray(deltax), np.asarray(deltay)
+
+    t2 = deltax ** 2
+    t3 = deltay ** 2
+    t4 = t2 + t3
+    t6 = np.sqrt(t4)
+    t8 = np.cos(t6)
+    t9 = np.sin(t6)
+    t10 = t8 - 1.0
+    f = t10 / t4                                  # (cos(delta) - 1) / delta^2
+    g = t9 / t6                                   # sin(delta) / delta
+    f1 = (-t6 * t9 - 2.0 * t10) / (t4 * t4)       # f'(delta) / delta
+    g1 = (t6 * t8 - t9) / (t4 * t6)               # g'(delta) / delta
+    t11 = deltax * deltay * f1
+    t12 = deltax * deltay * g1
+    t13 = deltay * f + deltay * t2 * f1
+    t14 = deltax * f + deltax * t3 * f1
+
+    ddeltax = [
+        2.0 * deltax * f + deltax * t2 * f1, t13, g + t2 * g1,
+        t13, deltax * t3 * f1, t12,
+        -g - t2 * g1, -t12, -deltax * g,
+        s * (f + t2 * f1), s * t11, s * deltax * g1
+    ]
+    ddeltay = [
+        deltay * t2 * f1, t14, t12,
+        t14, 2.0 * deltay * f + deltay * t3 * f1, g + t3 * g1,
+        -t12, -g - t3 * g1, -deltay * g,
+        s * t11, s * (f + t3 * f1), s * deltay * g1
+    ]
+    ddeltax = _assemble(ddeltax, 3, 4)
+    dout1 = np.zeros(ddeltax.shape[:-2] + (3, 3, 4), dtype=ddeltax.dtype)
+    dout1[..., 0, 0, 3] = deltax * f          # only the translation depends on s
+    dout1[..., 0, 1, 3] = deltay * f
+    dout1[..., 0, 2, 3] = g
+    dout1[..., 1, :, :] = ddeltax
+    dout1[..., 2, :, :] = _assemble(ddeltay, 3, 4)
+    return dout1
+
+def _compose_chain(H, out=None):
+    """
+    Compose (..., n, 3, 4) section transforms into (..., n, 4, 4) base-frame transforms.
+    """
+    n = H.shape[-3]
+    T = np.empty(H.shape[:-2] + (4, 4), dtype=H.dtype) if out is None else out
+    T[..., 3, :3] = 0.0
+    T[..., 3, 3] = 1.0
+    T[..., 0, :3, :] = H[..., 0, :, :]
+    for i in range(1, n):
+        T[..., i, :3, :] = T[..., i - 1, :3, :3] @ H[..., i, :, :]
+        T[..., i, :3, 3] += T[..., i - 1, :3, 3]
+    return T
+
+# Mounting angles of the three sections of the real robot, as used by FK_realrobot
+MOUNT_ANGLES_REALROBOT = np.deg2rad([0.0, -30.0, -60.0])
+
+def _mount(Deltax, Deltay, mount_angles):
+    """
+    Rotate (Deltax, Deltay) of every section by its mounting angle about z.
+
+    Returns the rotated Deltax, Deltay and the (n,) cosines and sines of the
+    mounting angles, in the precision of the inputs.
+    """
+    dtype = np.result_type(Deltax, Deltay, 1.0)
+    c = np.cos(mount_angles).astype(dtype)
+    s = np.sin(mount_angles).astype(dtype)
+    return c * Deltax - s * Deltay, s * Deltax + c * Deltay, c, s
+
+def FK_chain(S, Deltax, Deltay, mount_angles=None, out=None, dtype=None):
+    """
+    Forward kinematics of a chain of n PCC sections.
+
+    Section i is mounted on the tip of section i-1 rotated by mount_angles[i]
+    about the z axis, with its tip frame reported in the base orientation:
+        T_i = T_{i-1} @ Rz(a_i) @ H(s_i, deltax_i, deltay_i) @ Rz(-a_i)
+    A PCC section commutes with rotations about z, so the mounting is applied
+    by rotating (deltax_i, deltay_i) before a single batched call to
+    FK_S2X_cosimo_new, and the sections are then composed with batched
+    matrix products.
+
+    Args:
+        S: Section lengths, shape (n,) or (N, n).
+        Deltax: Configuration variables in the x direction, shape (n,) or (N, n).
+        Deltay: Configuration variables in the y direction, shape (n,) or (N, n).
+        mount_angles: Mounting angle of each section in radians, shape (n,),
+                      or None for aligned sections. MOUNT_ANGLES_REALROBOT
+                      reproduces FK_realrobot.
+        out: Optional (n, 4, 4) or (N, n, 4, 4) array to write the result into.
+             The NumPy code still allocates its intermediate terms;
+             kinematics_backend with numba is the allocation-free path.
+        dtype: Optional floating dtype of the computation, see FK_realrobot.
+
+    Returns:
+        T: Homogeneous transforms of every section tip in the base frame,
+           shape (n, 4, 4) or (N, n, 4, 4); T[..., -1, :, :] is the robot tip.
+           T.reshape(..., 4 * n, 4) has the layout of FK_realrobot.
+    """
+    S, Deltax, Deltay = np.asarray(S, dtype), np.asarray(Deltax, dtype), np.asarray(Deltay, dtype)
+    if mount_angles is not None:
+        Deltax, Deltay, _, _ = _mount(Deltax, Deltay, mount_angles)
+
+    # Section transforms in their mounting frames, shape (..., n, 3, 4)
+    H = FK_S2X_cosimo_new(S, Deltax, Deltay)
+
+    return _compose_chain(H, out)
+
+def _arc(s, deltax, deltay):
+    """
+    Rotation (..., 3, 3) and tip position (..., 3) of FK_S2X_cosimo_new,
+    written with sinc so that straight sections (deltax = deltay = 0) are exact.
+    """
+    delta = np.hypot(deltax, deltay)
+    f = -0.5 * np.sinc(delta / (2 * np.pi)) ** 2   # (cos(delta) - 1) / delta^2
+    g = np.sinc(delta / np.pi)                     # sin(delta) / delta
+    R = np.empty(delta.shape + (3, 3), dtype=delta.dtype)
+    R[..., 0, 0] = 1.0 + f * deltax ** 2
+    R[..., 0, 1] = f * deltax * deltay
+    R[..., 0, 2] = -g * deltax
+    R[..., 1, 0] = R[..., 0, 1]
+    R[..., 1, 1] = 1.0 + f * deltay ** 2
+    R[..., 1, 2] = -g * deltay
+    R[..., 2, 0] = g * deltax
+    R[..., 2, 1] = g * deltay
+    R[..., 2, 2] = np.cos(delta)
+    p = np.stack([deltax * s * f, deltay * s * f, s * g], axis=-1)
+    return R, p
+
+def backbone(S, Deltax, Deltay, mount_angles=None, n_points=20, return_frames=False):
+    """
+    Points along the backbone of every section of a PCC chain.
+
+    The point at fraction m of section i is the tip of a section of length
+    m * s_i bent by m * (deltax_i, deltay_i), so all samples of all sections
+    are evaluated in one array expression; only the n section bases are
+    composed in a loop, as in FK_chain.
+
+    Args:
+        S, Deltax, Deltay, mount_angles: As in FK_chain, shape (n,) or (N, n).
+        n_points: Samples per section, from its base (m = 0) to its tip (m = 1).
+        return_frames: If True, also return the backbone frames.
+
+    Returns:
+        points: Backbone positions in the base frame, shape (n, n_points, 3)
+                or (N, n, n_points, 3); points[..., -1, -1, :] is the robot tip.
+        frames: Only if return_frames, the backbone orientations, shape
+                (..., n, n_points, 3, 3), e.g. to place the cross-section circles.
+    """
+    S, Deltax, Deltay = np.asarray(S, dtype=float), np.asarray(Deltax), np.asarray(Deltay)
+    if mount_angles is not None:
+        Deltax, Deltay, _, _ = _mount(Deltax, Deltay, mount_angles)
+    S, Deltax, Deltay = np.broadcast_arrays(S, Deltax, Deltay)
+
+    # Partial arcs of every section at every sample, shape (..., n, n_points)
+    m = np.linspace(0.0, 1.0, n_points)
+    R, p = _arc(S[..., None] * m, Deltax[..., None] * m, Deltay[..., None] * m)
+
+    # Base frames of the sections: section i starts at the tip (m = 1) of section i-1
+    n = S.shape[-1]
+    base_R = np.empty(S.shape + (3, 3))
+    base_p = np.empty(S.shape + (3,))
+    base_R[..., 0, :, :] = np.eye(3)
+    base_p[..., 0, :] = 0.0
+    for i in range(1, n):
+        base_R[..., i, :, :] = base_R[..., i - 1, :, :] @ R[..., i - 1, -1, :, :]
+        base_p[..., i, :] = base_p[..., i - 1, :] + (base_R[..., i - 1, :, :] @ p[..., i - 1, -1, :, None])[..., 0]
+
+    points = base_p[..., None, :] + (base_R[..., None, :, :] @ p[..., None])[..., 0]
+    if return_frames:
+        return points, base_R[..., None, :, :] @ R
+    return points
+
+def FK_realrobot(S,Deltax,Deltay,out=None,dtype=None):
+    """
+    Forward kinematics of the three-section robot.
+
+    Args:
+        S: Section lengths [s1, s2, s3], or an (N, 3) array.
+        Deltax: Configuration variables [deltax1, deltax2, deltax3], or (N, 3).
+        Deltay: Configuration variables [deltay1, deltay2, deltay3], or (N, 3).
+        out: Optional (12, 4) or (N, 12, 4) array to write the result into.
+             The NumPy code still allocates its intermediate terms;
+             kinematics_backend with numba is the allocation-free path.
+        dtype: Optional floating dtype of the computation, e.g. np.float32 to
+               halve the memory of large batches; by default the dtype of the
+               inputs. Over the sampled workspace (s <= 0.1 m, |deltax|,
+               |deltay| <= 1.5) float32 results stay within 1e-6 of float64,
+               in metres for the positions; see test_code/precision_benchmark.py.
+
+    Returns:
+        A 12x4 array stacking the homogeneous transforms of the three section
+        tips in the base frame, or an (N, 12, 4) stack for (N, 3) inputs.
+    """
+    S, Deltax, Deltay = np.asarray(S, dtype), np.asarray(Deltax, dtype), np.asarray(Deltay, dtype)
+    deltax1, deltax2, deltax3 = Deltax.T
+    deltay1, deltay2, deltay3 = Deltay.T
+    s1, s2, s3 = S.T
 
     t2 = deltax1 ** 2
     t3 = deltax2 ** 2
@@ -136,7 +384,7 @@ def FK_realrobot(S,Deltax,Deltay):
     t5 = deltax3 ** 2
     t6 = deltay2 ** 2
     t7 = deltay3 ** 2
-    t8 = np.sqrt(3.0)
+    t8 = 3.0 ** 0.5  # Python float, keeps float32 inputs in float32
     t9 = t2 + t4
     t10 = t3 + t6
     t11 = t5 + t7
@@ -155,9 +403,21 @@ def FK_realrobot(S,Deltax,Deltay):
     t24 = np.sin(t15)
     t25 = np.sin(t16)
     t26 = np.sin(t17)
-    t27 = t21 - 1.0
-    t28 = t22 - 1.0
-    t29 = t23 - 1.0
+    # cos - 1 without cancellation for nearly straight sections
+    t27 = -2.0 * np.sin(0.5 * t15) ** 2
+    t28 = -2.0 * np.sin(0.5 * t16) ** 2
+    t29 = -2.0 * np.sin(0.5 * t17) ** 2
+    t161 = deltax2 * t19 * t25
+    t162 = deltay2 * t19 * t25
+    t163 = deltax2 * deltay2 * t13 * t28
+    t164 = deltax2 * s2 * t13 * t28
+    t165 = deltay2 * s2 * t13 * t28
+    t166 = deltax3 * t20 * t26
+    t167 = deltay3 * t20 * t26
+    t168 = deltax3 * deltay3 * t14 * t29
+    t169 = s3 * t20 * t26
+    t170 = deltax3 * s3 * t14 * t29
+    t171 = deltay3 * s3 * t14 * t29
     t30 = t21 * t22
     t31 = deltax1 * t18 * t24
     t32 = deltay1 * t18 * t24
@@ -181,10 +441,10 @@ def FK_realrobot(S,Deltax,Deltay):
     t61 = t22 * t32
     t67 = t62 / 2.0
     t68 = t63 / 2.0
-    t69 = deltax2 * t19 * t25 * t31
-    t70 = deltay2 * t19 * t25 * t31
-    t71 = deltax2 * t19 * t25 * t32
-    t72 = deltay2 * t19 * t25 * t32
+    t69 = t161 * t31
+    t70 = t162 * t31
+    t71 = t161 * t32
+    t72 = t162 * t32
     t73 = s2 * t19 * t25 * t31
     t74 = s2 * t19 * t25 * t32
     t45 = t34 / 2.0
@@ -200,48 +460,49 @@ def FK_realrobot(S,Deltax,Deltay):
     t59 = t8 * t34 * (-1.0 / 2.0)
     t77 = -t73
     t78 = -t74
-    t79 = deltax2 * t19 * t25 * t43
-    t81 = deltax2 * t19 * t25 * t44
+    t79 = t161 * t43
+    t81 = t161 * t44
     t84 = t72 * (-1.0 / 2.0)
     t86 = t44 + t57
     t58 = t8 * t45
     t65 = (t8 * t46) / 2.0
     t66 = (t8 * t47) / 2.0
+    t172 = t45 - t65
     t85 = t43 + t56
     t90 = t53 + t59 + 1.0 / 2.0
-    t92 = deltax2 * t19 * t25 * t86
-    t96 = deltax2 * deltay2 * t13 * t28 * t86
-    t97 = deltax2 * s2 * t13 * t28 * t86
+    t92 = t161 * t86
+    t96 = t163 * t86
+    t97 = t164 * t86
     t103 = t48 * t86
     t87 = t45 + t66
     t88 = t52 + t58 + 1.0 / 2.0
-    t91 = deltay2 * t19 * t25 * t85
-    t94 = deltax2 * deltay2 * t13 * t28 * t85
-    t95 = deltay2 * s2 * t13 * t28 * t85
+    t91 = t162 * t85
+    t94 = t163 * t85
+    t95 = t165 * t85
     t98 = -t96
     t100 = -t97
     t101 = t49 * t85
     t102 = t96 / 2.0
-    t107 = -deltax2 * t19 * t25 * (t45 - t65)
-    t108 = deltax2 * t19 * t25 * t90
+    t107 = -t161 * t172
+    t108 = t161 * t90
     t109 = -t103
     t113 = t103 / 2.0
-    t116 = deltax2 * deltay2 * t13 * t28 * t90
-    t117 = deltax2 * s2 * t13 * t28 * t90
-    t121 = -deltax2 * s2 * t13 * t28 * (t45 - t65)
-    t129 = deltax2 * deltay2 * t13 * t28 * (t45 - t65) * (-1.0 / 2.0)
+    t116 = t163 * t90
+    t117 = t164 * t90
+    t121 = -t164 * t172
+    t129 = t163 * t172 * (-1.0 / 2.0)
     t133 = t48 * t90
-    t134 = (deltax2 * deltay2 * t13 * t28 * (t45 - t65)) / 2.0
+    t134 = (t163 * t172) / 2.0
     t93 = -t91
     t99 = t94 / 2.0
     t104 = -t102
-    t105 = deltay2 * t19 * t25 * t87
-    t106 = deltay2 * t19 * t25 * t88
+    t105 = t162 * t87
+    t106 = t162 * t88
     t110 = t101 / 2.0
-    t111 = deltax2 * deltay2 * t13 * t28 * t88
-    t112 = deltay2 * s2 * t13 * t28 * t88
-    t114 = deltax2 * deltay2 * t13 * t28 * t87
-    t115 = deltay2 * s2 * t13 * t28 * t87
+    t111 = t163 * t88
+    t112 = t165 * t88
+    t114 = t163 * t87
+    t115 = t165 * t87
     t118 = -t108
     t119 = -t113
     t124 = -t117
@@ -263,8 +524,8 @@ def FK_realrobot(S,Deltax,Deltay):
     t145 = t61 + t105 + t118
     t146 = (t8 * t142) / 2.0
     t147 = (t8 * t143) / 2.0
-    t153 = t8 * (t69 - t111 + t48 * (t45 - t65)) * (-1.0 / 2.0)
-    t154 = t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65)) * (-1.0 / 2.0)
+    t153 = t8 * (t69 - t111 + t48 * t172) * (-1.0 / 2.0)
+    t154 = t8 * (t70 - t128 + t163 * t172) * (-1.0 / 2.0)
     t130 = -t125
     t140 = -t137
     t148 = -t146
@@ -276,77 +537,63 @@ def FK_realrobot(S,Deltax,Deltay):
     t158 = t68 + t104 + t110 + t148
     t160 = t81 + t130 + t139 + t156
 
+    t173 = t79 - t123 + (t8 * (t70 - t128 + t163 * t172)) / 2.0 + (t48 * t172) / 2.0
+    t174 = t70 / 2.0 + t134 + t140 + t153
+    t175 = t72 / 2.0 + t126 - t136 - t155
+
     # mt1, mt2, mt3, mt4, mt5, mt6 are arrays created as per the MATLAB code
     mt1 = [
         t46, t34, t31, 0.0,
         t70 * (-1.0 / 2.0) + t129 + t137 + t153,
         t84 + t131 + t136 - t155,
         t68 + t104 + t110 + t146, 0.0,
-        t8 * (t51 * (t79 - t123 + (t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65))) / 2.0 +
-                    (t48 * (t45 - t65)) / 2.0) +
-            deltay3 * t20 * t26 * t144 -
-            deltax3 * deltay3 * t14 * t29 * (t70 / 2.0 + t134 + t140 + t153)) * (-1.0 / 2.0) +
-        (t50 * (t70 / 2.0 + t134 + t140 + t153)) / 2.0 -
-        (deltax3 * t20 * t26 * t144) / 2.0 -
-        (deltax3 * deltay3 * t14 * t29 * (t79 - t123 + (t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65))) / 2.0 +
-                                        (t48 * (t45 - t65)) / 2.0)) / 2.0
+        t8 * (t51 * t173 + t167 * t144 - t168 * t174) * (-1.0 / 2.0) +
+        (t50 * t174) / 2.0 -
+        (t166 * t144) / 2.0 -
+        (t168 * t173) / 2.0
     ]
 
     mt2 = [
-        (t50 * (t72 / 2.0 + t126 - t136 - t155)) / 2.0 -
-        (t8 * (t51 * t160 + deltay3 * t20 * t26 * t145 -
-            deltax3 * deltay3 * t14 * t29 * (t72 / 2.0 + t126 - t136 - t155))) / 2.0 -
-        (deltax3 * t20 * t26 * t145) / 2.0 -
-        (deltax3 * deltay3 * t14 * t29 * t160) / 2.0,
-        (t8 * (t51 * t157 + deltay3 * t20 * t26 * t141 -
-            deltax3 * deltay3 * t14 * t29 * t158)) / 2.0 -
+        (t50 * t175) / 2.0 -
+        (t8 * (t51 * t160 + t167 * t145 - t168 * t175)) / 2.0 -
+        (t166 * t145) / 2.0 -
+        (t168 * t160) / 2.0,
+        (t8 * (t51 * t157 + t167 * t141 - t168 * t158)) / 2.0 -
         (t50 * t158) / 2.0 +
-        (deltax3 * t20 * t26 * t141) / 2.0 +
-        (deltax3 * deltay3 * t14 * t29 * t157) / 2.0,
+        (t166 * t141) / 2.0 +
+        (t168 * t157) / 2.0,
         0.0, t34, t47, t32, 0.0,
-        t79 - t123 + t154 + (t48 * (t45 - t65)) / 2.0,
+        t79 - t123 + t154 + (t48 * t172) / 2.0,
         t81 + t130 + t139 - t156,
         -t67 - t99 + t113 + t147, 0.0
     ]
 
     mt3 = [
-        (t8 * (-t50 * (t70 / 2.0 + t134 + t140 + t153) + deltax3 * t20 * t26 * t144 +
-            deltax3 * deltay3 * t14 * t29 * (t79 - t123 +
-                                            (t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65))) / 2.0 +
-                                            (t48 * (t45 - t65)) / 2.0))) / 2.0 -
-        (t51 * (t79 - t123 +
-                (t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65))) / 2.0 +
-                (t48 * (t45 - t65)) / 2.0)) / 2.0 -
-        (deltay3 * t20 * t26 * t144) / 2.0 +
-        (deltax3 * deltay3 * t14 * t29 * (t70 / 2.0 + t134 + t140 + t153)) / 2.0
+        (t8 * (-t50 * t174 + t166 * t144 + t168 * t173)) / 2.0 -
+        (t51 * t173) / 2.0 -
+        (t167 * t144) / 2.0 +
+        (t168 * t174) / 2.0
     ]
 
     mt4 = [
         t51 * t160 * (-1.0 / 2.0) +
-        (t8 * (-t50 * (t72 / 2.0 + t126 - t136 - t155) + deltax3 * t20 * t26 * t145 +
-            deltax3 * deltay3 * t14 * t29 * t160)) / 2.0 -
-        (deltay3 * t20 * t26 * t145) / 2.0 +
-        (deltax3 * deltay3 * t14 * t29 * (t72 / 2.0 + t126 - t136 - t155)) / 2.0,
-        t8 * (-t50 * t158 + deltax3 * t20 * t26 * t141 +
-            deltax3 * deltay3 * t14 * t29 * t157) * (-1.0 / 2.0) +
+        (t8 * (-t50 * t175 + t166 * t145 + t168 * t160)) / 2.0 -
+        (t167 * t145) / 2.0 +
+        (t168 * t175) / 2.0,
+        t8 * (-t50 * t158 + t166 * t141 + t168 * t157) * (-1.0 / 2.0) +
         (t51 * t157) / 2.0 +
-        (deltay3 * t20 * t26 * t141) / 2.0 -
-        (deltax3 * deltay3 * t14 * t29 * t158) / 2.0,
+        (t167 * t141) / 2.0 -
+        (t168 * t158) / 2.0,
         0.0, -t31, -t32, t21, 0.0,
-        -t60 - t106 + deltax2 * t19 * t25 * (t45 - t65),
+        -t60 - t106 + t161 * t172,
         -t61 - t105 + t108,
         t141, 0.0
     ]
 
     mt5 = [
-        -t23 * t144 - deltax3 * t20 * t26 * (t70 / 2.0 + t134 + t140 + t153) +
-        deltay3 * t20 * t26 * (t79 - t123 +
-                            (t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65))) / 2.0 +
-                            (t48 * (t45 - t65)) / 2.0),
-        -t23 * t145 + deltay3 * t20 * t26 * t160 -
-        deltax3 * t20 * t26 * (t72 / 2.0 + t126 - t136 - t155),
-        t23 * t141 + deltax3 * t20 * t26 * t158 -
-        deltay3 * t20 * t26 * t157,
+        -t23 * t144 - t166 * t174 + t167 * t173,
+        -t23 * t145 + t167 * t160 - t166 * t175,
+        t23 * t141 + t166 * t158 - t167 * t157,
         0.0, t35, t36, t33, 1.0,
         t35 + t77 + t112 + t121,
         t36 + t78 + t115 + t124,
@@ -354,19 +601,85 @@ def FK_realrobot(S,Deltax,Deltay):
     ]
 
     mt6 = [
-        t35 + t77 + t112 + t121 - s3 * t20 * t26 * t144 -
-        deltay3 * s3 * t14 * t29 * (t79 - t123 +
-                                    (t8 * (t70 - t128 + deltax2 * deltay2 * t13 * t28 * (t45 - t65))) / 2.0 +
-                                    (t48 * (t45 - t65)) / 2.0) +
-        deltax3 * s3 * t14 * t29 * (t70 / 2.0 + t134 + t140 + t153),
-        t36 + t78 + t115 + t124 - s3 * t20 * t26 * t145 +
-        deltax3 * s3 * t14 * t29 * (t72 / 2.0 + t126 - t136 - t155) -
-        deltay3 * s3 * t14 * t29 * t160,
-        t33 + t64 + t95 + t100 + s3 * t20 * t26 * t141 -
-        deltax3 * s3 * t14 * t29 * t158 +
-        deltay3 * s3 * t14 * t29 * t157,
+        t35 + t77 + t112 + t121 - t169 * t144 - t171 * t173 + t170 * t174,
+        t36 + t78 + t115 + t124 - t169 * t145 + t170 * t175 - t171 * t160,
+        t33 + t64 + t95 + t100 + t169 * t141 - t170 * t158 + t171 * t157,
         1.0
     ]
 
-    # Combine all mt arrays into T_full
-    return np.reshape([*mt1, *mt2, *mt3, *mt4, *mt5, *mt6], (12, 4),order='F')
\ No newline at end of file
+    # Combine all mt arrays into T_full, one 12x4 block per configuration
+    return _assemble([*mt1, *mt2, *mt3, *mt4, *mt5, *mt6], 12, 4, out)
+
+
+def Jacobian_chain(S, Deltax, Deltay, mount_angles=None, return_T=False):
+    """
+    Analytic Jacobian of the tip pose of a chain of n PCC sections.
+
+    The columns follow the configuration vector
+    [s_1, deltax_1, deltay_1, ..., s_n, deltax_n, deltay_n]
+    and the rows are [dp; w]: the tip velocity followed by the angular
+    velocity of the tip frame, both expressed in the base frame.
+
+    Args:
+        S, Deltax, Deltay, mount_angles: As in FK_chain.
+        return_T: If True, also return the transforms computed by FK_chain.
+
+    Returns:
+        J: Array of shape (6, 3n), or (N, 6, 3n) for (N, n) inputs.
+        T: Only if return_T, the (..., n, 4, 4) output of FK_chain.
+    """
+    S, Deltax, Deltay = np.asarray(S), np.asarray(Deltax), np.asarray(Deltay)
+    if mount_angles is not None:
+        Deltax, Deltay, c, s = _mount(Deltax, Deltay, mount_angles)
+
+    H = FK_S2X_cosimo_new(S, Deltax, Deltay)
+    dH = dFK_S2X_cosimo_new(S, Deltax, Deltay)    # (..., n, 3, 3, 4)
+    if mount_angles is not None:
+        # Chain rule through the rotation of (deltax, deltay)
+        c = c[:, None, None]
+        s = s[:, None, None]
+        dH = np.stack([dH[..., 0, :, :],
+                       c * dH[..., 1, :, :] + s * dH[..., 2, :, :],
+                       -s * dH[..., 1, :, :] + c * dH[..., 2, :, :]], axis=-3)
+    T = _compose_chain(H)
+
+    # Base-frame orientation before each section and position after it
+    R_prev = np.empty(T.shape[:-2] + (3, 3))
+    R_prev[..., 0, :, :] = np.eye(3)
+    R_prev[..., 1:, :, :] = T[..., :-1, :3, :3]
+    p_next = T[..., :, :3, 3]
+    p_tip = T[..., -1:, :3, 3]
+
+    # Local angular velocity vee(dR @ R^T) of every section and variable
+    W = dH[..., :3] @ np.swapaxes(H[..., None, :, :3], -1, -2)
+    w_local = 0.5 * np.stack([W[..., 2, 1] - W[..., 1, 2],
+                              W[..., 0, 2] - W[..., 2, 0],
+                              W[..., 1, 0] - W[..., 0, 1]], axis=-1)
+
+    # Map to the base frame: w = R_prev w_local, dp = R_prev dp_local + w x (p_tip - p_next)
+    w = np.einsum('...ij,...kj->...ki', R_prev, w_local)
+    dp = np.einsum('...ij,...kj->...ki', R_prev, dH[..., 3])
+    r = (p_tip - p_next)[..., None, :]
+    dp[..., 0] += w[..., 1] * r[..., 2] - w[..., 2] * r[..., 1]
+    dp[..., 1] += w[..., 2] * r[..., 0] - w[..., 0] * r[..., 2]
+    dp[..., 2] += w[..., 0] * r[..., 1] - w[..., 1] * r[..., 0]
+
+    J = np.concatenate([dp, w], axis=-1)          # (..., n, 3, 6)
+    J = np.swapaxes(J.reshape(J.shape[:-3] + (-1, 6)), -1, -2)
+    if return_T:
+        return J, T
+    return J
+
+def Jacobian_realrobot(sdxdy):
+    """
+    Analytic Jacobian of the tip pose of the three-section robot.
+
+    Args:
+        sdxdy: Configuration [s1, deltax1, deltay1, s2, ..., deltay3], shape (9,)
+               or (N, 9), in the layout returned by FK_L2S_new_3sections.
+
+    Returns:
+        J: Array of shape (6, 9) or (N, 6, 9), as in Jacobian_chain.
+    """
+    sdxdy = np.asarray(sdxdy)
+    return Jacobian_chain(sdxdy[..., 0::3], sdxdy[..., 1::3], sdxdy[..., 2::3], MOUNT_ANGLES_REALROBOT)
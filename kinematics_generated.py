@@ -0,0 +1,145 @@
+"""
+Generated by fk_codegen.py; do not edit, regenerate with
+
+    python fk_codegen.py 3 --mount 0 -30 -60 --name FK_realrobot_generated -o kinematics_generated.py
+"""
+import numpy as np
+
+def FK_realrobot_generated(S, Deltax, Deltay, out=None):
+    """
+    Forward kinematics of a chain of 3 PCC sections mounted at [0, -30, -60] degrees.
+
+    Same layout as kinematics_delta2x.FK_realrobot: (S, Deltax, Deltay) of
+    shape (3,) or (N, 3) give the stacked section tip transforms in the base
+    frame, shape (12, 4) or (N, 12, 4). Straight sections are exact.
+    """
+    S, Deltax, Deltay = np.asarray(S), np.asarray(Deltax), np.asarray(Deltay)
+    s1, s2, s3 = S.T
+    deltax1, deltax2, deltax3 = Deltax.T
+    deltay1, deltay2, deltay3 = Deltay.T
+
+    # Per section: sin(delta)/delta, (cos(delta) - 1)/delta^2 and cos(delta)
+    delta1 = np.sqrt(deltax1 ** 2 + deltay1 ** 2)
+    g1 = np.sinc(delta1 / np.pi)
+    f1 = -0.5 * np.sinc(delta1 / (2 * np.pi)) ** 2
+    c1 = np.cos(delta1)
+    delta2 = np.sqrt(deltax2 ** 2 + deltay2 ** 2)
+    g2 = np.sinc(delta2 / np.pi)
+    f2 = -0.5 * np.sinc(delta2 / (2 * np.pi)) ** 2
+    c2 = np.cos(delta2)
+    delta3 = np.sqrt(deltax3 ** 2 + deltay3 ** 2)
+    g3 = np.sinc(delta3 / np.pi)
+    f3 = -0.5 * np.sinc(delta3 / (2 * np.pi)) ** 2
+    c3 = np.cos(delta3)
+
+    t0 = deltax1**2*f1 + 1
+    t1 = deltax1*f1
+    t2 = deltay1*t1
+    t3 = deltax1*g1
+    t4 = deltay1**2*f1 + 1
+    t5 = deltay1*g1
+    t6 = deltay1*f1*s1
+    t7 = g1*s1
+    t8 = np.sqrt(3)
+    t9 = deltax2*t8 + deltay2
+    t10 = g2*t9
+    t11 = t10*t3
+    t12 = deltax2 - deltay2*t8
+    t13 = f2*t12
+    t14 = t13*t9
+    t15 = t14*t2
+    t16 = f2*t9**2 + 4
+    t17 = -t0*t16 + 2*t11 + t15
+    t18 = -t17
+    t19 = g2*t12
+    t20 = f2*t12**2 + 4
+    t21 = t0*t9
+    t22 = -t13*t21 + 2*t19*t3 + t2*t20
+    t23 = c2*t3
+    t24 = g2*t21
+    t25 = g2*s2
+    t26 = (1/2)*s2
+    t27 = t13*t26
+    t28 = -deltax1*f1*s1 - 1/2*f2*s2*t0*t9 + t2*t27 + t25*t3
+    t29 = t13*t4
+    t30 = -deltax1*deltay1*f1*t16 + 2*t10*t5 + t29*t9
+    t31 = -t30
+    t32 = t19*t5
+    t33 = -t15 + t20*t4 + 2*t32
+    t34 = c2*t5
+    t35 = t10*t2
+    t36 = t25*t5
+    t37 = f2*t26*t9
+    t38 = t26*t29
+    t39 = 2*c1
+    t40 = t10*t39 - t14*t5 + t16*t3
+    t41 = -deltay1*g1*t20 + t14*t3 + t19*t39
+    t42 = -t41
+    t43 = c1*c2
+    t44 = c1*t25 - t27*t5 + t3*t37 + t7
+    t45 = -t12
+    t46 = g2*t45
+    t47 = 2*t23 + t24
+    t48 = t2*t46 + t47
+    t49 = deltax3 + deltay3*t8
+    t50 = g3*t49
+    t51 = 4*t50
+    t52 = f3*t49**2 + 4
+    t53 = deltax3*t8 - deltay3
+    t54 = f3*t49
+    t55 = t53*t54
+    t56 = 4*g3*t53
+    t57 = f3*t53**2 + 4
+    t58 = 4*c3
+    t59 = (1/2)*g3*s3
+    t60 = (1/8)*s3
+    t61 = f3*t53*t60
+    t62 = g2*t4
+    t63 = 2*t34 + t35
+    t64 = t45*t62 + t63
+    t65 = 2*t43
+    t66 = t11 + t46*t5 - t65
+    t67 = deltax1*g1*g2*t9 - t32 - t65
+
+    if out is None:
+        out = np.empty(S.shape[:-1] + (12, 4), dtype=np.result_type(S, Deltax, Deltay, 1.0))
+    out[..., 0, 0] = t0
+    out[..., 0, 1] = t2
+    out[..., 0, 2] = -t3
+    out[..., 0, 3] = s1*t1
+    out[..., 1, 0] = t2
+    out[..., 1, 1] = t4
+    out[..., 1, 2] = -t5
+    out[..., 1, 3] = t6
+    out[..., 2, 0] = t3
+    out[..., 2, 1] = t5
+    out[..., 2, 2] = c1
+    out[..., 2, 3] = t7
+    out[..., 3, :] = [0.0, 0.0, 0.0, 1.0]
+    out[..., 4, 0] = (1/4)*t18
+    out[..., 4, 1] = (1/4)*t22
+    out[..., 4, 2] = (1/2)*deltax1*deltay1*f1*g2*t12 - t23 - 1/2*t24
+    out[..., 4, 3] = -t28
+    out[..., 5, 0] = (1/4)*t31
+    out[..., 5, 1] = (1/4)*t33
+    out[..., 5, 2] = (1/2)*g2*t12*t4 - t34 - 1/2*t35
+    out[..., 5, 3] = t2*t37 - t36 - t38 + t6
+    out[..., 6, 0] = (1/4)*t40
+    out[..., 6, 1] = (1/4)*t42
+    out[..., 6, 2] = -1/2*t11 + (1/2)*t32 + t43
+    out[..., 6, 3] = t44
+    out[..., 7, :] = [0.0, 0.0, 0.0, 1.0]
+    out[..., 8, 0] = (1/16)*t18*t52 - 1/16*t22*t55 - 1/16*t48*t51
+    out[..., 8, 1] = (1/16)*t17*t55 + (1/16)*t22*t57 + (1/16)*t56*(-t19*t2 + t47)
+    out[..., 8, 2] = (1/8)*g3*t22*t53 - 1/8*t18*t50 - 1/8*t48*t58
+    out[..., 8, 3] = (1/8)*f3*s3*t18*t49 - t22*t61 - t28 - t48*t59
+    out[..., 9, 0] = (1/16)*t31*t52 - 1/16*t33*t55 - 1/16*t51*t64
+    out[..., 9, 1] = (1/16)*t30*t55 + (1/16)*t33*t57 + (1/16)*t56*(-t12*t62 + t63)
+    out[..., 9, 2] = (1/8)*g3*t33*t53 - 1/8*t31*t50 - 1/8*t58*t64
+    out[..., 9, 3] = (1/2)*deltax1*deltay1*f1*f2*s2*t9 + deltay1*f1*s1 + (1/8)*f3*s3*t31*t49 - t33*t61 - t36 - t38 - t59*t64
+    out[..., 10, 0] = (1/16)*t40*t52 - 1/16*t42*t55 - 1/16*t51*t66
+    out[..., 10, 1] = (1/4)*g3*t53*t67 - 1/16*t40*t55 - 1/16*t41*t57
+    out[..., 10, 2] = (1/8)*g3*t42*t53 - 1/8*t40*t50 - 1/8*t58*t66
+    out[..., 10, 3] = t40*t54*t60 + t41*t61 + t44 - t59*t67
+    out[..., 11, :] = [0.0, 0.0, 0.0, 1.0]
+    return out
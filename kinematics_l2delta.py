@@ -1,6 +1,6 @@
 import numpy as np
 
-def FK_L2S_jones(L, d_):
+def FK_L2S_jones(L, d_, out=None, dtype=None):
     """
     Compute the forward kinematics using the FK_L2S_jones method.
     
@@ -9,26 +9,35 @@ def FK_L2S_jones(L, d_):
         Input lengths [l1, l2, l3].
     d_ : float
         Parameter d_ used in the computation.
+    out : numpy.ndarray, optional
+        Array of shape (3, ...) to write [s, k, phi] into. The intermediate
+        terms are still allocated for array inputs.
+    dtype : numpy dtype, optional
+        Floating dtype of the computation, e.g. np.float32; defaults to the
+        dtype of the lengths.
     
     Returns:
     out1 : list
         Outputs [s, k, phi].
     """
-    l_1 = L[0]
-    l_2 = L[1]
-    l_3 = L[2]
+    l_1 = np.asarray(L[0], dtype)
+    l_2 = np.asarray(L[1], dtype)
+    l_3 = np.asarray(L[2], dtype)
     
     # Compute the outputs
     s = (l_1 / 3.0) + (l_2 / 3.0) + (l_3 / 3.0)
     k = (2.0 * np.sqrt(-l_1 * l_2 - l_1 * l_3 - l_2 * l_3 + l_1**2 + l_2**2 + l_3**2)) / (d_ * (l_1 + l_2 + l_3))
-    phi = np.arctan2(np.sqrt(3.0) * (-2.0 * l_1 + l_2 + l_3), 3.0 * l_2 - 3.0 * l_3)
+    phi = np.arctan2(3.0 ** 0.5 * (-2.0 * l_1 + l_2 + l_3), 3.0 * l_2 - 3.0 * l_3)
     
     # Combine outputs into a list
     out1 = [s, k, phi]
     
-    return np.array(out1)
+    if out is None:
+        return np.array(out1)
+    out[0], out[1], out[2] = out1
+    return out
 
-def FK_L2S_cosimo_old(L, d_):
+def FK_L2S_cosimo_old(L, d_, out=None, dtype=None):
     """
     Compute the forward kinematics using the FK_L2S_cosimo_old method.
     
@@ -37,15 +46,21 @@ def FK_L2S_cosimo_old(L, d_):
         Input array of shape (n, 3), where each row contains [l1, l2, l3].
     d_ : float
         Parameter d_ used in the computation.
+    out : numpy.ndarray, optional
+        Array of shape (3, ...) to write [s, phi, theta] into. The
+        intermediate terms are still allocated for array inputs.
+    dtype : numpy dtype, optional
+        Floating dtype of the computation, e.g. np.float32; defaults to the
+        dtype of the lengths.
     
     Returns:
     out1 : numpy.ndarray
         Outputs array of shape (n, 3), where each row contains [s, phi, theta].
     """
     # Extract lengths from input array
-    l_1 = L[0]
-    l_2 = L[1]
-    l_3 = L[2]
+    l_1 = np.asarray(L[0], dtype)
+    l_2 = np.asarray(L[1], dtype)
+    l_3 = np.asarray(L[2], dtype)
     
     # Compute intermediate terms
     t2 = l_1 / 3.0
@@ -55,17 +70,20 @@ def FK_L2S_cosimo_old(L, d_):
     
     # Compute outputs
     s = t5
-    phi = np.arctan2(np.sqrt(3.0) * (-2.0 * l_1 + l_2 + l_3), 3.0 * l_2 - 3.0 * l_3)
+    phi = np.arctan2(3.0 ** 0.5 * (-2.0 * l_1 + l_2 + l_3), 3.0 * l_2 - 3.0 * l_3)
     theta = (t5 * np.sqrt(-l_1 * l_2 - l_1 * l_3 - l_2 * l_3 + l_1**2 + l_2**2 + l_3**2) * 2.0) / (d_ * (l_1 + l_2 + l_3))
     
     # Combine results into a single array
-    out1 = np.array([s, phi, theta])
-    
-    return out1
+    if out is None:
+        return np.array([s, phi, theta])
+    out[0], out[1], out[2] = s, phi, theta
+    return out
 
-def FK_L2S_cosimo_new(L, d):
+def FK_L2S_cosimo_new(L, d, out=None):
     """
-    Inputs: L = [l1, l2, l3], d
+    Inputs: L = [l1, l2, l3], d; optionally an out array of shape (3, ...)
+            to write the outputs into (the intermediate terms are still
+            allocated for array inputs)
 
     Outputs: [s, deltax, deltay]
 
@@ -117,30 +135,148 @@ def FK_L2S_cosimo_new(L, d):
     deltay = t16 * t27 * t28 * t33 * t34 * (3.0 * t2 - 3.0 * t3 + t22 * (t4 + t5 - 2.0 * np.real(l1))) * 2.0
 
     # 转置输出
-    out1 = np.array([s, deltax, deltay])
+    if out is None:
+        return np.array([s, deltax, deltay])
+    out[0], out[1], out[2] = s, deltax, deltay
+    return out
+
+def FK_L2S_cosimo_new_real(L, d, out=None, dtype=None):
+    """
+    Real-valued closed form of FK_L2S_cosimo_new.
+
+    For real tendon lengths the complex terms of FK_L2S_cosimo_new cancel:
+    |3*l2 - 3*l3 + sqrt(3)*(l2 + l3 - 2*l1)*1j| = sqrt(12*t32), so the map
+    reduces to
+        s      = (l1 + l2 + l3) / 3
+        deltax = (l2 - l3) / (sqrt(3) * d)
+        deltay = (l2 + l3 - 2*l1) / (3 * d)
+    A straight section (l1 = l2 = l3) gives deltax = deltay = 0, where the
+    complex form evaluates 0/0 to NaN.
+
+    Inputs: L = [l1, l2, l3] of shape (3,), or an (N, 3) array, and d;
+            optionally an out array of the output shape to write into and
+            the floating dtype of the computation (default: that of L)
+
+    Outputs: [s, deltax, deltay] of shape (3,), or (N, 3)
+    """
+    L = np.asarray(L, dtype)
+    l1 = L[..., 0]
+    l2 = L[..., 1]
+    l3 = L[..., 2]
+
+    out1 = np.empty(np.broadcast_shapes(L.shape, (3,)), dtype=np.result_type(L, 1.0)) if out is None else out
+    out1[..., 0] = (l1 + l2 + l3) / 3.0
+    out1[..., 1] = (l2 - l3) / (3.0 ** 0.5 * d)
+    out1[..., 2] = (l2 + l3 - 2.0 * l1) / (3.0 * d)
     return out1
 
-def FK_L2S_new_3sections(in1, d):
+def FK_L2S_new_3sections(in1, d, out=None, dtype=None):
     """
     Compute forward kinematics for three sections using the FK_L2S_new_3sections method.
 
+    Real tendon lengths go through the closed form FK_L2S_cosimo_new_real in
+    one vectorized pass; complex inputs use the complex FK_L2S_cosimo_new.
+    With out, the result is written into out without an output copy, but
+    the NumPy expressions still allocate their intermediate terms; only
+    kinematics_backend.FK_L2S_new_3sections with the numba backend and real
+    inputs runs without allocating arrays.
+
     Parameters:
     in1 : numpy.ndarray
-        Input array of shape (n, 9), where each row contains [l1, l2, ..., l9].
+        Tendon lengths [l1, l2, ..., l9] of shape (9,), or (N, 9) with one
+        frame per row.
     d : float
         A parameter used in the computation.
+    out : numpy.ndarray, optional
+        Array of the output shape to write the result into; complex for
+        complex inputs.
+    dtype : numpy dtype, optional
+        Floating dtype of the computation, e.g. np.float32 for large offline
+        batches; defaults to the dtype of in1. The real map is linear, so
+        float32 results carry only the float32 rounding of the inputs.
 
     Returns:
     out1 : numpy.ndarray
-        Outputs array with results.
+        [s1, deltax1, deltay1, ..., deltay3] of shape (9,), or (N, 9).
+    """
+    in1 = np.asarray(in1, dtype)
+    if np.iscomplexobj(in1):
+        if out is None:
+            out = np.empty(in1.shape, dtype=np.result_type(in1, 1.0))
+        # FK_L2S_cosimo_new writes [s, deltax, deltay] along the first axis
+        for i in (0, 3, 6):
+            FK_L2S_cosimo_new([in1[..., i], in1[..., i + 1], in1[..., i + 2]], d,
+                              np.moveaxis(out[..., i:i + 3], -1, 0))
+        return out
+
+    # (..., 9) -> (..., 3, 3) view with one row per section
+    sections = in1.reshape(in1.shape[:-1] + (3, 3))
+    if out is None:
+        return FK_L2S_cosimo_new_real(sections, d).reshape(in1.shape)
+    FK_L2S_cosimo_new_real(sections, d, _sections_view(out))
+    return out
+
+
+def _sections_view(out):
+    """
+    (..., 3, 3) view of a (..., 9) out array; writes through it reach out.
+    """
+    view = out.view()
+    view.shape = out.shape[:-1] + (3, 3)  # raises instead of copying a non-contiguous out
+    return view
+
+def IK_S2L_cosimo_new(sdxdy, d, out=None, dtype=None):
     """
-    # Extract real and imaginary parts of input
-    l1, l2, l3, l4, l5, l6, l7, l8, l9 = [in1[i] for i in range(9)]
-    sdxdy1 = FK_L2S_cosimo_new([l1, l2, l3], d)
-    sdxdy2 = FK_L2S_cosimo_new([l4, l5, l6], d)
-    sdxdy3 = FK_L2S_cosimo_new([l7, l8, l9], d)
+    Inverse of FK_L2S_cosimo_new: tendon lengths of one section.
 
-    sdxdy = [sdxdy1[0], sdxdy1[1], sdxdy1[2], sdxdy2[0], sdxdy2[1], sdxdy2[2], sdxdy3[0], sdxdy3[1], sdxdy3[2]]
-    sdxdy = np.array(sdxdy)
+    Closed-form inverse of FK_L2S_cosimo_new_real:
+        l1 = s - d*deltay
+        l2 = s + d*deltay/2 + sqrt(3)*d*deltax/2
+        l3 = s + d*deltay/2 - sqrt(3)*d*deltax/2
 
-    return sdxdy
\ No newline at end of file
+    Inputs: sdxdy = [s, deltax, deltay] of shape (3,), or an (N, 3) array, and d;
+            optionally an out array of the output shape to write into and
+            the floating dtype of the computation (default: that of sdxdy)
+
+    Outputs: L = [l1, l2, l3] of shape (3,), or (N, 3)
+    """
+    sdxdy = np.asarray(sdxdy, dtype)
+    s = sdxdy[..., 0]
+    deltax = sdxdy[..., 1]
+    deltay = sdxdy[..., 2]
+
+    t2 = s + 0.5 * d * deltay
+    t3 = 0.5 * 3.0 ** 0.5 * d * deltax
+
+    out1 = np.empty(np.broadcast_shapes(sdxdy.shape, (3,)), dtype=np.result_type(sdxdy, 1.0)) if out is None else out
+    out1[..., 0] = s - d * deltay
+    out1[..., 1] = t2 + t3
+    out1[..., 2] = t2 - t3
+    return out1
+
+def IK_S2L_new_3sections(in1, d, out=None, dtype=None):
+    """
+    Inverse of FK_L2S_new_3sections: tendon lengths of the three sections.
+
+    Parameters:
+    in1 : numpy.ndarray
+        [s1, deltax1, deltay1, ..., deltay3] of shape (9,), or (N, 9) with
+        one configuration per row.
+    d : float
+        A parameter used in the computation.
+    out : numpy.ndarray, optional
+        Array of the output shape to write the result into.
+    dtype : numpy dtype, optional
+        Floating dtype of the computation; defaults to the dtype of in1.
+
+    Returns:
+    out1 : numpy.ndarray
+        Tendon lengths [l1, l2, ..., l9] of shape (9,), or (N, 9), ready for
+        softarm_utility.L2motor.
+    """
+    in1 = np.asarray(in1, dtype)
+    sections = in1.reshape(in1.shape[:-1] + (3, 3))
+    if out is None:
+        return IK_S2L_cosimo_new(sections, d).reshape(in1.shape)
+    IK_S2L_cosimo_new(sections, d, _sections_view(out))
+    return out
@@ -23,9 +23,9 @@ def quatinv(quat):
     """
     Calculate the inverse (conjugate) of a quaternion.
     Input:
-        quat: Quaternion as a 1D array or list [w, x, y, z]
+        quat: Quaternion as a 1D array or list [w, x, y, z], or an (N, 4) array
     Output:
-        q_inv: Inverted quaternion [w, -x, -y, -z]
+        q_inv: Inverted quaternion [w, -x, -y, -z], same shape as quat
     """
     quat = np.array(quat)
     # Ensure the quaternion is in the form [w, x, y, z] and invert the vector part
@@ -36,197 +36,187 @@ def quatmultiply(q1, q2):
     """
     Multiply two quaternions.
     Input:
-        q1: First quaternion as a 1D array or list [w1, x1, y1, z1]
-        q2: Second quaternion as a 1D array or list [w2, x2, y2, z2]
+        q1: First quaternion as a 1D array or list [w1, x1, y1, z1], or an (N, 4) array
+        q2: Second quaternion as a 1D array or list [w2, x2, y2, z2], or an (N, 4) array
+            Shapes broadcast, e.g. one quaternion times N quaternions.
     Output:
-        qm: Result of quaternion multiplication [w, x, y, z]
+        qm: Result of quaternion multiplication [w, x, y, z], shape (4,) or (N, 4)
     """
+    q1, q2 = np.asarray(q1), np.asarray(q2)
     # Extract quaternion components for q1
-    w1, x1, y1, z1 = q1[0], q1[1], q1[2], q1[3]
+    w1, x1, y1, z1 = q1[..., 0], q1[..., 1], q1[..., 2], q1[..., 3]
     # Extract quaternion components for q2
-    w2, x2, y2, z2 = q2[0], q2[1], q2[2], q2[3]
-    
+    w2, x2, y2, z2 = q2[..., 0], q2[..., 1], q2[..., 2], q2[..., 3]
+
     # Quaternion multiplication formula
-    w = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
-    x = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
-    y = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
-    z = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
-    
+    qm = np.empty(np.broadcast_shapes(q1.shape, q2.shape), dtype=np.result_type(q1, q2))
+    qm[..., 0] = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+    qm[..., 1] = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+    qm[..., 2] = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+    qm[..., 3] = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+
     # Return the resulting quaternion in [w, x, y, z] format
-    qm = np.array([w, x, y, z])
     return qm
-    
+
 def quat2rotm(q):
     """
     Convert a quaternion to a rotation matrix
     Input:
-        q: Quaternion list or array [w, x, y, z]
+        q: Quaternion list or array [w, x, y, z], or an (N, 4) array
     Output:
-        R: 3x3 rotation matrix
+        R: 3x3 rotation matrix, or an (N, 3, 3) array
     """
     # Ensure the quaternion is a unit quaternion (normalize)
-    q = np.array(q)
-    q = q / np.linalg.norm(q)
-    
+    q = np.asarray(q)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+
     # Extract quaternion components
-    w, x, y, z = q
-    
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
     # Calculate the rotation matrix
-    R = np.array([
-        [1 - 2*y**2 - 2*z**2, 2*x*y - 2*w*z, 2*x*z + 2*w*y],
-        [2*x*y + 2*w*z, 1 - 2*x**2 - 2*z**2, 2*y*z - 2*w*x],
-        [2*x*z - 2*w*y, 2*y*z + 2*w*x, 1 - 2*x**2 - 2*y**2]
-    ])
-    
+    R = np.empty(q.shape[:-1] + (3, 3), dtype=q.dtype)
+    R[..., 0, 0] = 1 - 2*y**2 - 2*z**2
+    R[..., 0, 1] = 2*x*y - 2*w*z
+    R[..., 0, 2] = 2*x*z + 2*w*y
+    R[..., 1, 0] = 2*x*y + 2*w*z
+    R[..., 1, 1] = 1 - 2*x**2 - 2*z**2
+    R[..., 1, 2] = 2*y*z - 2*w*x
+    R[..., 2, 0] = 2*x*z - 2*w*y
+    R[..., 2, 1] = 2*y*z + 2*w*x
+    R[..., 2, 2] = 1 - 2*x**2 - 2*y**2
+
     return R
 
 def rotm2quat(R):
     """
     Convert a rotation matrix to a quaternion
     Input:
-        R: 3x3 rotation matrix
+        R: 3x3 rotation matrix, or an (N, 3, 3) array
     Output:
-        q: Quaternion [w, x, y, z]
-    """
-    # Calculate quaternion components
-    w = np.sqrt(1 + R[0, 0] + R[1, 1] + R[2, 2]) / 2
-    x = (R[2, 1] - R[1, 2]) / (4 * w)
-    y = (R[0, 2] - R[2, 0]) / (4 * w)
-    z = (R[1, 0] - R[0, 1]) / (4 * w)
-    
-    # Combine components into a quaternion
-    q = np.array([w, x, y, z])
+        q: Quaternion [w, x, y, z] with w >= 0, shape (4,) or (N, 4)
+    """
+    R = np.asarray(R)
+    R00, R01, R02 = R[..., 0, 0], R[..., 0, 1], R[..., 0, 2]
+    R10, R11, R12 = R[..., 1, 0], R[..., 1, 1], R[..., 1, 2]
+    R20, R21, R22 = R[..., 2, 0], R[..., 2, 1], R[..., 2, 2]
+
+    # Shepperd's method: row i of K is 4 * q_i * q. The row with the largest
+    # diagonal entry 4 * q_i^2 is divided by 4 * |q_i| >= 2, which stays
+    # accurate near 180 degrees where w = 0.
+    K = np.stack([
+        1 + R00 + R11 + R22, R21 - R12, R02 - R20, R10 - R01,
+        R21 - R12, 1 + R00 - R11 - R22, R01 + R10, R02 + R20,
+        R02 - R20, R01 + R10, 1 - R00 + R11 - R22, R12 + R21,
+        R10 - R01, R02 + R20, R12 + R21, 1 - R00 - R11 + R22,
+    ], axis=-1).reshape(R.shape[:-2] + (4, 4))
+
+    pivot = np.argmax(np.diagonal(K, axis1=-2, axis2=-1), axis=-1)[..., None, None]
+    row = np.take_along_axis(K, pivot, axis=-2)[..., 0, :]
+    q = row / (2 * np.sqrt(np.take_along_axis(row, pivot[..., 0], axis=-1)))
+
+    # Same sign convention as the direct formula
+    q *= np.where(q[..., :1] < 0, -1.0, 1.0)
     return q
 
 def rotm2eul(R, order='ZYX'):
     """
     Convert a rotation matrix to Euler angles in specified order
     Input:
-        R: 3x3 rotation matrix
+        R: 3x3 rotation matrix, or an (N, 3, 3) array
         order: Rotation order, either 'XYZ' or 'ZYX'
     Output:
-        euler_angles: Euler angles [roll, pitch, yaw] for XYZ order 
-                      or [yaw, pitch, roll] for ZYX order
+        euler_angles: Euler angles [roll, pitch, yaw] for XYZ order
+                      or [yaw, pitch, roll] for ZYX order, shape (3,) or (N, 3)
     """
+    R = np.asarray(R)
     if order == 'XYZ':
-        # XYZ rotation order
-        if R[2, 2] < 1:
-            if R[2, 2] > -1:
-                roll = np.arctan2(-R[1, 2], R[2, 2])
-                pitch = np.arcsin(R[0, 2])
-                yaw = np.arctan2(-R[0, 1], R[0, 0])
-            else:
-                # R[2, 2] == -1, special case
-                roll = -np.arctan2(R[0, 1], R[0, 0])
-                pitch = -np.pi / 2
-                yaw = 0
-        else:
-            # R[2, 2] == 1, special case
-            roll = np.arctan2(R[0, 1], R[0, 0])
-            pitch = np.pi / 2
-            yaw = 0
+        # XYZ rotation order; the special cases at R[2, 2] == -1 and
+        # R[2, 2] == 1 are selected per matrix with masks
+        test = R[..., 2, 2]
+        regular = (test < 1) & (test > -1)
+        sign = np.where(test < 1, -1.0, 1.0)
+        roll = np.where(regular, np.arctan2(-R[..., 1, 2], R[..., 2, 2]),
+                        sign * np.arctan2(R[..., 0, 1], R[..., 0, 0]))
+        pitch = np.where(regular, np.arcsin(np.clip(R[..., 0, 2], -1, 1)), sign * np.pi / 2)
+        yaw = np.where(regular, np.arctan2(-R[..., 0, 1], R[..., 0, 0]), 0.0)
 
         euler_angles = [roll, pitch, yaw]
-    
+
     elif order == 'ZYX':
-        # ZYX rotation order
-        if R[2, 0] < 1:
-            if R[2, 0] > -1:
-                yaw = np.arctan2(R[1, 0], R[0, 0])
-                pitch = np.arcsin(-R[2, 0])
-                roll = np.arctan2(R[2, 1], R[2, 2])
-            else:
-                # R[2, 0] == -1, special case
-                yaw = -np.arctan2(-R[1, 2], R[1, 1])
-                pitch = np.pi / 2
-                roll = 0
-        else:
-            # R[2, 0] == 1, special case
-            yaw = np.arctan2(-R[1, 2], R[1, 1])
-            pitch = -np.pi / 2
-            roll = 0
+        # ZYX rotation order; the special cases at R[2, 0] == -1 and
+        # R[2, 0] == 1 are selected per matrix with masks
+        test = R[..., 2, 0]
+        regular = (test < 1) & (test > -1)
+        sign = np.where(test < 1, -1.0, 1.0)
+        yaw = np.where(regular, np.arctan2(R[..., 1, 0], R[..., 0, 0]),
+                       sign * np.arctan2(-R[..., 1, 2], R[..., 1, 1]))
+        pitch = np.where(regular, np.arcsin(-np.clip(R[..., 2, 0], -1, 1)), -sign * np.pi / 2)
+        roll = np.where(regular, np.arctan2(R[..., 2, 1], R[..., 2, 2]), 0.0)
 
         euler_angles = [yaw, pitch, roll]
-    
+
     else:
         raise ValueError("Invalid rotation order. Supported orders are 'XYZ' and 'ZYX'.")
 
-    return np.array(euler_angles)
+    return np.stack(euler_angles, axis=-1)
 
 def eul2rotm(eul, order='ZYX'):
     """
     Convert Euler angles to a rotation matrix
     Input:
         eul: [yaw, pitch, roll] (Euler angles in ZYX order) or
-             [roll, pitch, yaw] (Euler angles in XYZ order)
+             [roll, pitch, yaw] (Euler angles in XYZ order), or an (N, 3) array
         order: Rotation order, either 'ZYX' or 'XYZ'
     Output:
-        R: 3x3 rotation matrix
+        R: 3x3 rotation matrix, or an (N, 3, 3) array
     """
+    eul = np.asarray(eul)
     if order == 'XYZ':
-        roll, pitch, yaw = eul[0], eul[1], eul[2]
-
-        # Compute individual rotation matrices
-        Rx = np.array([
-            [1, 0,           0],
-            [0, np.cos(roll), -np.sin(roll)],
-            [0, np.sin(roll),  np.cos(roll)]
-        ])
-        
-        Ry = np.array([
-            [np.cos(pitch), 0, np.sin(pitch)],
-            [0,             1, 0],
-            [-np.sin(pitch), 0, np.cos(pitch)]
-        ])
-        
-        Rz = np.array([
-            [np.cos(yaw), -np.sin(yaw), 0],
-            [np.sin(yaw),  np.cos(yaw), 0],
-            [0,            0,           1]
-        ])
-
-        # Combine rotation matrices
-        R = Rx @ Ry @ Rz
-    
+        roll, pitch, yaw = eul[..., 0], eul[..., 1], eul[..., 2]
     elif order == 'ZYX':
-        yaw, pitch, roll = eul[0], eul[1], eul[2]
-
-        # Compute individual rotation matrices
-        Rz = np.array([
-            [np.cos(yaw), -np.sin(yaw), 0],
-            [np.sin(yaw),  np.cos(yaw), 0],
-            [0,            0,           1]
-        ])
-        
-        Ry = np.array([
-            [np.cos(pitch), 0, np.sin(pitch)],
-            [0,             1, 0],
-            [-np.sin(pitch), 0, np.cos(pitch)]
-        ])
-        
-        Rx = np.array([
-            [1, 0,            0],
-            [0, np.cos(roll), -np.sin(roll)],
-            [0, np.sin(roll),  np.cos(roll)]
-        ])
-
-        # Combine rotation matrices
-        R = Rz @ Ry @ Rx
-    
+        yaw, pitch, roll = eul[..., 0], eul[..., 1], eul[..., 2]
     else:
         raise ValueError("Invalid rotation order. Supported orders are 'XYZ' and 'ZYX'.")
 
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+
+    R = np.empty(eul.shape[:-1] + (3, 3), dtype=cr.dtype)
+    if order == 'XYZ':
+        # R = Rx @ Ry @ Rz
+        R[..., 0, 0] = cp * cy
+        R[..., 0, 1] = -cp * sy
+        R[..., 0, 2] = sp
+        R[..., 1, 0] = sr * sp * cy + cr * sy
+        R[..., 1, 1] = cr * cy - sr * sp * sy
+        R[..., 1, 2] = -sr * cp
+        R[..., 2, 0] = sr * sy - cr * sp * cy
+        R[..., 2, 1] = cr * sp * sy + sr * cy
+        R[..., 2, 2] = cr * cp
+    else:
+        # R = Rz @ Ry @ Rx
+        R[..., 0, 0] = cy * cp
+        R[..., 0, 1] = cy * sp * sr - sy * cr
+        R[..., 0, 2] = cy * sp * cr + sy * sr
+        R[..., 1, 0] = sy * cp
+        R[..., 1, 1] = sy * sp * sr + cy * cr
+        R[..., 1, 2] = sy * sp * cr - cy * sr
+        R[..., 2, 0] = -sp
+        R[..., 2, 1] = cp * sr
+        R[..., 2, 2] = cp * cr
+
     return R
 
 def quat2eul(quat, order='ZYX'):
     """
     Convert a quaternion to Euler angles in specified order
     Input:
-        quat: 1x4 quaternion
+        quat: 1x4 quaternion, or an (N, 4) array
         order: Rotation order, either 'XYZ' or 'ZYX'
     Output:
-        euler_angles: Euler angles [roll, pitch, yaw] for XYZ order 
-                      or [yaw, pitch, roll] for ZYX order
+        euler_angles: Euler angles [roll, pitch, yaw] for XYZ order
+                      or [yaw, pitch, roll] for ZYX order, shape (3,) or (N, 3)
     """
     if order == 'ZYX' or order == 'XYZ':
         rotm = quat2rotm(quat)
@@ -241,10 +231,10 @@ def eul2quat(eul, order='ZYX'):
     Convert Euler angles to a quaternion
     Input:
         eul: [yaw, pitch, roll] (Euler angles in ZYX order) or
-             [roll, pitch, yaw] (Euler angles in XYZ order)
+             [roll, pitch, yaw] (Euler angles in XYZ order), or an (N, 3) array
         order: Rotation order, either 'ZYX' or 'XYZ'
     Output:
-        quat: 1x4 quaternion
+        quat: 1x4 quaternion, or an (N, 4) array
     """
     if order == 'ZYX' or order == 'XYZ':
         rotm = eul2rotm(eul,order)
@@ -252,4 +242,239 @@ def eul2quat(eul, order='ZYX'):
     else:
         raise ValueError("Invalid rotation order. Supported orders are 'XYZ' and 'ZYX'.")
 
-    return quat
\ No newline at end of file
+    return quat
+
+def quatslerp(q1, q2, t):
+    """
+    Spherical linear interpolation between quaternions.
+    Input:
+        q1: Unit quaternion(s) [w, x, y, z] at t = 0, shape (4,) or (N, 4)
+        q2: Unit quaternion(s) [w, x, y, z] at t = 1, shape (4,) or (N, 4)
+        t: Interpolation parameter(s), scalar or (N,); shapes broadcast
+    Output:
+        q: Interpolated unit quaternion(s), shape (4,) or (N, 4)
+    Interpolates along the shorter arc (q2 and -q2 are the same rotation).
+    Nearly equal quaternions are interpolated linearly and renormalized,
+    which avoids dividing by sin(theta) -> 0.
+    """
+    q1, q2 = np.asarray(q1, dtype=float), np.asarray(q2, dtype=float)
+    t = np.asarray(t, dtype=float)[..., None]
+    dot = np.sum(q1 * q2, axis=-1, keepdims=True)
+    q2 = np.where(dot < 0, -q2, q2)
+    dot = np.minimum(np.abs(dot), 1.0)
+
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    close = sin_theta < 1e-6
+    sin_theta[close] = 1.0
+    w1 = np.where(close, 1 - t, np.sin((1 - t) * theta) / sin_theta)
+    w2 = np.where(close, t, np.sin(t * theta) / sin_theta)
+    q = w1 * q1 + w2 * q2
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+def quatmean(quat, weights=None):
+    """
+    Average of quaternions by Markley's method.
+    Input:
+        quat: (M, 4) quaternions [w, x, y, z] to average, or an (N, M, 4)
+              array of N groups averaged separately
+        weights: Optional (M,) or (N, M) non-negative weights
+    Output:
+        q: Unit quaternion [w, x, y, z] with w >= 0, shape (4,) or (N, 4)
+    The mean is the eigenvector of the largest eigenvalue of
+    sum_i weights_i * q_i q_i^T, which minimizes the weighted sum of squared
+    rotation-matrix (chordal) distances. It does not depend on the signs of
+    the q_i.
+    """
+    quat = np.asarray(quat, dtype=float)
+    if weights is None:
+        M = np.swapaxes(quat, -1, -2) @ quat
+    else:
+        M = np.swapaxes(quat * np.asarray(weights, dtype=float)[..., None], -1, -2) @ quat
+    # Eigenvalues in ascending order: the last eigenvector is the mean
+    q = np.linalg.eigh(M)[1][..., :, -1]
+    q *= np.where(q[..., :1] < 0, -1.0, 1.0)
+    return q
+
+def quatresample(t, quat, t_new):
+    """
+    Resample a timestamped quaternion stream onto a new time grid.
+    Input:
+        t: (N,) increasing sample times of the stream
+        quat: (N, 4) quaternions [w, x, y, z] at the times t, or (N, K, 4) for
+              K sensors sharing the timestamps
+        t_new: (M,) target times, e.g. the timestamps of another sensor
+    Output:
+        q: (M, 4) or (M, K, 4) quaternions SLERPed between the neighbouring
+           samples; target times outside [t[0], t[-1]] hold the first or last sample
+    """
+    t = np.asarray(t, dtype=float)
+    t_new = np.asarray(t_new, dtype=float)
+    quat = np.asarray(quat, dtype=float)
+    if t.ndim != 1 or t.shape[0] != quat.shape[0] or t.shape[0] < 2:
+        raise ValueError("t should hold one increasing time for each of at least two quaternions")
+    k = np.clip(np.searchsorted(t, t_new, side='right') - 1, 0, t.shape[0] - 2)
+    u = np.clip((t_new - t[k]) / (t[k + 1] - t[k]), 0.0, 1.0)
+    u = u.reshape(u.shape + (1,) * (quat.ndim - 2))
+    return quatslerp(quat[k], quat[k + 1], u)
+
+def _quat_outer_to_rotm():
+    """
+    Rotation matrix entries as linear combinations of the products q_i * q_j
+    of a quaternion [w, x, y, z], so that quat2rotm of many quaternions is a
+    single matrix product:
+        R.ravel() = np.outer(q, q).ravel() @ _QUAT_OUTER_TO_ROTM / (q @ q)
+    Output:
+        table: (16, 9) coefficients, rows q_i * q_j, columns R entries row-major
+    """
+    entries = [
+        [(0, 0, 1), (1, 1, 1), (2, 2, -1), (3, 3, -1)], [(1, 2, 2), (0, 3, -2)], [(1, 3, 2), (0, 2, 2)],
+        [(1, 2, 2), (0, 3, 2)], [(0, 0, 1), (1, 1, -1), (2, 2, 1), (3, 3, -1)], [(2, 3, 2), (0, 1, -2)],
+        [(1, 3, 2), (0, 2, -2)], [(2, 3, 2), (0, 1, 2)], [(0, 0, 1), (1, 1, -1), (2, 2, -1), (3, 3, 1)]]
+    table = np.zeros((4, 4, 9))
+    for entry, terms in enumerate(entries):
+        for i, j, c in terms:
+            table[i, j, entry] = c
+    return table.reshape(16, 9)
+
+_QUAT_OUTER_TO_ROTM = _quat_outer_to_rotm()
+
+def relative_orientation(quat, Timu=None, order='ZYX'):
+    """
+    Relative rotations between consecutive IMUs of a chain, in one pass over all sections.
+
+    For every section k this is
+        R_k = Timu_k^T @ quat2rotm(quatinv(q_k) * q_{k+1}) @ Timu_k
+    followed by rotm2eul, as done per section in IMU_test.py. It is computed
+    as R_k = (R(q_k) @ Timu_k)^T @ (R(q_{k+1}) @ Timu_k), with the rotation
+    matrices of all K quaternions taken from one product with their outer
+    products, so the number of array operations does not grow with K or N.
+    Input:
+        quat: (K, 4) quaternions [w, x, y, z] of one frame from sensor_call,
+              base IMU first, or an (N, K, 4) log of N frames
+        Timu: (K-1, 3, 3) mounting rotations of the IMUs, e.g. stacked
+              Timu_1, Timu_2, Timu_3; None for aligned IMUs
+        order: Rotation order of the Euler angles, either 'ZYX' or 'XYZ'
+    Output:
+        R: Relative rotation matrices, shape (K-1, 3, 3) or (N, K-1, 3, 3)
+        eul: Euler angles of R, shape (K-1, 3) or (N, K-1, 3)
+    """
+    quat = np.asarray(quat, dtype=float)
+    if quat.ndim < 2 or quat.shape[-1] != 4:
+        raise ValueError("quat should be a (K, 4) or (N, K, 4) array")
+    outer = (quat[..., :, None] * quat[..., None, :]).reshape(quat.shape[:-1] + (16,))
+    Rq = (outer @ _QUAT_OUTER_TO_ROTM).reshape(quat.shape[:-1] + (3, 3))
+    Rq /= outer[..., ::5].sum(axis=-1)[..., None, None]
+    parent, child = Rq[..., :-1, :, :], Rq[..., 1:, :, :]
+    if Timu is not None:
+        Timu = np.asarray(Timu)
+        parent, child = parent @ Timu, child @ Timu
+    R = np.swapaxes(parent, -1, -2) @ child
+    return R, rotm2eul(R, order)
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+class Rotation:
+    """
+    An orientation that converts between representations at most once.
+
+    The unit quaternion [w, x, y, z] with w >= 0 is the canonical form; the
+    rotation matrix and the Euler angles of each order are computed on first
+    access and cached, as is the matrix the rotation was created from. Euler
+    angles are always derived from the matrix, so equal rotations report the
+    same angles however they were built. Cached arrays are read-only.
+
+    Example:
+        r = Rotation.from_eul(np.deg2rad([60, 0, 0]))
+        r.rotm, r.quat, r.eul('XYZ')    # each computed once
+        (r.inv() * Rotation(q)).eul()
+    """
+    __slots__ = ('_quat', '_rotm', '_eul')
+    _ndim = 1
+
+    def __init__(self, quat):
+        quat = np.array(quat, dtype=float)
+        if quat.ndim != self._ndim or quat.shape[-1] != 4:
+            raise ValueError(f"{type(self).__name__} needs {'a (4,) quaternion' if self._ndim == 1 else 'an (N, 4) array of quaternions'}")
+        quat /= np.linalg.norm(quat, axis=-1, keepdims=True)
+        quat *= np.where(quat[..., :1] < 0, -1.0, 1.0)
+        self._quat = _readonly(quat)
+        self._rotm = None
+        self._eul = {}
+
+    @classmethod
+    def from_quat(cls, quat):
+        return cls(quat)
+
+    @classmethod
+    def from_rotm(cls, R):
+        R = np.asarray(R, dtype=float)
+        rotation = cls(rotm2quat(R))
+        rotation._rotm = _readonly(R.copy())
+        return rotation
+
+    @classmethod
+    def from_eul(cls, eul, order='ZYX'):
+        eul = np.asarray(eul, dtype=float)
+        R = eul2rotm(eul, order)
+        rotation = cls(rotm2quat(R))
+        rotation._rotm = _readonly(R)
+        return rotation
+
+    @property
+    def quat(self):
+        """Unit quaternion [w, x, y, z] with w >= 0."""
+        return self._quat
+
+    @property
+    def rotm(self):
+        """Rotation matrix."""
+        if self._rotm is None:
+            self._rotm = _readonly(quat2rotm(self._quat))
+        return self._rotm
+
+    def eul(self, order='ZYX'):
+        """Euler angles [yaw, pitch, roll] for 'ZYX' or [roll, pitch, yaw] for 'XYZ'."""
+        eul = self._eul.get(order)
+        if eul is None:
+            eul = self._eul[order] = _readonly(rotm2eul(self.rotm, order))
+        return eul
+
+    def inv(self):
+        return type(self)(quatinv(self._quat))
+
+    def __mul__(self, other):
+        """Composition, same as the product of the rotation matrices; broadcasts over batches."""
+        quat = quatmultiply(self._quat, other.quat)
+        return (Rotation if quat.ndim == 1 else RotationBatch)(quat)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._quat.tolist()})"
+
+class RotationBatch(Rotation):
+    """
+    N orientations in one contiguous (N, 4) quaternion array.
+
+    Conversions run over the whole batch at once and are cached like those
+    of Rotation, as (N, 3, 3) matrices and (N, 3) Euler angles. Indexing
+    returns a Rotation, or a RotationBatch for slices, that shares the
+    conversions already computed.
+    """
+    __slots__ = ()
+    _ndim = 2
+
+    def __len__(self):
+        return self._quat.shape[0]
+
+    def __getitem__(self, index):
+        quat = self._quat[index]
+        rotation = Rotation.__new__(Rotation if quat.ndim == 1 else RotationBatch)
+        rotation._quat = _readonly(quat)
+        rotation._rotm = None if self._rotm is None else _readonly(self._rotm[index])
+        rotation._eul = {order: _readonly(eul[index]) for order, eul in self._eul.items()}
+        return rotation
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
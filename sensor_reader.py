@@ -0,0 +1,119 @@
+import numpy as np
+import threading
+import time
+
+class SensorReader:
+    """
+    Background reader of IMU frames from a serial port.
+
+    A daemon thread reads and parses lines continuously and stores every
+    valid (K, 4) quaternion frame with its arrival time in a preallocated
+    ring buffer. latest() and since() only copy from the buffer, so the
+    control loop never waits on the serial line and no buffered data is
+    thrown away. Use softarm_utility.start_sensor_reader or
+    tentacle_utility.start_sensor_reader, e.g.
+        reader = su.start_sensor_reader(sensorobj)
+        while True:
+            sensor_val = reader.latest()
+            if sensor_val is not False:
+                ...
+        reader.stop()
+
+    Args:
+        SerialObj: Open serial port, e.g. from setup_serial_port.
+        parse: Function of a decoded line returning a (K, 4) array, or False
+               for an incomplete line, e.g. softarm_utility.parse_sensor_string.
+        n_sensors: K, the number of quaternions per frame.
+        capacity: Number of frames kept.
+    """
+
+    def __init__(self, SerialObj, parse, n_sensors, capacity=1024):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.SerialObj = SerialObj
+        self.parse = parse
+        self.capacity = capacity
+        self.frames = np.zeros((capacity, n_sensors, 4))
+        self.times = np.zeros(capacity)
+        self.count = 0  # frames received so far; the newest is at (count - 1) % capacity
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self.SerialObj.reset_input_buffer()  # drop what arrived before the reader
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                line = self.SerialObj.readline()
+            except Exception as e:
+                print(f"Error reading from serial port: {e}")
+                time.sleep(0.1)
+                continue
+            t = time.perf_counter()
+            try:
+                sensor_val = self.parse(line.decode('utf-8', errors='ignore').strip()) if line else False
+                if sensor_val is not False and np.shape(sensor_val) != self.frames.shape[1:]:
+                    raise ValueError(f"expected a frame of shape {self.frames.shape[1:]}, got {np.shape(sensor_val)}")
+            except Exception as e:
+                # A garbled or partial line must not stop the reader
+                print(f"Error parsing sensor frame: {e}")
+                continue
+            if sensor_val is not False:
+                with self._lock:
+                    k = self.count % self.capacity
+                    self.frames[k] = sensor_val
+                    self.times[k] = t
+                    self.count += 1
+
+    def latest(self):
+        """
+        Copy of the newest frame, shape (K, 4), or False before the first one,
+        like sensor_call. Its arrival time is latest_time().
+        """
+        with self._lock:
+            if self.count == 0:
+                return False
+            return self.frames[(self.count - 1) % self.capacity].copy()
+
+    def latest_time(self):
+        """
+        time.perf_counter() of the newest frame, or None before the first one.
+        """
+        with self._lock:
+            return self.times[(self.count - 1) % self.capacity] if self.count else None
+
+    def since(self, t):
+        """
+        All buffered frames that arrived after time t, oldest first.
+
+        Args:
+            t: time.perf_counter() value, e.g. the latest time of the previous call.
+
+        Returns:
+            times: (M,) arrival times, M <= capacity.
+            frames: (M, K, 4) frames.
+        """
+        with self._lock:
+            n = min(self.count, self.capacity)
+            order = (self.count - n + np.arange(n)) % self.capacity
+            times = self.times[order]
+            new = times > t
+            return times[new], self.frames[order[new]]
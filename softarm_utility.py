@@ -8,20 +8,70 @@ unit_scale = 2 * np.pi / 4096  # angle/motor position
 r_pulley = 0.0100  # radius of pulleys
 d = 0.054 / 2  # the distance between center and cables' fixpoints
 
+# L (and Motors_p below) may be a (9,) vector or an (N, 9) trajectory
 def L2motor(Motors_r, Lr, L):
-    Motors_p = np.zeros(9)
-    Motors_p[0:3] = (Lr[0:3] - L[0:3]) / r_pulley / unit_scale + Motors_r[0:3]
-    Motors_p[3:6] = (Lr[3:6] - L[3:6]) / r_pulley / unit_scale + Motors_r[3:6]
-    Motors_p[6:9] = (Lr[6:9] - L[6:9]) / r_pulley / unit_scale + Motors_r[6:9]
+    Motors_p = (np.asarray(Lr) - np.asarray(L)) / r_pulley / unit_scale + np.asarray(Motors_r)
     return Motors_p
 
 def motor2L(Lr, Motors_r, Motors_p):
-    L = np.zeros(9)
-    L[0:3] = Lr[0:3] - ((Motors_p[0:3] - Motors_r[0:3]) * unit_scale * r_pulley)
-    L[3:6] = Lr[3:6] - ((Motors_p[3:6] - Motors_r[3:6]) * unit_scale * r_pulley)
-    L[6:9] = Lr[6:9] - ((Motors_p[6:9] - Motors_r[6:9]) * unit_scale * r_pulley)
+    L = np.asarray(Lr) - ((np.asarray(Motors_p) - np.asarray(Motors_r)) * unit_scale * r_pulley)
     return L
 
+class Motor2Pose:
+    """
+    Fused motor positions -> section and tip transforms for the control loop.
+
+    Replaces the chain motor2L -> FK_L2S_new_3sections -> FK_realrobot.
+    motor2L and the real tendon map are both affine, so their composition is
+    precomputed from the calibration (Lr, Motors_r) as one 9x9 matrix and an
+    offset. Each call is then a single matrix-vector product into a
+    preallocated buffer followed by the chain FK of the selected
+    kinematics_backend into a preallocated (3, 4, 4) output.
+
+    The returned arrays are reused by the next call; copy them to keep them.
+    """
+
+    def __init__(self, Lr, Motors_r, d=d):
+        # Imported here so that scripts using only the serial and motor
+        # helpers do not load (and possibly compile) the backend
+        import kinematics_delta2x as kd2x
+        import kinematics_backend as kb
+        self._FK_chain = kb.FK_chain
+        self._mount_angles = kd2x.MOUNT_ANGLES_REALROBOT
+        Lr = np.asarray(Lr, dtype=float)
+        Motors_r = np.asarray(Motors_r, dtype=float)
+        # Tendon map per section: rows give s, deltax, deltay from l1, l2, l3
+        A = np.array([
+            [1.0 / 3.0, 1.0 / 3.0, 1.0 / 3.0],
+            [0.0, 1.0 / (np.sqrt(3.0) * d), -1.0 / (np.sqrt(3.0) * d)],
+            [-2.0 / (3.0 * d), 1.0 / (3.0 * d), 1.0 / (3.0 * d)],
+        ])
+        A = np.kron(np.eye(3), A)
+        # L = Lr + Motors_r * k - Motors_p * k with k = unit_scale * r_pulley
+        k = unit_scale * r_pulley
+        # Reorder the rows to [S; Deltax; Deltay] so each is a contiguous row
+        order = np.array([0, 3, 6, 1, 4, 7, 2, 5, 8])
+        self.M = np.ascontiguousarray(-k * A[order])
+        self.b = A[order] @ (Lr + k * Motors_r)
+        self.sdxdy = np.zeros((3, 3))
+        self.T = np.zeros((3, 4, 4))
+        self._S = self.sdxdy[0:1]
+        self._Deltax = self.sdxdy[1:2]
+        self._Deltay = self.sdxdy[2:3]
+
+    def __call__(self, Motors_p):
+        """
+        Args:
+            Motors_p: The 9 present motor positions, e.g. from groupReadSync.
+
+        Returns:
+            T: (3, 4, 4) base-frame transforms of the section tips; T[2] is the robot tip.
+        """
+        np.dot(self.M, np.asarray(Motors_p, dtype=float), out=self.sdxdy.reshape(9))
+        self.sdxdy += self.b.reshape(3, 3)
+        self._FK_chain(self._S, self._Deltax, self._Deltay, self._mount_angles, out=self.T)
+        return self.T
+
 def pcc_recon_R(L, R):
     theta = np.arccos(R[2, 2])
     if np.sin(theta) == 0:
@@ -56,23 +106,34 @@ def setup_serial_port(port_name):
     print('Serialport is configured')
     return arduinoObj
 
+def parse_sensor_string(sensor_string):
+    """
+    Quaternions [w, x, y, z] of the base IMU and the three section IMUs as a
+    (4, 4) array, or False if the line is incomplete.
+    """
+    float_pattern = r'[-+]?\d*\.\d+|\d+'
+    data = re.findall(float_pattern, sensor_string)
+    if len(data) == 16 and all(len(d) >= 6 for d in data):
+        return np.array(data, dtype=float).reshape(4, 4)
+    return False
+
 def sensor_call(SerialObj):
     SerialObj.reset_input_buffer()
     try:
         # 使用 errors='ignore' 忽略无法解码的字节
         sensor_string = SerialObj.readline().decode('utf-8', errors='ignore').strip()
-        float_pattern = r'[-+]?\d*\.\d+|\d+'
-        data = re.findall(float_pattern, sensor_string)
-        if len(data) == 16 and all(len(d) >= 6 for d in data):
-            sensor_val = np.array([
-                [float(data[0]), float(data[1]), float(data[2]), float(data[3])],
-                [float(data[4]), float(data[5]), float(data[6]), float(data[7])],
-                [float(data[8]), float(data[9]), float(data[10]), float(data[11])],
-                [float(data[12]), float(data[13]), float(data[14]), float(data[15])]
-            ])
-        else:
-            sensor_val = False
+        sensor_val = parse_sensor_string(sensor_string)
     except Exception as e:
         print(f"Error reading from serial port: {e}")
         sensor_val = False
-    return sensor_val
\ No newline at end of file
+    return sensor_val
+
+def start_sensor_reader(SerialObj, capacity=1024):
+    """
+    Read frames continuously on a background thread instead of blocking in sensor_call.
+
+    Returns a started sensor_reader.SensorReader; reader.latest() returns the
+    newest (4, 4) frame without waiting, reader.since(t) the frames after t.
+    """
+    from sensor_reader import SensorReader
+    return SensorReader(SerialObj, parse_sensor_string, 4, capacity).start()
@@ -25,25 +25,36 @@ def setup_serial_port(port_name):
     print('Serialport is configured')
     return arduinoObj
 
+def parse_sensor_string(sensor_string):
+    """
+    Quaternions [w, x, y, z] of the two IMUs as a (2, 4) array, or False if the line is incomplete.
+    """
+    float_pattern = r'[-+]?\d*\.\d+|\d+'
+    data = re.findall(float_pattern, sensor_string)
+    if len(data) == 8 and all(len(d) >= 6 for d in data):
+        return np.array(data, dtype=float).reshape(2, 4)
+    return False
+
 def sensor_call(SerialObj):
     SerialObj.reset_input_buffer()
     try:
         sensor_string = SerialObj.readline().decode('utf-8', errors='ignore').strip()
-        float_pattern = r'[-+]?\d*\.\d+|\d+'
-        data = re.findall(float_pattern, sensor_string)
-        # print(data)
-        if len(data) == 8 and all(len(d) >= 6 for d in data):
-            sensor_val = np.array([
-                [float(data[0]), float(data[1]), float(data[2]), float(data[3])],
-                [float(data[4]), float(data[5]), float(data[6]), float(data[7])]
-            ])
-        else:
-            sensor_val = False
+        sensor_val = parse_sensor_string(sensor_string)
     except Exception as e:
         print(f"Error reading from serial port: {e}")
         sensor_val = False
     return sensor_val
 
+def start_sensor_reader(SerialObj, capacity=1024):
+    """
+    Read frames continuously on a background thread instead of blocking in sensor_call.
+
+    Returns a started sensor_reader.SensorReader; reader.latest() returns the
+    newest (2, 4) frame without waiting, reader.since(t) the frames after t.
+    """
+    from sensor_reader import SensorReader
+    return SensorReader(SerialObj, parse_sensor_string, 2, capacity).start()
+
 def pcc_recon_R(L, R):
     theta = np.arccos(R[2, 2])
     if np.sin(theta) == 0:
@@ -1,4 +1,5 @@
 import numpy as np
+import time
 import robotic_rotation as rr
 import tentacle_utility as tu
 from test_code.visualization_pcc import plot_single_sections as plt_soft
@@ -19,12 +20,18 @@ if __name__ == "__main__":
     fig2 = plt.figure(2)
     ax2 = fig2.add_subplot(111, projection='3d')
 
-    while True:
-        # Clear previous plots
-        ax.cla()
-        ax2.cla()
-        sensor_val = tu.sensor_call(sensorobj)
-        if sensor_val is not False:
+    last = -np.inf  # arrival time of the newest processed frame
+    with tu.start_sensor_reader(sensorobj) as reader:
+        while True:
+            times, frames = reader.since(last)
+            if len(times) == 0:
+                time.sleep(0.001)  # wait for the next frame
+                continue
+            last = times[-1]
+            sensor_val = frames[-1]  # newest frame, skipping any backlog
+            # Clear previous plots
+            ax.cla()
+            ax2.cla()
             qbase = sensor_val[0]
             qtip = sensor_val[1]
 
@@ -39,4 +46,4 @@ if __name__ == "__main__":
             plt.pause(0.01)
             plt_quat.plot_quaternion(qtip, ax=ax2)
             plt.pause(0.01)
-            
\ No newline at end of file
+            
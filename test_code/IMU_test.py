@@ -17,11 +17,17 @@ if __name__ == "__main__":
     Timu_1 = rr.eul2rotm(np.deg2rad([60,0,0]))
     Timu_2 = rr.eul2rotm(np.deg2rad([30,0,0]))
     Timu_3 = rr.eul2rotm(np.deg2rad([0,0,0]))
-
-    while True:
-        sensor_val = su.sensor_call(sensorobj)
-
-        if sensor_val is not False:
+    Timu = np.stack([Timu_1, Timu_2, Timu_3])
+
+    last = -np.inf  # arrival time of the newest processed frame
+    with su.start_sensor_reader(sensorobj) as reader:
+        while True:
+            times, frames = reader.since(last)
+            if len(times) == 0:
+                time.sleep(0.001)  # wait for the next frame
+                continue
+            last = times[-1]
+            sensor_val = frames[-1]  # newest frame, skipping any backlog
             qbase = sensor_val[0]
             q1 = sensor_val[1]
             q2 = sensor_val[2]
@@ -37,21 +43,10 @@ if __name__ == "__main__":
             # print(f"eul_2(ZYX) \t\t{eul2[0]}, {eul2[1]}, {eul2[2]}")
             # print(f"eul_3(ZYX) \t\t{eul3[0]}, {eul3[1]}, {eul3[2]}")
 
-            qbase_inv = rr.quatinv(qbase)
-            q1_inv = rr.quatinv(q1)
-            q2_inv = rr.quatinv(q2)
-
-            RIMUbase_1 = rr.quat2rotm(rr.quatmultiply(qbase_inv, q1))
-            RIMU1_2 = rr.quat2rotm(rr.quatmultiply(q1_inv, q2))
-            RIMU2_3 = rr.quat2rotm(rr.quatmultiply(q2_inv, q3))
-
-            RROBObase_1 = np.transpose(Timu_1) @ RIMUbase_1 @ Timu_1
-            RROBO1_2 = np.transpose(Timu_2) @ RIMU1_2 @ Timu_2
-            RROBO2_3 = np.transpose(Timu_3) @ RIMU2_3 @ Timu_3
-
-            eulbase_1 = rr.rotm2eul(RROBObase_1)
-            eul1_2 = rr.rotm2eul(RROBO1_2)
-            eul2_3 = rr.rotm2eul(RROBO2_3)
+            # Relative rotations of all sections in one call
+            R, eul = rr.relative_orientation(sensor_val, Timu)
+            RROBObase_1, RROBO1_2, RROBO2_3 = R
+            eulbase_1, eul1_2, eul2_3 = eul
 
             print(f"eul_base_1(ZYX) \t{np.rad2deg(eulbase_1).reshape(1,-1)}")
             print(f"eul_1_2(ZYX) \t\t{np.rad2deg(eul1_2).reshape(1,-1)}")
@@ -69,4 +64,4 @@ if __name__ == "__main__":
             # print('| {:10.4f} | {:10.4f} | {:10.4f} | {:10.4f} | {:10.4f} | {:10.4f} | {:10.4f} | {:10.4f} | {:10.4f} |'.format(*sdxdy_c[:, 0]))
             # print('+------------+------------+------------+------------+------------+------------+------------+------------+------------+')
 
-            # time.sleep(0.5) # for checking data
\ No newline at end of file
+            # time.sleep(0.5) # for checking data
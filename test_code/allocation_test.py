@@ -0,0 +1,82 @@
+import numpy as np
+import tracemalloc
+import gc
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_backend as kb
+import softarm_utility as su
+
+# Blocks allocated by the kinematics code itself, not by this script
+SOURCES = [tracemalloc.Filter(True, module.__file__) for module in (kd2x, kb, su)]
+
+def allocations(func, repeat):
+    """
+    Blocks that repeat calls leave behind in the kinematics modules, from a
+    snapshot diff, and the largest transient peak of a single call.
+    """
+    gc.collect()
+    before = tracemalloc.take_snapshot().filter_traces(SOURCES)
+    peak = 0
+    for _ in range(repeat):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    gc.collect()
+    after = tracemalloc.take_snapshot().filter_traces(SOURCES)
+    new_blocks = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'traceback'))
+    return new_blocks, peak
+
+if __name__ == "__main__":
+    # Only the numba backend is allocation-free; without it the guarantee
+    # cannot be checked, which is a failure rather than a skip
+    assert kb.get_backend() == 'numba', "numba is not installed; the allocation-free calls need the numba backend"
+    kb.warmup()
+
+    # One control cycle (N = 1) and one trajectory batch (N = 1000), with
+    # inputs in the batched layout and preallocated outputs
+    peaks = {}
+    for N in (1, 1000):
+        rng = np.random.default_rng(0)
+        S = rng.uniform(0.08, 0.15, (N, 3))
+        Deltax = rng.uniform(-1.5, 1.5, (N, 3))
+        Deltay = rng.uniform(-1.5, 1.5, (N, 3))
+        L = rng.uniform(0.09, 0.11, (N, 9))
+        T = np.empty((N, 12, 4))
+        T_chain = np.empty((N, 3, 4, 4))
+        H = np.empty((N, 3, 4))
+        sdxdy = np.empty((N, 9))
+        s, dx, dy = S[:, 0].copy(), Deltax[:, 0].copy(), Deltay[:, 0].copy()
+
+        calls = {
+            'FK_S2X_cosimo_new': lambda: kb.FK_S2X_cosimo_new(s, dx, dy, out=H),
+            'FK_chain': lambda: kb.FK_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, out=T_chain),
+            'FK_realrobot': lambda: kb.FK_realrobot(S, Deltax, Deltay, out=T),
+            'FK_L2S_new_3sections': lambda: kb.FK_L2S_new_3sections(L, 0.027, out=sdxdy),
+        }
+        if N == 1:
+            motor2pose = su.Motor2Pose(np.full(9, 0.1), np.full(9, 2048.0))
+            Motors_p = 2048.0 + rng.uniform(-200.0, 200.0, 9)
+            calls['Motor2Pose'] = lambda: motor2pose(Motors_p)
+
+        for name, func in calls.items():
+            tracemalloc.start()
+            allocations(func, 1000)  # warm up under tracing
+            new_blocks, peak = allocations(func, 10000)
+            tracemalloc.stop()
+            peaks[name, N] = peak
+            print(f"N = {N:4}  {name:22} {new_blocks} blocks retained, peak {peak:5} B/call")
+            # Steady state: 10000 calls must not leave a single block behind
+            assert new_blocks == 0, (name, N, new_blocks)
+            # The transient peak holds only the small Python objects of the
+            # call (shape tuples, array views, the numba dispatch). At N = 1000
+            # any batch-sized output or scratch array takes at least 8000 B.
+            assert peak < 2048, (name, N, peak)
+
+    # The peak does not grow with N: no array of the call scales with the batch
+    for name in ('FK_S2X_cosimo_new', 'FK_chain', 'FK_realrobot', 'FK_L2S_new_3sections'):
+        assert peaks[name, 1000] - peaks[name, 1] < 512, (name, peaks[name, 1], peaks[name, 1000])
+    print("no steady-state allocations, transient peak independent of N")
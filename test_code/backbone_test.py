@@ -0,0 +1,36 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 1000
+    S = rng.uniform(0.07, 0.09, (N, 3))
+    Deltax = rng.uniform(-1.5, 1.5, (N, 3))
+    Deltay = rng.uniform(-1.5, 1.5, (N, 3))
+
+    points, frames = kd2x.backbone(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, return_frames=True)
+    T = kd2x.FK_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT)
+    assert np.allclose(points[:, :, -1], T[:, :, :3, 3], atol=1e-12)
+    assert np.allclose(frames[:, :, -1], T[:, :, :3, :3], atol=1e-12)
+    print("section tips match FK_chain")
+
+    # The sampled curve has the length of the sections, also when straight
+    fine = kd2x.backbone(S[:10], Deltax[:10], Deltay[:10], n_points=2000)
+    assert np.allclose(np.linalg.norm(np.diff(fine, axis=2), axis=-1).sum(axis=-1), S[:10], rtol=1e-6)
+    straight = kd2x.backbone([0.1, 0.1, 0.1], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], n_points=5)
+    assert np.allclose(straight[..., 2].ravel(), np.r_[0:0.1:5j, 0.1:0.2:5j, 0.2:0.3:5j])
+    print("arc lengths match, straight sections are exact")
+
+    repeat = 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        kd2x.backbone(S[0], Deltax[0], Deltay[0], kd2x.MOUNT_ANGLES_REALROBOT)
+    print(f"single configuration: {(time.perf_counter() - start) / repeat * 1e6:.1f} us")
+    start = time.perf_counter()
+    kd2x.backbone(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT)
+    print(f"batch of {N}: {(time.perf_counter() - start) / N * 1e6:.1f} us per configuration")
@@ -0,0 +1,36 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_l2delta as kl2d
+import kinematics_backend as kb
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    kb.warmup()
+    print(f"backend: {kb.get_backend()}, warm-up {time.perf_counter() - start:.2f} s")
+
+    rng = np.random.default_rng(0)
+    N = 10000
+    S = rng.uniform(0.07, 0.09, (N, 3))
+    Deltax = rng.uniform(-1.5, 1.5, (N, 3))
+    Deltay = rng.uniform(-1.5, 1.5, (N, 3))
+    L = rng.uniform(0.07, 0.09, (N, 9))
+    d = 0.027
+
+    # Batched and single calls agree with the NumPy implementation
+    T = kd2x.FK_realrobot(S, Deltax, Deltay)
+    assert np.allclose(kb.FK_realrobot(S, Deltax, Deltay), T, rtol=0.0, atol=1e-12)
+    assert np.allclose(kb.FK_realrobot(S[0], Deltax[0], Deltay[0]), T[0], rtol=0.0, atol=1e-12)
+    sdxdy = kl2d.FK_L2S_new_3sections(L, d)
+    assert np.allclose(kb.FK_L2S_new_3sections(L, d), sdxdy, rtol=0.0, atol=1e-12)
+    assert np.allclose(kb.FK_L2S_new_3sections(L[0], d), sdxdy[0], rtol=0.0, atol=1e-12)
+    J, T_chain = kd2x.Jacobian_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, return_T=True)
+    J_b, T_b = kb.Jacobian_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, return_T=True)
+    assert np.allclose(J_b, J, rtol=0.0, atol=1e-12) and np.allclose(T_b, T_chain, rtol=0.0, atol=1e-12)
+    assert np.allclose(kb.Jacobian_chain(S[0], Deltax[0], Deltay[0]), kd2x.Jacobian_chain(S[0], Deltax[0], Deltay[0]),
+                       rtol=0.0, atol=1e-12)
+    print("backend matches the NumPy kinematics to 1e-12")
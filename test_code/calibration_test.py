@@ -43,11 +43,14 @@ MOTOR_TENSION_CURRENT       = TENSION_CURRENT_VALUE * MOTOR_Orients
 port_imu = "COM14"        # For Windows
 port_imu = "/dev/ttyACM0" # For Linux
 sensorobj = su.setup_serial_port(port_imu)
+# Frames are read on a background thread, so the plot updates never block
+reader = su.start_sensor_reader(sensorobj)
 
 # For IMU sensing
 Timu_1 = rr.eul2rotm(np.deg2rad([60,0,0]))
 Timu_2 = rr.eul2rotm(np.deg2rad([30,0,0]))
 Timu_3 = rr.eul2rotm(np.deg2rad([0,0,0]))
+Timu = np.stack([Timu_1, Timu_2, Timu_3])
 
 # ======================================================================================
 #                                   Dynamixel Setup
@@ -126,16 +129,12 @@ plot.addItem(yline)
 # Data updating function
 def update1():
     global storage_base_1
-    while 1:
-        sensor_val = su.sensor_call(sensorobj)
-        if sensor_val is not False:
-            qbase = sensor_val[0]
-            q1 = sensor_val[1]
-            qbase_inv = rr.quatinv(qbase)
-            RIMUbase_1 = rr.quat2rotm(rr.quatmultiply(qbase_inv, q1))
-            RROBObase_1 = np.transpose(Timu_1) @ RIMUbase_1 @ Timu_1
-            eulbase_1 = np.rad2deg(rr.rotm2eul(RROBObase_1))
-            break
+    sensor_val = reader.latest()
+    if sensor_val is False:
+        return  # no frame received yet
+    # Relative rotations of all sections in one call, base to 1st here
+    _, eul = rr.relative_orientation(sensor_val, Timu)
+    eulbase_1 = np.rad2deg(eul[0])
     storage_base_1 = np.vstack((storage_base_1[1:], np.array(eulbase_1).reshape(1,-1)))
     pitch_base_1.setData(time_cal, storage_base_1[:,1])
     roll_base_1.setData(time_cal, storage_base_1[:,2])
@@ -219,16 +218,12 @@ plot.addItem(yline)
 # Data updating function
 def update2():
     global storage_1_2
-    while 1:
-        sensor_val = su.sensor_call(sensorobj)
-        if sensor_val is not False:
-            q1 = sensor_val[1]
-            q2 = sensor_val[2]
-            q1_inv = rr.quatinv(q1)
-            RIMU1_2 = rr.quat2rotm(rr.quatmultiply(q1_inv, q2))
-            RROBO1_2 = np.transpose(Timu_2) @ RIMU1_2 @ Timu_2
-            eul1_2 = np.rad2deg(rr.rotm2eul(RROBO1_2))
-            break
+    sensor_val = reader.latest()
+    if sensor_val is False:
+        return  # no frame received yet
+    # Relative rotations of all sections in one call, 1st to 2nd here
+    _, eul = rr.relative_orientation(sensor_val, Timu)
+    eul1_2 = np.rad2deg(eul[1])
     storage_1_2 = np.vstack((storage_1_2[1:], np.array(eul1_2).reshape(1,-1)))
     pitch_1_2.setData(time_cal, storage_1_2[:,1])
     roll_1_2.setData(time_cal, storage_1_2[:,2])
@@ -312,16 +307,12 @@ plot.addItem(yline)
 # Data updating function
 def update3():
     global storage_2_3
-    while 1:
-        sensor_val = su.sensor_call(sensorobj)
-        if sensor_val is not False:
-            q2 = sensor_val[2]
-            q3 = sensor_val[3]
-            q2_inv = rr.quatinv(q2)
-            RIMU2_3 = rr.quat2rotm(rr.quatmultiply(q2_inv, q3))
-            RROBO2_3 = np.transpose(Timu_3) @ RIMU2_3 @ Timu_3
-            eul2_3 = np.rad2deg(rr.rotm2eul(RROBO2_3))
-            break
+    sensor_val = reader.latest()
+    if sensor_val is False:
+        return  # no frame received yet
+    # Relative rotations of all sections in one call, 2nd to 3rd here
+    _, eul = rr.relative_orientation(sensor_val, Timu)
+    eul2_3 = np.rad2deg(eul[2])
     storage_2_3 = np.vstack((storage_2_3[1:], np.array(eul2_3).reshape(1,-1)))
     pitch_2_3.setData(time_cal, storage_2_3[:,1])
     roll_2_3.setData(time_cal, storage_2_3[:,2])
@@ -409,4 +400,5 @@ print(MOTOR_POSITION)
 # ======================================================================================
 #                                   Close everything
 # ======================================================================================
+reader.stop()
 output_ShutDown = du.ShutDown(port_handler, packet_handler, MOTOR_IDs)
\ No newline at end of file
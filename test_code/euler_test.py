@@ -0,0 +1,70 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import robotic_rotation as rr
+
+# Scalar reference implementations, as in robotic_rotation before batching
+def Rx(a):
+    return np.array([[1, 0, 0], [0, np.cos(a), -np.sin(a)], [0, np.sin(a), np.cos(a)]])
+
+def Ry(a):
+    return np.array([[np.cos(a), 0, np.sin(a)], [0, 1, 0], [-np.sin(a), 0, np.cos(a)]])
+
+def Rz(a):
+    return np.array([[np.cos(a), -np.sin(a), 0], [np.sin(a), np.cos(a), 0], [0, 0, 1]])
+
+def eul2rotm_ref(eul, order):
+    if order == 'XYZ':
+        return Rx(eul[0]) @ Ry(eul[1]) @ Rz(eul[2])
+    return Rz(eul[0]) @ Ry(eul[1]) @ Rx(eul[2])
+
+def rotm2eul_ref(R, order):
+    if order == 'XYZ':
+        if R[2, 2] < 1:
+            if R[2, 2] > -1:
+                return [np.arctan2(-R[1, 2], R[2, 2]), np.arcsin(R[0, 2]), np.arctan2(-R[0, 1], R[0, 0])]
+            return [-np.arctan2(R[0, 1], R[0, 0]), -np.pi / 2, 0]
+        return [np.arctan2(R[0, 1], R[0, 0]), np.pi / 2, 0]
+    if R[2, 0] < 1:
+        if R[2, 0] > -1:
+            return [np.arctan2(R[1, 0], R[0, 0]), np.arcsin(-R[2, 0]), np.arctan2(R[2, 1], R[2, 2])]
+        return [-np.arctan2(-R[1, 2], R[1, 1]), np.pi / 2, 0]
+    return [np.arctan2(-R[1, 2], R[1, 1]), -np.pi / 2, 0]
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 10000
+    eul = rng.uniform(-np.pi, np.pi, (N, 3))
+    eul[:, 1] /= 2
+    # Gimbal lock and the special-case branches of both orders
+    eul[:8] = [[0.3, np.pi / 2, 0.2], [0.3, -np.pi / 2, 0.2], [0, 0, 0], [0.5, 0, 0],
+               [np.pi, 0, 0], [0, 0, np.pi], [0.4, 0, np.pi], [np.pi, 0, 0.4]]
+
+    for order in ['ZYX', 'XYZ']:
+        R = rr.eul2rotm(eul, order)
+        R_ref = np.array([eul2rotm_ref(e, order) for e in eul])
+        assert R.shape == (N, 3, 3) and np.allclose(R, R_ref, rtol=0, atol=1e-15)
+        assert np.allclose(rr.eul2rotm(eul[10], order), R_ref[10], rtol=0, atol=1e-15)
+
+        # Special cases on the exact reference matrices as well as on the batched ones
+        for M in [R, R_ref]:
+            e = rr.rotm2eul(M, order)
+            e_ref = np.array([rotm2eul_ref(m, order) for m in M])
+            assert e.shape == (N, 3) and np.allclose(e, e_ref, rtol=0, atol=1e-15)
+        assert np.allclose(rr.rotm2eul(R_ref[0], order), rotm2eul_ref(R_ref[0], order), rtol=0, atol=0)
+        print(f"{order}: batched eul2rotm and rotm2eul match the scalar versions, special cases included")
+
+    for order in ['ZYX', 'XYZ']:
+        R = rr.eul2rotm(eul, order)
+        start = time.perf_counter()
+        for e, M in zip(eul, R):
+            eul2rotm_ref(e, order)
+            rotm2eul_ref(M, order)
+        loop = time.perf_counter() - start
+        start = time.perf_counter()
+        rr.rotm2eul(rr.eul2rotm(eul, order), order)
+        batched = time.perf_counter() - start
+        print(f"{order}: per-matrix loop {loop * 1e3:.1f} ms, batched {batched * 1e3:.2f} ms for N={N}")
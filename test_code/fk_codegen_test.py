@@ -0,0 +1,59 @@
+import numpy as np
+import importlib.util
+import tempfile
+import time
+import os
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_generated as kg
+import fk_codegen
+
+def load(path, n, mount_degrees=None):
+    fk_codegen.write_module(path, n, mount_degrees)
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, f'FK_chain{n}')
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 10000
+    S = rng.uniform(0.07, 0.09, (N, 3))
+    Deltax = rng.uniform(-1.5, 1.5, (N, 3))
+    Deltay = rng.uniform(-1.5, 1.5, (N, 3))
+
+    # The committed module is what the generator produces
+    with open("../kinematics_generated.py") as f:
+        committed = f.read()
+    assert fk_codegen.generate_fk_chain(3, [0, -30, -60], 'FK_realrobot_generated') in committed
+    print("kinematics_generated.py is up to date")
+
+    # Regression against the MATLAB translation
+    T = kd2x.FK_realrobot(S, Deltax, Deltay)
+    assert np.allclose(kg.FK_realrobot_generated(S, Deltax, Deltay), T, rtol=0, atol=1e-12)
+    assert np.allclose(kg.FK_realrobot_generated(S[0], Deltax[0], Deltay[0]), T[0], rtol=0, atol=1e-12)
+    straight = kg.FK_realrobot_generated([0.1, 0.1, 0.1], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0])
+    assert np.allclose(straight[[2, 6, 10], 3], [0.1, 0.2, 0.3], rtol=0, atol=1e-15)
+    print("generated 3-section code matches FK_realrobot, straight sections are exact")
+
+    # Other section counts against FK_chain
+    with tempfile.TemporaryDirectory() as path:
+        for n, mount in [(1, None), (5, [0, -30, -60, 45, 90])]:
+            FK = load(os.path.join(path, f'fk{n}.py'), n, mount)
+            S5 = rng.uniform(0.07, 0.09, (100, n))
+            Dx5 = rng.uniform(-1.5, 1.5, (100, n))
+            Dy5 = rng.uniform(-1.5, 1.5, (100, n))
+            mount_angles = None if mount is None else np.deg2rad(mount)
+            T5 = kd2x.FK_chain(S5, Dx5, Dy5, mount_angles)
+            assert np.allclose(FK(S5, Dx5, Dy5).reshape(100, n, 4, 4), T5, rtol=0, atol=1e-12)
+            print(f"generated {n}-section code matches FK_chain")
+
+    repeat = 20
+    for name, FK in [("FK_realrobot", kd2x.FK_realrobot), ("FK_realrobot_generated", kg.FK_realrobot_generated)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            FK(S, Deltax, Deltay)
+        print(f"{name}: {(time.perf_counter() - start) / repeat * 1e3:.2f} ms for N={N}")
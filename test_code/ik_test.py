@@ -0,0 +1,70 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_x2delta as kx2d
+
+def random_sdxdy(N, rng):
+    sdxdy = np.zeros((N, 9))
+    sdxdy[:, 0::3] = rng.uniform(0.08, 0.15, (N, 3))
+    sdxdy[:, 1::3] = rng.uniform(-1.0, 1.0, (N, 3))
+    sdxdy[:, 2::3] = rng.uniform(-1.0, 1.0, (N, 3))
+    return sdxdy
+
+def tip_transform(S, Deltax, Deltay):
+    T = kd2x.FK_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT)
+    return T[..., -1, :, :]
+
+def sections(sdxdy):
+    return sdxdy[..., 0::3], sdxdy[..., 1::3], sdxdy[..., 2::3]
+
+def report(name, N, info, elapsed):
+    print('| {:32} | {:>6} | {:>11.1f}% | {:>18.1f} |'.format(
+        name, N, 100.0 * np.mean(info['converged']), elapsed / N * 1e6))
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 2000
+    sdxdy_true = random_sdxdy(N, rng)
+    T_target = tip_transform(*sections(sdxdy_true))
+
+    print(f"kinematics backend: {kx2d.kb.get_backend()}")
+    print('+----------------------------------+--------+--------------+--------------------+')
+    print('| {:32} | {:>6} | {:>12} | {:>18} |'.format('case', 'N', 'converged', 'time/target [us]'))
+    print('+----------------------------------+--------+--------------+--------------------+')
+
+    # Batched, warm-started from a perturbed neighbouring configuration
+    sdxdy0 = sdxdy_true + rng.normal(0.0, 0.05, sdxdy_true.shape)
+    kx2d.IK_realrobot(T_target[:2], *sections(sdxdy0[:2]))  # compile the backend kernels outside the timing
+    start = time.perf_counter()
+    S, Deltax, Deltay, info = kx2d.IK_realrobot(T_target, *sections(sdxdy0))
+    report('batched, warm start', N, info, time.perf_counter() - start)
+    converged = info['converged']
+    assert S.shape == Deltax.shape == Deltay.shape == (N, 3)
+    # The solution is in the layout of the FK_realrobot input
+    T_solution = kd2x.FK_realrobot(S, Deltax, Deltay)[:, 8:12]
+    pose_error = np.abs(T_solution[converged] - T_target[converged]).max()
+    assert pose_error < 1e-5, pose_error
+
+    # Batched, cold start from the default configuration
+    start = time.perf_counter()
+    S, Deltax, Deltay, info = kx2d.IK_realrobot(T_target, max_iter=200)
+    report('batched, cold start', N, info, time.perf_counter() - start)
+
+    # Control loop: one target per call along a smooth trajectory
+    t = np.linspace(0.0, 1.0, 200)[:, None]
+    trajectory = sdxdy_true[0] + 0.2 * np.sin(2 * np.pi * t) * np.array([0, 1, 1, 0, -1, 1, 0, 1, -1])
+    T_trajectory = tip_transform(*sections(trajectory))
+    solver = kx2d.IKSolver(*sections(trajectory[0]), max_iter=50, max_time=0.01)
+    solver.solve(T_trajectory[0])  # compile the backend kernels outside the timing
+    results = []
+    start = time.perf_counter()
+    for T in T_trajectory:
+        S, Deltax, Deltay, info = solver.solve(T)
+        results.append(info['converged'])
+    assert S.shape == (3,) and np.abs(tip_transform(S, Deltax, Deltay) - T_trajectory[-1]).max() < 1e-5
+    report('single target, warm-started loop', len(T_trajectory), {'converged': np.array(results)}, time.perf_counter() - start)
+    print('+----------------------------------+--------+--------------+--------------------+')
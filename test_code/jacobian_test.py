@@ -0,0 +1,68 @@
+import numpy as np
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+
+def tip_pose(sdxdy):
+    T = kd2x.FK_realrobot(sdxdy[..., 0::3], sdxdy[..., 1::3], sdxdy[..., 2::3])
+    return T[..., 8:11, :3], T[..., 8:11, 3]
+
+def jacobian_fd(sdxdy, h=1e-6):
+    """
+    Central finite differences of the FK_realrobot tip pose, rows [dp; w].
+    """
+    R, _ = tip_pose(sdxdy)
+    J = np.zeros(sdxdy.shape[:-1] + (6, 9))
+    for k in range(9):
+        dq = np.zeros(9)
+        dq[k] = h
+        R_p, p_p = tip_pose(sdxdy + dq)
+        R_m, p_m = tip_pose(sdxdy - dq)
+        W = (R_p - R_m) / (2 * h) @ np.swapaxes(R, -1, -2)
+        J[..., :3, k] = (p_p - p_m) / (2 * h)
+        J[..., 3:, k] = 0.5 * np.stack([W[..., 2, 1] - W[..., 1, 2],
+                                        W[..., 0, 2] - W[..., 2, 0],
+                                        W[..., 1, 0] - W[..., 0, 1]], axis=-1)
+    return J
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 200
+    sdxdy = np.zeros((N, 9))
+    sdxdy[:, 0::3] = rng.uniform(0.08, 0.15, (N, 3))
+    sdxdy[:, 1::3] = rng.uniform(-1.5, 1.5, (N, 3))
+    sdxdy[:, 2::3] = rng.uniform(-1.5, 1.5, (N, 3))
+
+    # Section derivatives: only the translation depends on s
+    s, dx, dy = sdxdy[:, 0], sdxdy[:, 1], sdxdy[:, 2]
+    dH = kd2x.dFK_S2X_cosimo_new(s, dx, dy)
+    h = 1e-6
+    for k, (ds, ddx, ddy) in enumerate([(h, 0, 0), (0, h, 0), (0, 0, h)]):
+        dH_fd = (kd2x.FK_S2X_cosimo_new(s + ds, dx + ddx, dy + ddy)
+                 - kd2x.FK_S2X_cosimo_new(s - ds, dx - ddx, dy - ddy)) / (2 * h)
+        assert np.allclose(dH[:, k], dH_fd, atol=1e-8), k
+    assert not dH[:, 0, :, :3].any()
+    assert kd2x.dFK_S2X_cosimo_new(0.1, 0.3, -0.2).shape == (3, 3, 4)
+
+    # Single configuration
+    J = kd2x.Jacobian_realrobot(sdxdy[0])
+    J_fd = jacobian_fd(sdxdy[0])
+    print(f"single: shape {J.shape}, max error {np.max(np.abs(J - J_fd)):.3e}")
+    assert J.shape == (6, 9)
+    assert np.allclose(J, J_fd, atol=1e-7)
+
+    # Batch of configurations
+    J = kd2x.Jacobian_realrobot(sdxdy)
+    J_fd = jacobian_fd(sdxdy)
+    print(f"batch:  shape {J.shape}, max error {np.max(np.abs(J - J_fd)):.3e}")
+    assert J.shape == (N, 6, 9)
+    assert np.allclose(J, J_fd, atol=1e-7)
+
+    # The chain transforms returned alongside match FK_realrobot
+    J, T = kd2x.Jacobian_chain(sdxdy[:, 0::3], sdxdy[:, 1::3], sdxdy[:, 2::3],
+                               kd2x.MOUNT_ANGLES_REALROBOT, return_T=True)
+    T_real = kd2x.FK_realrobot(sdxdy[:, 0::3], sdxdy[:, 1::3], sdxdy[:, 2::3])
+    assert np.allclose(T.reshape(N, 12, 4), T_real, atol=1e-12)
+    print("Jacobian matches finite differences")
@@ -0,0 +1,69 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_backend as kb
+import kinematics_l2delta as kl2d
+import softarm_utility as su
+
+def random_configurations(N, seed=0):
+    rng = np.random.default_rng(seed)
+    S = rng.uniform(0.08, 0.15, (N, 3))
+    Deltax = rng.uniform(-1.5, 1.5, (N, 3))
+    Deltay = rng.uniform(-1.5, 1.5, (N, 3))
+    return S, Deltax, Deltay
+
+def time_per_pose(func, N, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat / N
+
+if __name__ == "__main__":
+    kb.warmup()
+
+    print('+-------------------------------+------------+--------------------+')
+    print('| {:29} | {:>10} | {:>18} |'.format('method', 'N', 'cost per pose [us]'))
+    print('+-------------------------------+------------+--------------------+')
+
+    # Python loop over single poses, as used before batching
+    S, Deltax, Deltay = random_configurations(1000)
+    cost = time_per_pose(lambda: [kd2x.FK_realrobot(S[i], Deltax[i], Deltay[i]) for i in range(1000)], 1000, 3)
+    print('| {:29} | {:>10} | {:18.3f} |'.format('FK_realrobot (python loop)', 1000, cost * 1e6))
+
+    # Batched calls
+    for N, repeat in [(1, 2000), (1000, 100), (1000000, 1)]:
+        S, Deltax, Deltay = random_configurations(N)
+        if N == 1:
+            S, Deltax, Deltay = S[0], Deltax[0], Deltay[0]
+        cost = time_per_pose(lambda: kd2x.FK_realrobot(S, Deltax, Deltay), N, repeat)
+        print('| {:29} | {:>10} | {:18.3f} |'.format('FK_realrobot (batched)', N, cost * 1e6))
+        cost = time_per_pose(lambda: kd2x.FK_chain(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT), N, repeat)
+        print('| {:29} | {:>10} | {:18.3f} |'.format('FK_chain (3 sections)', N, cost * 1e6))
+        cost = time_per_pose(lambda: kb.FK_realrobot(S, Deltax, Deltay), N, repeat)
+        print('| {:29} | {:>10} | {:18.3f} |'.format('backend FK_realrobot (' + kb.get_backend() + ')', N, cost * 1e6))
+    print('+-------------------------------+------------+--------------------+')
+
+    # Control loop step: motor positions -> tip pose
+    Lr = np.full(9, 0.1)
+    Motors_r = np.full(9, 2048.0)
+    Motors_p = Motors_r + np.random.default_rng(0).integers(-200, 200, 9)
+    def three_calls():
+        L = su.motor2L(Lr, Motors_r, Motors_p)
+        sdxdy = kl2d.FK_L2S_new_3sections(L, su.d)
+        return kd2x.FK_realrobot(sdxdy[0::3], sdxdy[1::3], sdxdy[2::3])
+    motor2pose = su.Motor2Pose(Lr, Motors_r)
+    assert np.allclose(motor2pose(Motors_p).reshape(12, 4), three_calls(), atol=1e-12)
+
+    print()
+    print('+-------------------------------+--------------------+')
+    print('| {:29} | {:>18} |'.format('motors -> pose', 'latency [us]'))
+    print('+-------------------------------+--------------------+')
+    cost = time_per_pose(three_calls, 1, 5000)
+    print('| {:29} | {:18.3f} |'.format('motor2L + FK_L2S + FK', cost * 1e6))
+    cost = time_per_pose(lambda: motor2pose(Motors_p), 1, 5000)
+    print('| {:29} | {:18.3f} |'.format('Motor2Pose (' + kb.get_backend() + ')', cost * 1e6))
+    print('+-------------------------------+--------------------+')
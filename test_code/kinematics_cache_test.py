@@ -0,0 +1,69 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_l2delta as kl2d
+import kinematics_cache as kc
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    resolution = (1e-6, 1e-5, 1e-5)
+    FK = kc.QuantizedCache(kd2x.FK_realrobot, resolution, maxsize=256)
+
+    # A still arm read through noisy sensors, with an occasional move
+    S, Deltax, Deltay = np.full(3, 0.08), np.array([0.4, -0.3, 0.2]), np.array([0.1, 0.5, -0.4])
+    worst = 0.0
+    for k in range(5000):
+        if k % 1000 == 0:
+            Deltax = Deltax + 0.1
+        noisy = [x + rng.uniform(-r, r, 3) * 0.2 for x, r in zip((S, Deltax, Deltay), resolution)]
+        T = FK(*noisy)
+        worst = max(worst, np.abs(T - kd2x.FK_realrobot(*noisy)).max())
+    info = FK.cache_info()
+    print(info)
+    assert info.hit_rate > 0.9
+    print(f"largest deviation from the uncached result: {worst:.1e}")
+    assert worst < 1e-5
+
+    # Whichever call filled the cache, the result is within the resolution
+    a = FK(S + 0.3e-6, Deltax, Deltay)
+    FK.cache_clear()
+    b = FK(S - 0.3e-6, Deltax, Deltay)
+    assert np.allclose(a, b, rtol=0, atol=1e-5) and not b.flags.writeable
+
+    # Near-straight sections at the home pose: the inputs are not rounded to
+    # the 0/0 point of the PCC maps
+    FK.cache_clear()
+    home = (np.full(3, 0.1), np.full(3, 3e-6), np.zeros(3))
+    T = FK(*home)
+    assert np.all(np.isfinite(T)) and np.array_equal(T, kd2x.FK_realrobot(*home))
+    assert np.allclose(FK(np.full(3, 0.1), np.full(3, -2e-6), np.full(3, 1e-6)), T, rtol=0, atol=1e-5)
+
+    # Bounded LRU eviction
+    L2S = kc.QuantizedCache(kl2d.FK_L2S_new_3sections, (1e-6, None), maxsize=10)
+    for k in range(100):
+        L2S(np.full(9, 0.1 + 1e-3 * k), 0.027)
+    assert L2S.cache_info().currsize == 10
+    L2S(np.full(9, 0.1 + 1e-3 * 99), 0.027)
+    L2S(np.full(9, 0.1), 0.027)
+    assert L2S.cache_info().hits == 1 and L2S.cache_info().misses == 101
+
+    # A resolution tuple must cover every argument, or inputs would share keys
+    try:
+        kc.QuantizedCache(kd2x.FK_realrobot, (1e-6, 1e-5))(S, Deltax, Deltay)
+        raise AssertionError("short resolution tuple accepted")
+    except ValueError:
+        pass
+
+    repeat = 20000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        kd2x.FK_realrobot(S, Deltax, Deltay)
+    uncached = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        FK(S, Deltax, Deltay)
+    print(f"FK_realrobot {uncached * 1e6:.1f} us, cache hit {(time.perf_counter() - start) / repeat * 1e6:.1f} us")
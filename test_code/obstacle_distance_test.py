@@ -0,0 +1,100 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import obstacle_distance as od
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    cloud = rng.uniform(-0.3, 0.3, (20000, 3)) + [0.0, 0.0, 0.3]
+    cloud = cloud[np.linalg.norm(cloud - [0.0, 0.0, 0.15], axis=1) > 0.2]
+    obstacles = od.ObstacleSet(points=cloud,
+                               spheres=[[0.15, 0.0, 0.15, 0.03]],
+                               boxes=[[0.0, -0.15, 0.1, 0.02, 0.02, 0.1]],
+                               capsules=[[-0.2, 0.1, 0.0, -0.2, 0.1, 0.3, 0.01]], voxel_size=None)
+
+    # Analytic primitives against hand-computed distances
+    probe = od.ObstacleSet(spheres=[[0, 0, 0, 1]], boxes=[[3, 0, 0, 1, 1, 1]], capsules=[[0, 5, 0, 0, 5, 2, 0.5]],
+                           voxel_size=None)
+    assert np.allclose(probe.distance([[0, 0, 0.5], [3, 0, 2.5], [0, 5.5, 1], [1.5, 0, 0]]), [-0.5, 1.5, 0.0, 0.5])
+
+    # Single configuration against a brute-force distance to every obstacle point
+    S, Deltax, Deltay = np.full(3, 0.08), np.array([0.4, -0.3, 0.2]), np.array([0.1, 0.5, -0.4])
+    distance, index = obstacles.backbone_distance(S, Deltax, Deltay, radius=0.01)
+    points = kd2x.backbone(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT)
+    brute = np.sqrt(((points.reshape(-1, 1, 3) - cloud) ** 2).sum(axis=-1)).min() - 0.01
+    primitives = od.ObstacleSet(spheres=obstacles.spheres, boxes=obstacles.boxes, capsules=obstacles.capsules,
+                                 voxel_size=None)
+    assert np.isclose(distance, min(brute, primitives.distance(points).min() - 0.01))
+    print(f"clearance {distance * 1e3:.1f} mm at section {index[0]}, sample {index[1]}")
+
+    repeat = 200
+    start = time.perf_counter()
+    for _ in range(repeat):
+        obstacles.backbone_distance(S, Deltax, Deltay, radius=0.01)
+    print(f"single query, exact:        {(time.perf_counter() - start) / repeat * 1e6:.1f} us")
+
+    # Interpolated 5 mm distance grid for control-rate queries
+    start = time.perf_counter()
+    obstacles.build_distance_grid(voxel_size=0.005, max_nodes=None)
+    print(f"distance grid built in {time.perf_counter() - start:.1f} s")
+    reference = obstacles._backbone_distance(S, Deltax, Deltay, kd2x.MOUNT_ANGLES_REALROBOT, 20, exact=False)
+    distance, index = obstacles.backbone_distance(S, Deltax, Deltay)
+    assert np.isclose(distance, reference[0], rtol=0, atol=1e-12) and np.array_equal(index, reference[1])
+    for _ in range(repeat):
+        obstacles.backbone_distance(S, Deltax, Deltay, radius=0.01)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        obstacles.backbone_distance(S, Deltax, Deltay, radius=0.01)
+    print(f"single query, interpolated: {(time.perf_counter() - start) / repeat * 1e6:.1f} us "
+          f"({od.kb.get_backend()} backend)")
+    probes = rng.uniform(-0.25, 0.25, (5000, 3))
+    error = np.abs(obstacles.distance(probes) - obstacles.distance(probes, exact=True)).max()
+    assert error <= np.sqrt(3) / 2 * 0.005, error
+    print(f"interpolation error {error * 1e3:.2f} mm")
+
+    # Whole trajectory in one call
+    N = 1000
+    t = np.linspace(0.0, 1.0, N)[:, None]
+    S_t = np.full((N, 3), 0.08)
+    Deltax_t, Deltay_t = 1.5 * np.sin(2 * np.pi * t) * [1, -1, 1], 1.5 * np.cos(2 * np.pi * t) * [1, 1, -1]
+    start = time.perf_counter()
+    distance, index = obstacles.backbone_distance(S_t, Deltax_t, Deltay_t, radius=0.01)
+    elapsed = time.perf_counter() - start
+    reference = obstacles._backbone_distance(S_t, Deltax_t, Deltay_t, kd2x.MOUNT_ANGLES_REALROBOT, 20, exact=False)
+    assert np.allclose(distance, reference[0] - 0.01, rtol=0, atol=1e-12)
+    print(f"trajectory: {elapsed / N * 1e6:.1f} us per configuration, "
+          f"{np.count_nonzero(distance < 0)} of {N} configurations in contact")
+    assert np.allclose(obstacles.penetration(S_t, Deltax_t, Deltay_t, radius=0.01), np.maximum(-distance, 0.0))
+
+    # Default grid: sized from the obstacle bounds and limited to 2**18 nodes
+    start = time.perf_counter()
+    scene = od.ObstacleSet(points=cloud, spheres=obstacles.spheres, boxes=obstacles.boxes, capsules=obstacles.capsules)
+    print(f"default grid: {scene._grid.size} nodes, {scene._grid_voxel * 1e3:.1f} mm voxel, "
+          f"built in {time.perf_counter() - start:.2f} s")
+    assert scene._grid.size <= 2 ** 18
+    distance, _ = scene.backbone_distance(S_t, Deltax_t, Deltay_t, radius=0.01)
+    exact, _ = scene.backbone_distance(S_t, Deltax_t, Deltay_t, radius=0.01, exact=True)
+    assert np.abs(distance - exact).max() <= np.sqrt(3) / 2 * scene._grid_voxel
+
+    # A single sphere: most of the trajectory leaves the small grid around it,
+    # and the samples outside the grid are at least the margin away
+    sphere = od.ObstacleSet(spheres=[[0.1, 0.0, 0.2, 0.02]])
+    distance, index = sphere.backbone_distance(S_t, Deltax_t, Deltay_t)
+    reference = sphere._backbone_distance(S_t, Deltax_t, Deltay_t, kd2x.MOUNT_ANGLES_REALROBOT, 20, exact=False)
+    assert np.allclose(distance, reference[0], rtol=0, atol=1e-12) and np.array_equal(index, reference[1])
+    exact, _ = sphere.backbone_distance(S_t, Deltax_t, Deltay_t, exact=True)
+    assert np.abs(distance - exact).max() <= np.sqrt(3) / 2 * sphere._grid_voxel
+
+    # A section needs both of its ends sampled
+    for n_points in (0, 1):
+        try:
+            sphere.backbone_distance(S, Deltax, Deltay, n_points=n_points)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("n_points < 2 must raise ValueError")
+    print("default grid and single-sphere queries match the exact distance")
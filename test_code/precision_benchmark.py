@@ -0,0 +1,64 @@
+import numpy as np
+import tracemalloc
+import time
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import kinematics_l2delta as kl2d
+import kinematics_backend as kb
+import workspace_index as wi
+
+def measure(func, repeat=5):
+    """
+    Warm func up, then return its result, the median wall time of repeat
+    calls and the peak of traced memory of one call.
+    """
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, np.median(times), peak
+
+if __name__ == "__main__":
+    kb.warmup()
+    N = 1000000
+    sdxdy = wi.sample_configurations(N, rng=0)
+    S, Deltax, Deltay = sdxdy[:, 0::3], sdxdy[:, 1::3], sdxdy[:, 2::3]
+    L = kl2d.IK_S2L_new_3sections(sdxdy, 0.027)
+
+    # Error bound of float32 against float64 over the sampled workspace, and
+    # for nearly straight sections where cos(delta) - 1 cancels
+    for scale in (1.0, 1e-3, 1e-6):
+        T32 = kd2x.FK_realrobot(S, scale * Deltax, scale * Deltay, dtype=np.float32)
+        T64 = kd2x.FK_realrobot(S, scale * Deltax, scale * Deltay)
+        position_error = np.abs(T32[..., 3] - T64[..., 3]).max()
+        rotation_error = np.abs(T32[..., :3] - T64[..., :3]).max()
+        print(f"|delta| <= {1.5 * scale:6.1e}: float32 error {position_error:.1e} m, {rotation_error:.1e} in rotation")
+        assert T32.dtype == np.float32
+        assert position_error < 1e-6 and rotation_error < 1e-6
+    sdxdy32 = kl2d.FK_L2S_new_3sections(L, 0.027, dtype=np.float32)
+    assert np.allclose(sdxdy32, sdxdy, rtol=1e-6, atol=1e-5)
+
+    print('+-----------------------------------+---------+------------------+------------------+')
+    print('| {:33} | {:>7} | {:>16} | {:>16} |'.format('N = 1e6', 'dtype', 'peak memory [MB]', 'median [M/s]'))
+    print('+-----------------------------------+---------+------------------+------------------+')
+    for dtype in (np.float64, np.float32):
+        S_, Deltax_, Deltay_, L_ = (x.astype(dtype) for x in (S, Deltax, Deltay, L))
+        cases = [
+            ('FK_realrobot', lambda: kd2x.FK_realrobot(S_, Deltax_, Deltay_)),
+            ('FK_realrobot (' + kb.get_backend() + ' backend)', lambda: kb.FK_realrobot(S_, Deltax_, Deltay_)),
+            ('FK_L2S_new_3sections', lambda: kl2d.FK_L2S_new_3sections(L_, 0.027)),
+        ]
+        for name, func in cases:
+            result, elapsed, peak = measure(func)
+            assert result.dtype == dtype
+            print('| {:33} | {:>7} | {:16.1f} | {:16.2f} |'.format(name, np.dtype(dtype).name, peak / 1e6, N / elapsed / 1e6))
+    print('+-----------------------------------+---------+------------------+------------------+')
@@ -0,0 +1,45 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import robotic_rotation as rr
+
+def per_row(N, q1, q2):
+    qm = np.empty((N, 4))
+    R = np.empty((N, 3, 3))
+    for i in range(N):
+        qm[i] = rr.quatmultiply(rr.quatinv(q1[i]), q2[i])
+        R[i] = rr.quat2rotm(qm[i])
+    return qm, R
+
+def batched(N, q1, q2):
+    qm = rr.quatmultiply(rr.quatinv(q1), q2)
+    return qm, rr.quat2rotm(qm)
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 10000
+    q1 = rr.normalize_quaternion(rng.normal(size=(N, 4)))
+    q2 = rr.normalize_quaternion(rng.normal(size=(N, 4)))
+
+    qm, R = batched(N, q1, q2)
+    qm_loop, R_loop = per_row(N, q1, q2)
+    assert qm.shape == (N, 4) and R.shape == (N, 3, 3)
+    assert np.allclose(qm, qm_loop, rtol=0, atol=1e-15) and np.allclose(R, R_loop, rtol=0, atol=1e-15)
+    assert np.allclose(R @ R.transpose(0, 2, 1), np.eye(3), atol=1e-12)
+    # Rotation matrices compose like the quaternions
+    assert np.allclose(rr.quat2rotm(rr.quatmultiply(q1, q2)), rr.quat2rotm(q1) @ rr.quat2rotm(q2), atol=1e-12)
+    # One quaternion broadcast against N, e.g. the base IMU against all rows
+    assert np.allclose(rr.quatmultiply(q1[0], q2), rr.quatmultiply(np.tile(q1[0], (N, 1)), q2), rtol=0, atol=0)
+    assert rr.quatmultiply([1, 0, 0, 0], [0, 1, 0, 0]).shape == (4,)
+    assert rr.quat2rotm([1, 0, 0, 0]).shape == (3, 3)
+    print("batched results match the per-row loop")
+
+    for name, f, repeat in [("per-row loop", per_row, 3), ("batched", batched, 100)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            f(N, q1, q2)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{name:>12}: {elapsed * 1e3:8.2f} ms for N={N} (quatinv, quatmultiply, quat2rotm)")
@@ -0,0 +1,66 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import robotic_rotation as rr
+
+def axis_angle_quat(axis, angle):
+    axis = np.asarray(axis, dtype=float)
+    axis = axis / np.linalg.norm(axis, axis=-1, keepdims=True)
+    angle = np.asarray(angle, dtype=float)[..., None]
+    axis, angle = np.broadcast_arrays(axis, angle)
+    angle = angle[..., :1]
+    return np.concatenate([np.cos(angle / 2), np.sin(angle / 2) * axis], axis=-1)
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    # SLERP follows the rotation about the relative axis at constant rate
+    N = 10000
+    q1 = rr.normalize_quaternion(rng.normal(size=(N, 4)))
+    axis = rng.normal(size=(N, 3))
+    angle = rng.uniform(0, np.pi, N)
+    q2 = rr.quatmultiply(q1, axis_angle_quat(axis, angle))
+    t = rng.uniform(0, 1, N)
+    expected = rr.quatmultiply(q1, axis_angle_quat(axis, t * angle))
+    assert np.allclose(rr.quatslerp(q1, q2, t), expected, rtol=0, atol=1e-12)
+    # Shorter arc for the sign-flipped end point, exact ends, nearly equal quaternions
+    assert np.allclose(rr.quatslerp(q1, -q2, t), expected, rtol=0, atol=1e-12)
+    assert np.allclose(rr.quatslerp(q1, q2, 0.0), q1, rtol=0, atol=1e-15)
+    assert np.allclose(rr.quatslerp(q1, q2, 1.0), q2, rtol=0, atol=1e-15)
+    tiny = rr.quatmultiply(q1, axis_angle_quat(axis, 1e-9))
+    assert np.isfinite(rr.quatslerp(q1, tiny, t)).all()
+    assert np.allclose(rr.quatslerp(q1[0], q2[0], 0.3), rr.quatslerp(q1, q2, 0.3)[0], rtol=0, atol=0)
+    print("quatslerp matches the constant-rate rotation")
+
+    # Markley mean: symmetric spread about a known rotation, with random signs
+    center = rr.normalize_quaternion(rng.normal(size=(100, 4)))
+    center *= np.sign(center[:, :1])
+    offsets = axis_angle_quat(rng.normal(size=(100, 3)), 0.2)
+    group = np.stack([rr.quatmultiply(center, offsets), rr.quatmultiply(center, rr.quatinv(offsets))], axis=1)
+    group *= rng.choice([-1.0, 1.0], size=(100, 2, 1))
+    assert np.allclose(rr.quatmean(group), center, rtol=0, atol=1e-12)
+    assert np.allclose(rr.quatmean(group[0]), center[0], rtol=0, atol=1e-12)
+    assert np.allclose(rr.quatmean(group[0], weights=[1.0, 0.0]), group[0, 0] * np.sign(group[0, 0, 0]), atol=1e-12)
+    print("quatmean recovers the center of symmetric groups")
+
+    # Resampling a constant-rate rotation at irregular timestamps onto a 100 Hz grid
+    n = 1000000
+    t_imu = np.cumsum(rng.uniform(0.005, 0.015, n))
+    axis3 = np.array([0.3, -0.2, 1.0])
+    stream = axis_angle_quat(axis3, 0.5 * t_imu)
+    t_grid = np.arange(0.0, t_imu[-1] + 1, 0.01)
+    start = time.perf_counter()
+    q = rr.quatresample(t_imu, stream, t_grid)
+    elapsed = time.perf_counter() - start
+    inside = (t_grid >= t_imu[0]) & (t_grid <= t_imu[-1])
+    assert np.allclose(q[inside], axis_angle_quat(axis3, 0.5 * t_grid[inside]), rtol=0, atol=1e-9)
+    assert np.allclose(q[t_grid < t_imu[0]], stream[0]) and np.allclose(q[t_grid > t_imu[-1]], stream[-1])
+    # K sensors sharing the timestamps, e.g. the base1/base2/base3 columns
+    streams = np.stack([stream, stream[:, [0, 2, 3, 1]], stream[:, [0, 3, 1, 2]]], axis=1)
+    qk = rr.quatresample(t_imu[:1000], streams[:1000], t_grid[:500])
+    assert qk.shape == (500, 3, 4)
+    assert np.allclose(qk[:, 0], rr.quatresample(t_imu[:1000], stream[:1000], t_grid[:500]), rtol=0, atol=0)
+    print(f"quatresample: {n} samples onto {t_grid.size} grid points in {elapsed * 1e3:.0f} ms")
@@ -0,0 +1,55 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import robotic_rotation as rr
+
+def per_section(sensor_val, Timu):
+    # Chain of IMU_test.py, one section at a time
+    R, eul = [], []
+    for k in range(sensor_val.shape[0] - 1):
+        RIMU = rr.quat2rotm(rr.quatmultiply(rr.quatinv(sensor_val[k]), sensor_val[k + 1]))
+        RROBO = np.transpose(Timu[k]) @ RIMU @ Timu[k]
+        R.append(RROBO)
+        eul.append(rr.rotm2eul(RROBO))
+    return np.array(R), np.array(eul)
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    Timu = rr.eul2rotm(np.deg2rad([[60, 0, 0], [30, 0, 0], [0, 0, 0]]))
+
+    # One frame of the base IMU and three section IMUs
+    sensor_val = rr.normalize_quaternion(rng.normal(size=(4, 4)))
+    R, eul = rr.relative_orientation(sensor_val, Timu)
+    R_ref, eul_ref = per_section(sensor_val, Timu)
+    assert R.shape == (3, 3, 3) and eul.shape == (3, 3)
+    assert np.allclose(R, R_ref, rtol=0, atol=1e-15) and np.allclose(eul, eul_ref, rtol=0, atol=1e-14)
+    print("one frame matches the per-section chain")
+
+    # A log of N frames
+    N = 10000
+    log = rr.normalize_quaternion(rng.normal(size=(N * 4, 4))).reshape(N, 4, 4)
+    R, eul = rr.relative_orientation(log, Timu)
+    assert R.shape == (N, 3, 3, 3) and eul.shape == (N, 3, 3)
+    for i in rng.integers(0, N, 20):
+        R_ref, eul_ref = per_section(log[i], Timu)
+        assert np.allclose(R[i], R_ref, rtol=0, atol=1e-15) and np.allclose(eul[i], eul_ref, rtol=0, atol=1e-14)
+    _, eul_xyz = rr.relative_orientation(log[:5], order='XYZ')
+    assert np.allclose(eul_xyz, rr.rotm2eul(rr.relative_orientation(log[:5])[0], 'XYZ'))
+    print("log of N frames matches the per-section chain")
+
+    repeat = 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        per_section(sensor_val, Timu)
+    loop = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rr.relative_orientation(sensor_val, Timu)
+    fused = (time.perf_counter() - start) / repeat
+    print(f"per frame: per-section chain {loop * 1e6:.0f} us, relative_orientation {fused * 1e6:.0f} us")
+    start = time.perf_counter()
+    rr.relative_orientation(log, Timu)
+    print(f"log of {N} frames: {(time.perf_counter() - start) * 1e3:.1f} ms")
@@ -0,0 +1,60 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import robotic_rotation as rr
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    eul = np.deg2rad([60.0, 10.0, 5.0])
+
+    r = rr.Rotation.from_eul(eul)
+    assert np.allclose(r.quat, rr.eul2quat(eul), rtol=0, atol=1e-15)
+    assert np.allclose(r.eul('XYZ'), rr.rotm2eul(rr.eul2rotm(eul), 'XYZ'), rtol=0, atol=1e-15)
+    assert r.rotm is r.rotm and r.eul('XYZ') is r.eul('XYZ') and r.eul() is r.eul('ZYX')
+    assert not r.quat.flags.writeable and not r.rotm.flags.writeable
+    assert not hasattr(r, '__dict__')
+    q = rr.normalize_quaternion(rng.normal(size=4))
+    assert np.allclose((r.inv() * rr.Rotation(q)).rotm, r.rotm.T @ rr.quat2rotm(q), rtol=0, atol=1e-15)
+    assert np.allclose(rr.Rotation.from_rotm(rr.quat2rotm(-q)).quat, q * np.sign(q[0]), rtol=0, atol=1e-15)
+    try:
+        rr.Rotation(np.ones((2, 4)))
+        raise AssertionError("Rotation accepted a batch")
+    except ValueError:
+        pass
+    # Euler angles are derived, not echoed: wrapped angles and, for ZYX whose
+    # gimbal lock rotm2eul resolves exactly, pitch = 90 degrees
+    for order, angles in [('ZYX', [370, 10, 5]), ('ZYX', [30, 90, 20]), ('ZYX', [-200, 45, 190]),
+                          ('XYZ', [370, 10, 5]), ('XYZ', [-200, 45, 190])]:
+        a = rr.Rotation.from_eul(np.deg2rad(angles), order)
+        b = rr.Rotation.from_quat(a.quat)
+        assert np.allclose(a.eul(order), b.eul(order), rtol=0, atol=1e-12), (angles, order)
+        assert np.allclose(a.eul(order), rr.rotm2eul(rr.eul2rotm(np.deg2rad(angles), order), order), rtol=0, atol=1e-15)
+    print("Rotation converts once and caches every form")
+
+    N = 10000
+    quat = rr.normalize_quaternion(rng.normal(size=(N, 4)))
+    batch = rr.RotationBatch(quat)
+    assert len(batch) == N and batch.quat.flags.c_contiguous
+    assert np.allclose(batch.eul(), rr.quat2eul(quat), rtol=0, atol=1e-13)
+    assert np.allclose(batch[5].rotm, rr.quat2rotm(quat[5]), rtol=0, atol=1e-15)
+    assert np.shares_memory(batch[5].rotm, batch.rotm) and batch[10:20].eul().shape == (10, 3)
+    assert np.allclose((batch * r).rotm, batch.rotm @ r.rotm, rtol=0, atol=1e-14)
+    print("RotationBatch matches the batched functions and shares its cache with its items")
+
+    # Repeated conversions in a loop become cache hits
+    repeat = 100
+    rotations = [rr.Rotation(x) for x in quat[:repeat]]
+    start = time.perf_counter()
+    for x in quat[:repeat]:
+        for _ in range(10):
+            rr.quat2eul(x), rr.quat2rotm(x)
+    functions = time.perf_counter() - start
+    start = time.perf_counter()
+    for x in rotations:
+        for _ in range(10):
+            x.eul(), x.rotm
+    cached = time.perf_counter() - start
+    print(f"10 conversions of {repeat} orientations: functions {functions * 1e3:.1f} ms, Rotation {cached * 1e3:.2f} ms")
@@ -0,0 +1,55 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import robotic_rotation as rr
+
+def axis_angle_quat(axis, angle):
+    axis = axis / np.linalg.norm(axis, axis=-1, keepdims=True)
+    return np.concatenate([np.cos(angle / 2)[..., None], np.sin(angle / 2)[..., None] * axis], axis=-1)
+
+def rotm2quat_direct(R):
+    # Previous formula, exact away from 180 degrees
+    w = np.sqrt(1 + R[0, 0] + R[1, 1] + R[2, 2]) / 2
+    return np.array([w, (R[2, 1] - R[1, 2]) / (4 * w), (R[0, 2] - R[2, 0]) / (4 * w), (R[1, 0] - R[0, 1]) / (4 * w)])
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 10000
+
+    # Random rotations, sign fixed to w >= 0 as returned by rotm2quat
+    q = rr.normalize_quaternion(rng.normal(size=(N, 4)))
+    q *= np.sign(q[:, :1])
+    R = rr.quat2rotm(q)
+    assert np.allclose(rr.rotm2quat(R), q, rtol=0, atol=1e-14)
+    assert np.allclose(rr.rotm2quat(R[0]), rotm2quat_direct(R[0]), rtol=0, atol=1e-15)
+    print("matches the direct formula away from 180 degrees")
+
+    # Rotations at and near 180 degrees about random and coordinate axes,
+    # where w -> 0 and the direct formula divides by zero
+    axes = np.concatenate([np.eye(3), -np.eye(3), [[1, 1, 0], [0, 1, 1], [1, 1, 1]], rng.normal(size=(N, 3))])
+    for eps in [0.0, 1e-12, 1e-8, 1e-4, -1e-8]:
+        angle = np.full(axes.shape[0], np.pi - eps)
+        q = axis_angle_quat(axes, angle)
+        R = rr.quat2rotm(q)
+        q_est = rr.rotm2quat(R)
+        assert np.isfinite(q_est).all() and (q_est[:, 0] >= 0).all()
+        assert np.allclose(np.linalg.norm(q_est, axis=1), 1, rtol=0, atol=1e-14)
+        # q and -q are the same rotation; at exactly 180 degrees both have w = 0
+        error = np.minimum(np.abs(q_est - q).max(axis=1), np.abs(q_est + q).max(axis=1))
+        assert error.max() < 1e-14, error.max()
+        assert np.allclose(rr.quat2rotm(q_est), R, rtol=0, atol=1e-14)
+    print("finite and accurate at and near 180 degrees")
+
+    # The singular cases of the Euler conversions run over whole arrays
+    eul = rng.uniform(-np.pi, np.pi, (N, 3))
+    eul[:3] = [[np.pi, 0, 0], [0, 0, np.pi], [np.pi / 2, np.pi, 0]]
+    q = rr.eul2quat(eul)
+    assert np.isfinite(q).all() and np.allclose(rr.quat2rotm(q), rr.eul2rotm(eul), rtol=0, atol=1e-14)
+    print("eul2quat is finite over a whole array")
+
+    start = time.perf_counter()
+    rr.rotm2quat(R)
+    print(f"rotm2quat: {(time.perf_counter() - start) * 1e3:.2f} ms for N={R.shape[0]}")
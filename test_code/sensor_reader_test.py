@@ -0,0 +1,89 @@
+import numpy as np
+import threading
+import time
+import sys
+
+sys.path.append("../")
+
+import softarm_utility as su
+import tentacle_utility as tu
+from sensor_reader import SensorReader
+
+class FakeSerial:
+    """
+    Stands in for the IMU board: one line of quaternions every period, like readline() with a timeout.
+    """
+
+    def __init__(self, frames, period=0.01):
+        self.frames = frames
+        self.period = period
+        self.sent = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def reset_input_buffer(self):
+        pass
+
+    def readline(self):
+        due = self.start + (self.sent + 1) * self.period
+        time.sleep(max(due - time.perf_counter(), 0.0))
+        with self._lock:
+            frame = self.frames[self.sent % len(self.frames)]
+            self.sent += 1
+        if self.sent % 7 == 0:
+            return b"0.123456, 0.12\r\n"  # incomplete line
+        return (", ".join(f"{x:.6f}" for x in frame.ravel()) + "\r\n").encode()
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    frames = rng.uniform(0.1, 0.9, (50, 4, 4))
+
+    line = ", ".join(f"{x:.6f}" for x in frames[0].ravel())
+    assert np.allclose(su.parse_sensor_string(line), frames[0], atol=1e-6)
+    assert su.parse_sensor_string("0.123456, 0.12") is False
+    assert tu.parse_sensor_string(", ".join(f"{x:.6f}" for x in frames[0, :2].ravel())).shape == (2, 4)
+    print("parse_sensor_string matches the frames")
+
+    port = FakeSerial(frames)
+    reader = su.start_sensor_reader(port, capacity=16)
+    assert reader.latest() is False
+
+    # The control loop polls at 1 kHz and never waits for a frame
+    worst, received, t_last = 0.0, 0, 0.0
+    for _ in range(300):
+        start = time.perf_counter()
+        sensor_val = reader.latest()
+        times, new = reader.since(t_last)
+        worst = max(worst, time.perf_counter() - start)
+        if len(times):
+            received += len(times)
+            t_last = times[-1]
+            assert sensor_val is False or sensor_val.shape == (4, 4)
+        time.sleep(0.001)
+    reader.stop()
+    assert not reader._thread.is_alive()
+    received += len(reader.since(t_last)[0])
+
+    expected = port.sent - port.sent // 7
+    assert reader.count == expected and received == expected, (reader.count, received, expected)
+    n = port.sent - (port.sent % 7 == 0)  # line number of the newest complete frame
+    assert np.allclose(reader.latest(), frames[(n - 1) % len(frames)], atol=1e-6)
+    times, buffered = reader.since(0.0)
+    assert len(times) == 16 and np.all(np.diff(times) > 0)
+    print(f"{received} frames received without loss, worst poll {worst * 1e6:.0f} us")
+
+    # Frames of the wrong shape are reported and skipped; the thread keeps reading
+    skipped = []
+    def parse(line):
+        sensor_val = su.parse_sensor_string(line)
+        if sensor_val is not False and len(skipped) < 3 and rng.random() < 0.2:
+            skipped.append(line)
+            return sensor_val[:2]
+        return sensor_val
+    port = FakeSerial(frames)
+    reader = SensorReader(port, parse, 4).start()
+    time.sleep(0.3)
+    assert reader._thread.is_alive()
+    reader.stop()
+    assert len(skipped) == 3 and reader.count == port.sent - port.sent // 7 - len(skipped)
+    print("frames of the wrong shape are skipped")
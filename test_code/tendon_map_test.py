@@ -0,0 +1,57 @@
+import numpy as np
+import sys
+
+sys.path.append("../")
+
+import kinematics_l2delta as kl2d
+import softarm_utility as su
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    N = 100000
+    d = su.d
+
+    # Random tendon lengths around the 0.1 m sections, with the largest bending
+    L = 0.1 + rng.uniform(-0.02, 0.02, (N, 3))
+
+    # Real closed form against the complex MATLAB translation
+    real = kl2d.FK_L2S_cosimo_new_real(L, d)
+    complex_ = kl2d.FK_L2S_cosimo_new([L[:, 0], L[:, 1], L[:, 2]], d).T
+    error = np.abs(real - complex_).max(axis=0)
+    print(f"real vs complex form: max |error| s {error[0]:.1e}, deltax {error[1]:.1e}, deltay {error[2]:.1e}")
+    assert np.allclose(real, complex_, rtol=1e-12, atol=1e-12)
+    assert np.allclose(kl2d.FK_L2S_cosimo_new_real(L[0], d), kl2d.FK_L2S_cosimo_new(L[0], d), rtol=1e-12, atol=1e-12)
+
+    # Three sections: the real path against the complex one
+    L9 = 0.1 + rng.uniform(-0.02, 0.02, (N, 9))
+    assert np.allclose(kl2d.FK_L2S_new_3sections(L9, d), kl2d.FK_L2S_new_3sections(L9.astype(complex), d).real,
+                       rtol=1e-12, atol=1e-12)
+
+    # Straight sections: exact zeros, where the complex form gives 0/0
+    straight = kl2d.FK_L2S_cosimo_new_real([0.1, 0.1, 0.1], d)
+    assert np.array_equal(straight[1:], [0.0, 0.0]) and np.isclose(straight[0], 0.1)
+    print("real closed form matches FK_L2S_cosimo_new")
+
+    # out= of the complex and legacy maps writes the same values
+    out = np.empty((N, 9), dtype=complex)
+    assert kl2d.FK_L2S_new_3sections(L9.astype(complex), d, out=out) is out
+    assert np.array_equal(out, kl2d.FK_L2S_new_3sections(L9.astype(complex), d))
+    for legacy in (kl2d.FK_L2S_jones, kl2d.FK_L2S_cosimo_old, kl2d.FK_L2S_cosimo_new):
+        out = np.empty((3, N))
+        assert legacy(L.T, d, out=out) is out and np.array_equal(out, legacy(L.T, d))
+
+    # Round trips IK_S2L(FK_L2S(l)) == l and FK_L2S(IK_S2L(q)) == q
+    roundtrip = kl2d.IK_S2L_new_3sections(kl2d.FK_L2S_new_3sections(L9, d), d)
+    print(f"IK_S2L(FK_L2S(l)) - l: max |error| {np.abs(roundtrip - L9).max():.1e} m")
+    assert np.allclose(roundtrip, L9, rtol=0, atol=1e-15)
+    assert np.allclose(kl2d.IK_S2L_cosimo_new(kl2d.FK_L2S_cosimo_new_real(L, d), d), L, rtol=0, atol=1e-15)
+    q = np.stack([rng.uniform(0.07, 0.09, (N, 3)), rng.uniform(-1.5, 1.5, (N, 3)),
+                  rng.uniform(-1.5, 1.5, (N, 3))], axis=-1).reshape(N, 9)
+    assert np.allclose(kl2d.FK_L2S_new_3sections(kl2d.IK_S2L_new_3sections(q, d), d), q, rtol=0, atol=1e-13)
+
+    # float32 round trip within the float32 rounding of the lengths
+    roundtrip32 = kl2d.IK_S2L_new_3sections(kl2d.FK_L2S_new_3sections(L9, d, dtype=np.float32), d, dtype=np.float32)
+    assert roundtrip32.dtype == np.float32 and np.allclose(roundtrip32, L9, rtol=0, atol=1e-7)
+    for legacy in (kl2d.FK_L2S_jones, kl2d.FK_L2S_cosimo_old):
+        assert legacy(L.T, d, dtype=np.float32).dtype == np.float32
+    print("tendon-length round trips hold")
@@ -2,6 +2,7 @@ import sys
 sys.path.append("../")
 
 import numpy as np
+import time
 import robotic_rotation as rr
 import tentacle_utility as tu
 from test_code.visualization_pcc import plot_single_sections as plt_soft
@@ -24,18 +25,24 @@ if __name__ == "__main__":
     # ax.set_zlim([-0.1, 0.1])
     # ax.view_init(elev=0, azim=0)
 
-    while True:
-        # # 清除旧的绘图
-        # ax.cla()
-        # ax.set_box_aspect([1, 1, 1])
-        # # 手动设置坐标范围，确保各轴范围一致
-        # ax.set_xlim([-0.1, 0.1])
-        # ax.set_ylim([-0.1, 0.1])
-        # ax.set_zlim([-0.1, 0.1])
-        # ax.view_init(elev=0, azim=0)
+    last = -np.inf  # arrival time of the newest processed frame
+    with tu.start_sensor_reader(sensorobj) as reader:
+        while True:
+            # # 清除旧的绘图
+            # ax.cla()
+            # ax.set_box_aspect([1, 1, 1])
+            # # 手动设置坐标范围，确保各轴范围一致
+            # ax.set_xlim([-0.1, 0.1])
+            # ax.set_ylim([-0.1, 0.1])
+            # ax.set_zlim([-0.1, 0.1])
+            # ax.view_init(elev=0, azim=0)
 
-        sensor_val = tu.sensor_call(sensorobj)
-        if sensor_val is not False:
+            times, frames = reader.since(last)
+            if len(times) == 0:
+                time.sleep(0.001)  # wait for the next frame
+                continue
+            last = times[-1]
+            sensor_val = frames[-1]  # newest frame, skipping any backlog
             qbase = sensor_val[0]
             qtip = sensor_val[1]
             eulbase = rr.quat2eul(qbase)
@@ -0,0 +1,46 @@
+import numpy as np
+import time
+import sys
+
+sys.path.append("../")
+
+import softarm_utility as su
+import trajectory as tr
+
+if __name__ == "__main__":
+    Lr = np.full(9, 0.1)
+    Motors_r = np.full(9, 2048)
+    waypoints = np.array([
+        [0.1, 0.0, 0.0, 0.1, 0.0, 0.0, 0.1, 0.0, 0.0],
+        [0.1, 0.5, 0.2, 0.1, -0.4, 0.3, 0.1, 0.2, -0.5],
+        [0.1, 0.5, 0.2, 0.1, -0.4, 0.3, 0.1, 0.2, -0.5],  # repeated waypoint: a pause of zero length
+        [0.09, -0.6, 0.0, 0.095, 0.3, 0.3, 0.1, -0.2, 0.1],
+    ])
+    v_max = np.array([0.01, 1.0, 1.0] * 3)
+    a_max = np.array([0.05, 4.0, 4.0] * 3)
+    dt = 0.01
+
+    start = time.perf_counter()
+    table = tr.SetpointTable(waypoints, v_max, a_max, Lr, Motors_r, dt=dt, tick_range=(0, 4095))
+    print(f"planned {len(table)} setpoints ({len(table) * dt:.2f} s) in {(time.perf_counter() - start) * 1e3:.2f} ms, "
+          f"table {table.ticks.nbytes} bytes of {table.ticks.dtype}")
+
+    # Limits hold and every waypoint is passed at rest
+    assert np.all(np.abs(table.qd) <= v_max * (1 + 1e-9))
+    qdd = np.diff(table.qd, axis=0) / dt
+    assert np.all(np.abs(qdd) <= a_max * (1 + 1e-6))
+    for w in waypoints:
+        assert np.min(np.abs(table.q - w).max(axis=1)) < 1e-12
+    assert np.array_equal(table.q[-1], waypoints[-1])
+
+    # The table reproduces the configurations to within half a tick
+    L = su.motor2L(Lr, Motors_r, table.ticks)
+    L_exact = su.motor2L(Lr, Motors_r, su.L2motor(Motors_r, Lr, tr.kl2d.IK_S2L_new_3sections(table.q, su.d)))
+    assert np.abs(L - L_exact).max() <= 0.5 * su.unit_scale * su.r_pulley + 1e-15
+    print("limits, waypoints and tick rounding hold")
+
+    repeat = 100000
+    start = time.perf_counter()
+    for k in range(repeat):
+        table.at(k * 1e-4)
+    print(f"setpoint lookup: {(time.perf_counter() - start) / repeat * 1e6:.2f} us")
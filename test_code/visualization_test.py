@@ -1,14 +1,14 @@
 from test_code.visualization_pcc import plot_single_sections as plt_soft
 import matplotlib.pyplot as plt
+import numpy as np
 
-s = 1
-deltax = 1
-deltay = 1
+s = np.full(3, 1 / 3)
+deltax = np.full(3, 1 / 3)
+deltay = np.full(3, 1 / 3)
 
-sections, [circle0, circle1] = plt_soft(s, deltax, deltay)
+sections, circles = plt_soft(s, deltax, deltay)
 print(sections.shape)
-print(circle0.shape)
-print(circle1.shape)
+print(len(circles), circles[-1].shape)
 
 # Plot circles
 fig = plt.figure()
@@ -19,8 +19,8 @@ ax.set_xlim([-1, 1])
 ax.set_ylim([-1, 1])
 ax.set_zlim([-1, 1])
 
-circle_0 = ax.plot(circle0[:, 0], circle0[:, 1], circle0[:, 2], color='k', linewidth=1.5)
-circle_1 = ax.plot(circle1[:, 0], circle1[:, 1], circle1[:, 2], color='k', linewidth=1.5)
+for circle in circles:
+    ax.plot(circle[:, 0], circle[:, 1], circle[:, 2], color='k', linewidth=1.5)
 
 # Plot central axis
 ax.plot(sections[0,:], sections[1,:], sections[2,:], color='blue', label="Path")
@@ -32,13 +32,8 @@ for i in range(10):
     # 清除旧的绘图
     ax.cla()
 
-    # 生成新的数据
-    sections, [circle0, circle1] = plt_soft(1, 1 + 0.1 * i, 1 + 0.1 * i)
-
-    # 绘制新数据
-    ax.plot(circle0[:, 0], circle0[:, 1], circle0[:, 2], color='k', linewidth=1.5)
-    ax.plot(circle1[:, 0], circle1[:, 1], circle1[:, 2], color='k', linewidth=1.5)
-    ax.plot(sections[0, :], sections[1, :], sections[2, :], color='blue', label="Path")
+    # 生成并绘制新数据
+    plt_soft(s, deltax * (1 + 0.1 * i), deltay * (1 + 0.1 * i), ax=ax)
 
     # 重设坐标范围
     ax.set_xlim([-1, 1])
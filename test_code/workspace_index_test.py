@@ -0,0 +1,41 @@
+import numpy as np
+import tempfile
+import time
+import sys
+
+sys.path.append("../")
+
+import workspace_index as wi
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        wi.build_workspace_index(path, n_samples=200000)
+        print(f"build: {time.perf_counter() - start:.2f} s")
+
+        # A control process only maps the saved files
+        start = time.perf_counter()
+        index = wi.WorkspaceIndex(path)
+        print(f"open:  {(time.perf_counter() - start) * 1e3:.2f} ms for {len(index)} samples")
+
+        rng = np.random.default_rng(1)
+        queries = wi.tip_positions(wi.sample_configurations(1000, rng=rng)) + rng.normal(0.0, 0.005, (1000, 3))
+        queries[0] = [0.5, 0.5, 0.5]  # outside the sampled workspace
+
+        sdxdy, point, dist = index.nearest(queries)
+        brute = np.sqrt(((index.points[None, :, :] - queries[:100, None, :]) ** 2).sum(axis=-1)).min(axis=1)
+        assert np.allclose(dist[:100], brute)
+        assert np.allclose(wi.tip_positions(sdxdy), point)
+        # The single-query path gives the batched result
+        for i in range(200):
+            assert np.array_equal(index.nearest(queries[i])[1], point[i])
+        print("nearest samples match brute force")
+
+        repeat = 1000
+        start = time.perf_counter()
+        for _ in range(repeat):
+            index.nearest(queries[1])
+        print(f"single query:  {(time.perf_counter() - start) / repeat * 1e6:.1f} us")
+        start = time.perf_counter()
+        index.nearest(queries)
+        print(f"batched query: {(time.perf_counter() - start) / len(queries) * 1e6:.1f} us per query")
@@ -0,0 +1,42 @@
+import numpy as np
+import tempfile
+import time
+import os
+import sys
+
+sys.path.append("../")
+
+import kinematics_delta2x as kd2x
+import workspace_sampler as ws
+
+if __name__ == "__main__":
+    n_samples, chunk_size = 200000, 20000
+
+    start = time.perf_counter()
+    summary = ws.sample_workspace(n_samples, chunk_size, workers=2)
+    print(f"2 workers: {n_samples / (time.perf_counter() - start):.3g} samples/s")
+
+    # Same reduction computed directly from all samples at once
+    sdxdy = np.concatenate([ws.chunk_configurations(k, chunk_size, n_samples) for k in range(10)])
+    p = kd2x.FK_chain(sdxdy[:, 0::3], sdxdy[:, 1::3], sdxdy[:, 2::3], kd2x.MOUNT_ANGLES_REALROBOT)[:, -1, :3, 3]
+    assert summary.count == n_samples and summary.voxels.sum() == n_samples
+    assert summary.orientation.sum() == n_samples
+    assert np.allclose(summary.lower, p.min(axis=0)) and np.allclose(summary.upper, p.max(axis=0))
+    print("summary matches the direct computation")
+
+    # An interrupted sweep resumed from its checkpoint gives the same summary
+    with tempfile.TemporaryDirectory() as path:
+        checkpoint = os.path.join(path, 'sweep.npz')
+        partial = ws.sample_workspace(n_samples, chunk_size, workers=1, checkpoint=checkpoint, max_chunks=4)
+        assert partial.done.sum() == 4
+        resumed = ws.sample_workspace(n_samples, chunk_size, workers=2, checkpoint=checkpoint)
+        assert resumed.done.all()
+        assert np.array_equal(resumed.voxels, summary.voxels)
+        assert np.array_equal(resumed.orientation, summary.orientation)
+    print("resumed sweep matches the uninterrupted one")
+
+    # Dense grid: 3 points per axis of the 9-D box
+    grid = ws.sample_workspace(3 ** 9, 5000, workers=1, grid=3)
+    assert grid.count == 3 ** 9 and np.isfinite(grid.lower).all()
+    print(f"grid sweep: {np.count_nonzero(grid.voxels)} voxels, "
+          f"{100 * grid.orientation_coverage():.1f}% orientation coverage")
@@ -0,0 +1,113 @@
+import numpy as np
+
+import kinematics_l2delta as kl2d
+import softarm_utility as su
+
+def plan_trajectory(waypoints, v_max, a_max, dt=0.01):
+    """
+    Time-parameterise configuration-space waypoints with velocity and acceleration limits.
+
+    The trajectory moves along straight lines between consecutive waypoints
+    and stops at each of them. Every segment follows a trapezoidal (or
+    triangular) speed profile, synchronised over the 9 coordinates so that
+    the coordinate closest to its limit sets the pace.
+
+    Args:
+        waypoints: (K, 9) configurations [s1, deltax1, deltay1, ..., deltay3].
+        v_max: Velocity limit of every coordinate, scalar or (9,), per second.
+        a_max: Acceleration limit of every coordinate, scalar or (9,), per second^2.
+        dt: Sample period of the output, i.e. of the control loop [s].
+
+    Returns:
+        t: Sample times of shape (M,), from 0 to the end of the last segment.
+        q: Configurations of shape (M, 9); q[-1] is the last waypoint.
+        qd: Velocities of shape (M, 9).
+    """
+    waypoints = np.asarray(waypoints, dtype=float)
+    if waypoints.ndim != 2 or waypoints.shape[0] < 2:
+        raise ValueError("plan_trajectory needs at least two waypoints of shape (K, 9).")
+    v_max = np.broadcast_to(np.asarray(v_max, dtype=float), waypoints.shape[1:])
+    a_max = np.broadcast_to(np.asarray(a_max, dtype=float), waypoints.shape[1:])
+    if np.any(v_max <= 0) or np.any(a_max <= 0):
+        raise ValueError("v_max and a_max must be positive.")
+
+    # Limits of the path parameter u in [0, 1] of every segment
+    delta = np.diff(waypoints, axis=0)
+    scale = np.abs(delta)
+    moving = scale > 0
+    v = np.min(np.divide(v_max, scale, out=np.full_like(scale, np.inf), where=moving), axis=1)
+    a = np.min(np.divide(a_max, scale, out=np.full_like(scale, np.inf), where=moving), axis=1)
+
+    # Trapezoid when the peak speed is reached, triangle otherwise
+    still = ~moving.any(axis=1)
+    v[still], a[still] = 1.0, 1.0
+    triangle = v * v / a >= 1.0
+    t_acc = np.where(triangle, np.sqrt(1.0 / a), v / a)
+    v_peak = a * t_acc
+    duration = np.where(triangle, 2.0 * t_acc, t_acc + 1.0 / v)
+    duration[still] = 0.0
+
+    start = np.concatenate([[0.0], np.cumsum(duration)])
+    t = np.minimum(np.arange(int(np.ceil(start[-1] / dt)) + 1) * dt, start[-1])
+
+    # Segment of every sample and the time into it
+    k = np.clip(np.searchsorted(start, t, side='right') - 1, 0, delta.shape[0] - 1)
+    tau = t - start[k]
+    T, ta, ak, vk = duration[k], t_acc[k], a[k], v_peak[k]
+    tail = np.maximum(T - tau, 0.0)
+    u = np.where(tau < ta, 0.5 * ak * tau ** 2,
+                 np.where(tau < T - ta, 0.5 * ak * ta ** 2 + vk * (tau - ta), 1.0 - 0.5 * ak * tail ** 2))
+    ud = np.where(tau < ta, ak * tau, np.where(tau < T - ta, vk, ak * tail))
+    u[still[k]], ud[still[k]] = 1.0, 0.0
+
+    q = waypoints[k] + u[:, None] * delta[k]
+    qd = ud[:, None] * delta[k]
+    q[-1] = waypoints[-1]
+    return t, q, qd
+
+def motor_table(q, Lr, Motors_r, d=su.d, tick_range=None):
+    """
+    Motor ticks of a configuration trajectory, computed ahead of execution.
+
+    Args:
+        q: (M, 9) configurations, e.g. from plan_trajectory.
+        Lr, Motors_r: Calibration of softarm_utility.L2motor.
+        d: Distance between the center and the cable fix points.
+        tick_range: Optional (low, high) allowed goal positions; a ValueError
+                    is raised when the table leaves it.
+
+    Returns:
+        (M, 9) int32 goal positions, one row per control period.
+    """
+    L = kl2d.IK_S2L_new_3sections(q, d)
+    ticks = np.rint(su.L2motor(Motors_r, Lr, L))
+    if tick_range is not None and (ticks.min() < tick_range[0] or ticks.max() > tick_range[1]):
+        raise ValueError(f"Motor ticks {ticks.min():.0f}..{ticks.max():.0f} leave the range {tick_range}.")
+    return ticks.astype(np.int32)
+
+class SetpointTable:
+    """
+    Precomputed motor setpoints for the control loop.
+
+    Everything is computed in the constructor; during execution the loop only
+    indexes the int32 table, e.g.
+        for k in range(len(table)):
+            groupWriteSync(packetHandler, groupwrite_num, MOTOR_IDs, table[k], 'position')
+    """
+
+    def __init__(self, waypoints, v_max, a_max, Lr, Motors_r, dt=0.01, d=su.d, tick_range=None):
+        self.dt = dt
+        self.t, self.q, self.qd = plan_trajectory(waypoints, v_max, a_max, dt)
+        self.ticks = motor_table(self.q, Lr, Motors_r, d, tick_range)
+
+    def __len__(self):
+        return self.ticks.shape[0]
+
+    def __getitem__(self, k):
+        return self.ticks[k]
+
+    def at(self, t):
+        """
+        Setpoint of the period containing time t [s]; holds the last one after the end.
+        """
+        return self.ticks[min(int(t / self.dt), self.ticks.shape[0] - 1)]
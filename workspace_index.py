@@ -0,0 +1,268 @@
+import numpy as np
+import json
+import math
+import os
+
+import kinematics_delta2x as kd2x
+
+# Default sampling ranges of the configuration space
+S_RANGE = (0.07, 0.09)         # section length [m]
+DELTA_RANGE = (-1.5, 1.5)      # deltax / deltay of every section
+
+def sample_configurations(N, s_range=S_RANGE, delta_range=DELTA_RANGE, rng=None):
+    """
+    Draw N uniform random configurations [s1, deltax1, deltay1, ..., deltay3].
+
+    Returns:
+        sdxdy: Array of shape (N, 9).
+    """
+    rng = np.random.default_rng(rng)
+    sdxdy = rng.uniform(delta_range[0], delta_range[1], (N, 9))
+    sdxdy[:, 0::3] = rng.uniform(s_range[0], s_range[1], (N, 3))
+    return sdxdy
+
+def tip_positions(sdxdy):
+    """
+    Tip positions of the three-section robot for (N, 9) configurations, shape (N, 3).
+    """
+    T = kd2x.FK_chain(sdxdy[:, 0::3], sdxdy[:, 1::3], sdxdy[:, 2::3], kd2x.MOUNT_ANGLES_REALROBOT)
+    return T[:, -1, :3, 3]
+
+def build_workspace_index(path, n_samples=1000000, voxel_size=0.005, chunk=100000,
+                          s_range=S_RANGE, delta_range=DELTA_RANGE, seed=0):
+    """
+    Sample the configuration space once and save a voxel-hash index of the tip positions.
+
+    The samples are sorted by voxel so that each occupied voxel owns one
+    contiguous run of rows. The index directory holds plain .npy files:
+        keys.npy    (M,)    sorted linear keys of the occupied voxels
+        starts.npy  (M+1,)  first row of every voxel in points/configs
+        points.npy  (n, 3)  tip positions
+        configs.npy (n, 9)  configurations [s1, deltax1, deltay1, ..., deltay3]
+        meta.json           grid origin, voxel size and dimensions
+
+    Args:
+        path: Output directory, created if needed.
+        n_samples: Number of random configurations.
+        voxel_size: Edge length of the hash voxels [m].
+        chunk: Number of configurations evaluated per batched FK call.
+        s_range, delta_range: Sampling ranges, see sample_configurations.
+        seed: Seed of the random generator.
+
+    Returns:
+        A WorkspaceIndex opened on the saved files.
+    """
+    rng = np.random.default_rng(seed)
+    configs = np.empty((n_samples, 9))
+    points = np.empty((n_samples, 3))
+    for i in range(0, n_samples, chunk):
+        n = min(chunk, n_samples - i)
+        configs[i:i + n] = sample_configurations(n, s_range, delta_range, rng)
+        points[i:i + n] = tip_positions(configs[i:i + n])
+
+    # Grid covering every sample with one voxel of margin
+    origin = points.min(axis=0) - voxel_size
+    dims = np.floor((points.max(axis=0) - origin) / voxel_size).astype(np.int64) + 2
+    keys = _voxel_keys(np.floor((points - origin) / voxel_size).astype(np.int64), dims)
+
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    unique_keys, starts = np.unique(keys, return_index=True)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'keys.npy'), unique_keys)
+    np.save(os.path.join(path, 'starts.npy'), np.append(starts, n_samples).astype(np.int64))
+    np.save(os.path.join(path, 'points.npy'), points[order])
+    np.save(os.path.join(path, 'configs.npy'), configs[order])
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'origin': origin.tolist(), 'voxel_size': voxel_size, 'dims': dims.tolist()}, f)
+    return WorkspaceIndex(path)
+
+def _voxel_keys(cells, dims):
+    return (cells[..., 0] * dims[1] + cells[..., 1]) * dims[2] + cells[..., 2]
+
+def _shell_runs(radius, cube=False):
+    """
+    Voxel runs along z that cover the shell at Chebyshev distance radius.
+
+    Consecutive z cells have consecutive keys, so every (dx, dy) column of
+    the shell is one contiguous run of rows in the sorted index. With cube,
+    or for radius 1, the runs cover the full cube up to radius instead.
+
+    Returns:
+        lo, hi: (R, 3) offsets of the first and last cell of every run.
+    """
+    lo, hi = [], []
+    r = radius
+    for dx in range(-r, r + 1):
+        for dy in range(-r, r + 1):
+            if cube or r == 1 or max(abs(dx), abs(dy)) == r:
+                lo.append((dx, dy, -r))
+                hi.append((dx, dy, r))
+            else:
+                lo += [(dx, dy, -r), (dx, dy, r)]
+                hi += [(dx, dy, -r), (dx, dy, r)]
+    return np.array(lo), np.array(hi)
+
+class WorkspaceIndex:
+    """
+    Nearest-configuration lookup on a workspace index saved by build_workspace_index.
+
+    The arrays are memory-mapped, so opening an index costs no rebuild and
+    control processes share the pages of the file cache.
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.origin = np.array(meta['origin'])
+        self.voxel_size = meta['voxel_size']
+        self.dims = np.array(meta['dims'], dtype=np.int64)
+        # Plain ndarray views of the maps skip the np.memmap subclass overhead
+        self.keys = np.asarray(np.load(os.path.join(path, 'keys.npy'), mmap_mode=mmap_mode))
+        self.starts = np.asarray(np.load(os.path.join(path, 'starts.npy'), mmap_mode=mmap_mode))
+        self.points = np.asarray(np.load(os.path.join(path, 'points.npy'), mmap_mode=mmap_mode))
+        self.configs = np.asarray(np.load(os.path.join(path, 'configs.npy'), mmap_mode=mmap_mode))
+        self._runs = {}
+        # Key offsets of the 9 z runs of the 3x3x3 cube around a cell, for the
+        # single-query path: [begin keys, end keys + 1] in one searchsorted
+        dx, dy = np.meshgrid([-1, 0, 1], [-1, 0, 1], indexing='ij')
+        column = ((dx * self.dims[1] + dy) * self.dims[2]).ravel()
+        self._cube_offsets = np.concatenate([column - 1, column + 2])
+        self._origin = self.origin.tolist()
+        self._dims = self.dims.tolist()
+
+    def __len__(self):
+        return self.points.shape[0]
+
+    def _candidates(self, cell, radius, cube=False):
+        """
+        Row ranges [begin, end) of the runs of shell radius around each (Q, 3) cell.
+        """
+        if (radius, cube) not in self._runs:
+            self._runs[radius, cube] = _shell_runs(radius, cube)
+        lo, hi = self._runs[radius, cube]
+        lo = cell[:, None, :] + lo
+        hi = cell[:, None, :] + hi
+        valid = ((lo[..., :2] >= 0) & (lo[..., :2] < self.dims[:2])).all(axis=-1)
+        valid &= (hi[..., 2] >= 0) & (lo[..., 2] < self.dims[2])
+        lo[..., 2] = np.maximum(lo[..., 2], 0)
+        hi[..., 2] = np.minimum(hi[..., 2], self.dims[2] - 1)
+        begin = self.starts[np.searchsorted(self.keys, _voxel_keys(lo, self.dims), 'left')]
+        end = self.starts[np.searchsorted(self.keys, _voxel_keys(hi, self.dims), 'right')]
+        begin = np.where(valid, begin, 0)
+        end = np.where(valid, end, 0)
+        return begin, end
+
+    def _nearest_one(self, p):
+        """
+        Nearest sample to one (3,) query from the 3x3x3 voxel cube around it,
+        with Python scalars for the cell arithmetic. Returns None when the
+        query is at the grid boundary or the cube does not decide the nearest
+        sample, and nearest() falls back to the shell search.
+        """
+        v = self.voxel_size
+        x, y, z = p.tolist()
+        cx = math.floor((x - self._origin[0]) / v)
+        cy = math.floor((y - self._origin[1]) / v)
+        cz = math.floor((z - self._origin[2]) / v)
+        dims = self._dims
+        if not (0 < cx < dims[0] - 1 and 0 < cy < dims[1] - 1 and 0 < cz < dims[2] - 1):
+            return None
+        key = (cx * dims[1] + cy) * dims[2] + cz
+        bounds = self.starts[np.searchsorted(self.keys, key + self._cube_offsets)].tolist()
+        runs = [(b, e) for b, e in zip(bounds[:9], bounds[9:]) if e > b]
+        if not runs:
+            return None
+        diff = np.concatenate([self.points[b:e] for b, e in runs]) - p
+        d2 = np.einsum('ij,ij->i', diff, diff)
+        k = int(d2.argmin())
+        dist2 = float(d2[k])
+        if dist2 > v * v:
+            return None
+        # Row of the k-th candidate
+        for b, e in runs:
+            if k < e - b:
+                break
+            k -= e - b
+        return self.configs[b + k], self.points[b + k], math.sqrt(dist2)
+
+    def nearest(self, p):
+        """
+        Nearest sampled tip position to each query position.
+
+        A single query inside the sampled workspace scans the 3x3x3 voxels
+        around it with a handful of array operations, about 30 us per call on
+        the development machine; batches of 1000 cost about 50 us per query.
+        Lookups are tens of microseconds, not single microseconds: the cost is
+        the fixed overhead of the NumPy calls. Queries at the grid boundary or
+        without a sample within one voxel grow the search as in the batched path.
+
+        Args:
+            p: Query tip position of shape (3,), or (N, 3).
+
+        Returns:
+            sdxdy: Configuration of the nearest sample, shape (9,) or (N, 9).
+            point: Its tip position, shape (3,) or (N, 3).
+            dist: Distance to the query, scalar or (N,).
+        """
+        p = np.asarray(p, dtype=float)
+        single = p.ndim == 1
+        if single:
+            found = self._nearest_one(p)
+            if found is not None:
+                return found
+        p = p.reshape(-1, 3)
+        N = p.shape[0]
+
+        best = np.full(N, -1, dtype=np.int64)
+        best_d2 = np.full(N, np.inf)
+        cell = np.floor((p - self.origin) / self.voxel_size).astype(np.int64)
+        cell = np.clip(cell, 0, self.dims - 1)
+
+        # Search growing shells of voxels until the nearest sample is certain.
+        # After radius r every sample closer than r * voxel_size has been seen;
+        # queries outside the grid start from the closest boundary cell.
+        # Beyond the first two shells the radius doubles and whole cubes are
+        # scanned, so far-away queries need only a few passes.
+        todo = np.arange(N)
+        radius = 1
+        max_radius = int(self.dims.max())
+        while todo.size:
+            begin, end = self._candidates(cell[todo], radius, cube=radius > 2)
+            counts = (end - begin).sum(axis=1)
+
+            # Flatten the candidate rows of every query into one gather
+            lengths = (end - begin).ravel()
+            total = lengths.sum()
+            if total:
+                owner = np.repeat(np.arange(todo.size), counts)
+                run_start = np.repeat(begin.ravel(), lengths)
+                run_offset = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+                rows = run_start + run_offset
+                d2 = np.sum((self.points[rows] - p[todo[owner]]) ** 2, axis=1)
+
+                # Per-query minimum over the gathered candidates
+                has = counts > 0
+                seg = np.cumsum(counts) - counts
+                mins = np.full(todo.size, np.inf)
+                mins[has] = np.minimum.reduceat(d2, seg[has])
+                at_min = d2 == mins[owner]
+                arg_row = np.full(todo.size, -1, dtype=np.int64)
+                arg_row[owner[at_min]] = rows[at_min]
+                improved = mins < best_d2[todo]
+                best_d2[todo[improved]] = mins[improved]
+                best[todo[improved]] = arg_row[improved]
+
+            done = best_d2[todo] <= (radius * self.voxel_size) ** 2
+            todo = todo[~done]
+            if radius >= max_radius:
+                break
+            radius = radius + 1 if radius < 2 else min(2 * radius, max_radius)
+
+        sdxdy = self.configs[best]
+        point = self.points[best]
+        dist = np.sqrt(best_d2)
+        if single:
+            return sdxdy[0], point[0], dist[0]
+        return sdxdy, point, dist
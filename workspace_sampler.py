@@ -0,0 +1,258 @@
+import numpy as np
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import kinematics_backend as kb
+import kinematics_delta2x as kd2x
+from workspace_index import S_RANGE, DELTA_RANGE, sample_configurations
+
+# Orientation coverage: the tip z axis is binned on the unit sphere into
+# equal-area cells, uniform in cos(polar angle) and in azimuth
+N_POLAR = 18
+N_AZIMUTH = 36
+
+def chunk_configurations(chunk, chunk_size, n_samples, grid=None, seed=0,
+                         s_range=S_RANGE, delta_range=DELTA_RANGE, dtype=np.float64):
+    """
+    Configurations of one chunk of a sweep, generated independently of the other chunks.
+
+    Args:
+        chunk: Chunk number; the chunk covers samples [chunk * chunk_size, ...).
+        chunk_size, n_samples: Samples per chunk and in the whole sweep.
+        grid: None for uniform random samples, or the number of points per
+              axis of a dense grid over the 9-D box; then n_samples <= grid ** 9.
+        seed: Seed of the random sweep; chunk k always draws the same samples.
+        s_range, delta_range: Box of the configuration space.
+        dtype: Floating dtype of the configurations.
+
+    Returns:
+        sdxdy: Array of shape (n, 9), n <= chunk_size.
+    """
+    start = chunk * chunk_size
+    n = min(chunk_size, n_samples - start)
+    if grid is None:
+        rng = np.random.default_rng([seed, chunk])
+        return sample_configurations(n, s_range, delta_range, rng).astype(dtype, copy=False)
+    lower = np.array([s_range[0], delta_range[0], delta_range[0]] * 3)
+    upper = np.array([s_range[1], delta_range[1], delta_range[1]] * 3)
+    index = np.stack(np.unravel_index(np.arange(start, start + n), (grid,) * 9), axis=-1)
+    return (lower + index * ((upper - lower) / max(grid - 1, 1))).astype(dtype)
+
+def _reduce_chunk(chunk, settings):
+    """
+    Evaluate one chunk and reduce it to its partial summary.
+    """
+    sdxdy = chunk_configurations(chunk, settings['chunk_size'], settings['n_samples'], settings['grid'],
+                                 settings['seed'], settings['s_range'], settings['delta_range'],
+                                 settings['dtype'])
+    # Straight sections (deltax = deltay = 0, e.g. the middle of an odd grid)
+    # are 0/0 in the PCC expressions; take the limit from a tiny bend instead
+    straight = (sdxdy[:, 1::3] == 0) & (sdxdy[:, 2::3] == 0)
+    sdxdy[:, 1::3][straight] = 1e-9
+    T = kb.FK_chain(sdxdy[:, 0::3], sdxdy[:, 1::3], sdxdy[:, 2::3], kd2x.MOUNT_ANGLES_REALROBOT)
+    p = T[:, -1, :3, 3].astype(float)
+    z = T[:, -1, :3, 2].astype(float)
+
+    origin = np.array(settings['origin'])
+    dims = np.array(settings['dims'])
+    cells = np.clip(np.floor((p - origin) / settings['voxel_size']).astype(np.int64), 0, dims - 1)
+    keys, counts = np.unique(np.ravel_multi_index(cells.T, dims), return_counts=True)
+
+    polar = np.minimum(((1.0 - z[:, 2]) * (N_POLAR / 2)).astype(np.int64), N_POLAR - 1)
+    azimuth = ((np.arctan2(z[:, 1], z[:, 0]) + np.pi) * (N_AZIMUTH / (2 * np.pi))).astype(np.int64) % N_AZIMUTH
+    orientation = np.bincount(polar * N_AZIMUTH + azimuth, minlength=N_POLAR * N_AZIMUTH)
+
+    return {
+        'chunk': chunk,
+        'count': p.shape[0],
+        'lower': p.min(axis=0),
+        'upper': p.max(axis=0),
+        'keys': keys,
+        'counts': counts,
+        'orientation': orientation.reshape(N_POLAR, N_AZIMUTH),
+    }
+
+class WorkspaceSummary:
+    """
+    Running reduction of a workspace sweep: bounding box, voxel occupancy and orientation coverage.
+
+    The voxel grid is fixed up front to the box reachable by three sections
+    of length s_range[1], so the summary has a constant size whatever the
+    number of samples: prod(dims) int64 counters.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.origin = np.array(settings['origin'])
+        self.voxel_size = settings['voxel_size']
+        self.dims = np.array(settings['dims'])
+        self.count = 0
+        self.lower = np.full(3, np.inf)
+        self.upper = np.full(3, -np.inf)
+        self.voxels = np.zeros(tuple(self.dims), dtype=np.int64)
+        self.orientation = np.zeros((N_POLAR, N_AZIMUTH), dtype=np.int64)
+        self.done = np.zeros(settings['n_chunks'], dtype=bool)
+
+    def add(self, partial):
+        """
+        Merge the partial summary of one chunk.
+        """
+        self.count += partial['count']
+        self.lower = np.minimum(self.lower, partial['lower'])
+        self.upper = np.maximum(self.upper, partial['upper'])
+        self.voxels.reshape(-1)[partial['keys']] += partial['counts']
+        self.orientation += partial['orientation']
+        self.done[partial['chunk']] = True
+
+    def occupied_volume(self):
+        """
+        Volume of the voxels reached by at least one sample [m^3].
+        """
+        return np.count_nonzero(self.voxels) * self.voxel_size ** 3
+
+    def orientation_coverage(self):
+        """
+        Fraction of the orientation cells of the tip z axis reached by at least one sample.
+        """
+        return np.count_nonzero(self.orientation) / self.orientation.size
+
+    def save(self, path):
+        """
+        Write the summary to an .npz file; the file is replaced atomically.
+        """
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, settings=json.dumps(self.settings), count=self.count, lower=self.lower,
+                 upper=self.upper, voxels=self.voxels, orientation=self.orientation, done=self.done)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            summary = cls(json.loads(str(data['settings'])))
+            summary.count = int(data['count'])
+            summary.lower = data['lower']
+            summary.upper = data['upper']
+            summary.voxels = data['voxels']
+            summary.orientation = data['orientation']
+            summary.done = data['done']
+        return summary
+
+def sample_workspace(n_samples, chunk_size=100000, workers=None, voxel_size=0.005, grid=None, seed=0,
+                     s_range=S_RANGE, delta_range=DELTA_RANGE, dtype=np.float64,
+                     checkpoint=None, checkpoint_every=50, max_chunks=None, verbose=False):
+    """
+    Stream a workspace sweep through batched FK on a process pool.
+
+    Every chunk is generated, evaluated and reduced inside a worker, and only
+    its partial summary is sent back, so the memory use depends on the chunk
+    size and the voxel grid but not on n_samples.
+
+    Args:
+        n_samples: Number of configurations; with grid, at most grid ** 9.
+        chunk_size: Configurations per chunk.
+        workers: Number of worker processes, None for os.cpu_count();
+                 1 runs in the calling process.
+        voxel_size: Edge length of the occupancy voxels [m].
+        grid, seed, s_range, delta_range, dtype: See chunk_configurations.
+        checkpoint: Optional .npz path. An existing checkpoint of the same
+                    sweep is resumed; the summary is saved there every
+                    checkpoint_every chunks and at the end.
+        max_chunks: Optional number of chunks to evaluate in this call, to
+                    split a long sweep over several jobs.
+        verbose: Print the progress.
+
+    Returns:
+        A WorkspaceSummary; summary.done marks the evaluated chunks.
+    """
+    if grid is not None and n_samples > grid ** 9:
+        raise ValueError(f"n_samples = {n_samples} exceeds the {grid ** 9} points of the grid.")
+    reach = 3 * s_range[1]
+    dims = int(np.ceil(2 * reach / voxel_size)) + 1
+    settings = {
+        'n_samples': int(n_samples),
+        'chunk_size': int(chunk_size),
+        'n_chunks': -(-int(n_samples) // int(chunk_size)),
+        'grid': grid,
+        'seed': seed,
+        's_range': list(s_range),
+        'delta_range': list(delta_range),
+        'dtype': np.dtype(dtype).name,
+        'voxel_size': voxel_size,
+        'origin': [-reach] * 3,
+        'dims': [dims] * 3,
+    }
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        summary = WorkspaceSummary.load(checkpoint)
+        if summary.settings != settings:
+            raise ValueError(f"Checkpoint {checkpoint} belongs to a different sweep.")
+    else:
+        summary = WorkspaceSummary(settings)
+
+    todo = np.flatnonzero(~summary.done)
+    if max_chunks is not None:
+        todo = todo[:max_chunks]
+    start = time.perf_counter()
+
+    def merge(partial, n_merged):
+        summary.add(partial)
+        if checkpoint is not None and n_merged % checkpoint_every == 0:
+            summary.save(checkpoint)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"chunk {n_merged}/{todo.size}: {summary.count} samples, "
+                  f"{n_merged * chunk_size / elapsed:.3g} samples/s")
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        for i, chunk in enumerate(todo):
+            merge(_reduce_chunk(int(chunk), settings), i + 1)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            # Keep a bounded number of chunks in flight and merge as they finish
+            pending = set()
+            n_merged = 0
+            for i, chunk in enumerate(todo):
+                pending.add(pool.submit(_reduce_chunk, int(chunk), settings))
+                if len(pending) < 2 * workers and i + 1 < todo.size:
+                    continue
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    n_merged += 1
+                    merge(future.result(), n_merged)
+            for future in pending:
+                n_merged += 1
+                merge(future.result(), n_merged)
+
+    if checkpoint is not None:
+        summary.save(checkpoint)
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sample the workspace of the three-section robot.")
+    parser.add_argument('n_samples', type=float, help="number of configurations, e.g. 1e8")
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--voxel-size', type=float, default=0.005, help="occupancy voxel edge [m]")
+    parser.add_argument('--grid', type=int, default=None, help="points per axis of a dense grid instead of random samples")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--float32', action='store_true', help="evaluate the FK in float32")
+    parser.add_argument('--checkpoint', default=None, help=".npz file to resume from and save to")
+    parser.add_argument('--max-chunks', type=int, default=None, help="stop after this many chunks")
+    parser.add_argument('--output', default=None, help=".npz file for the final summary")
+    args = parser.parse_args()
+
+    summary = sample_workspace(int(args.n_samples), args.chunk_size, args.workers, args.voxel_size,
+                               args.grid, args.seed, dtype=np.float32 if args.float32 else np.float64,
+                               checkpoint=args.checkpoint, max_chunks=args.max_chunks, verbose=True)
+    print(f"chunks done:          {summary.done.sum()} / {summary.done.size}")
+    print(f"samples:              {summary.count}")
+    print(f"bounding box [m]:     {np.round(summary.lower, 4)} to {np.round(summary.upper, 4)}")
+    print(f"occupied volume:      {summary.occupied_volume() * 1e6:.1f} cm^3 "
+          f"({np.count_nonzero(summary.voxels)} voxels of {summary.voxel_size * 1e3:g} mm)")
+    print(f"orientation coverage: {100 * summary.orientation_coverage():.1f}% of {summary.orientation.size} cells")
+    if args.output is not None:
+        summary.save(args.output)